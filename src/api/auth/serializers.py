@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from djoser.serializers import TokenCreateSerializer
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.authentication import stateless_tokens_for_user
+from db.common.types import UserModelType
+
+__all__ = [
+    "StatelessTokenCreateSerializer",
+    "StatelessTokenRefreshSerializer",
+]
+
+User: UserModelType = get_user_model()
+
+
+class StatelessTokenCreateSerializer(TokenCreateSerializer):
+    """
+    Logs in with the same credentials as ``token/login/`` and returns a
+    refresh and an access token.
+    """
+
+    refresh = serializers.CharField(read_only=True)
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        super().validate(attrs)
+        refresh = stateless_tokens_for_user(user=self.user)
+        update_last_login(None, self.user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+class StatelessTokenRefreshSerializer(serializers.Serializer):
+    """
+    Exchanges a refresh token for a new refresh and access token, if the user
+    is still active. The refresh token can't be used again.
+    """
+
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        # Checks the signature, the expiry and the blacklist.
+        refresh = RefreshToken(attrs["refresh"])
+        user = User.objects.filter(
+            pk=refresh[jwt_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                "No active account found for the given token.", code="user_inactive"
+            )
+        refresh.blacklist()
+        # With up to date claims, e.g. after a change of username.
+        refresh = stateless_tokens_for_user(user=user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
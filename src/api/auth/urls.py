@@ -1,6 +1,17 @@
 from django.urls import include, path
 
+from api.auth.views import (
+    StatelessTokenBlacklistAPI,
+    StatelessTokenCreateAPI,
+    StatelessTokenRefreshAPI,
+    StatelessTokenVerifyAPI,
+)
+
 urlpatterns = [
     path("", include("djoser.urls")),
     path("", include("djoser.urls.authtoken")),
+    path("jwt/create/", StatelessTokenCreateAPI.as_view(), name="jwt-create"),
+    path("jwt/refresh/", StatelessTokenRefreshAPI.as_view(), name="jwt-refresh"),
+    path("jwt/verify/", StatelessTokenVerifyAPI.as_view(), name="jwt-verify"),
+    path("jwt/blacklist/", StatelessTokenBlacklistAPI.as_view(), name="jwt-blacklist"),
 ]
@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework_simplejwt import views
+
+from api.auth.serializers import (
+    StatelessTokenCreateSerializer,
+    StatelessTokenRefreshSerializer,
+)
+
+__all__ = [
+    "StatelessTokenCreateAPI",
+    "StatelessTokenRefreshAPI",
+    "StatelessTokenVerifyAPI",
+    "StatelessTokenBlacklistAPI",
+]
+
+
+class StatelessTokensEnabledMixin:
+    """The endpoints don't exist unless AUTH_STATELESS_TOKENS is enabled."""
+
+    def initial(self, request, *args, **kwargs):
+        if not settings.AUTH_STATELESS_TOKENS:
+            raise exceptions.NotFound()
+        super().initial(request, *args, **kwargs)
+
+
+class StatelessTokenCreateAPI(StatelessTokensEnabledMixin, views.TokenObtainPairView):
+    """
+    Takes the credentials of the user and returns a refresh token and a
+    short-lived access token.
+    """
+
+    serializer_class = StatelessTokenCreateSerializer
+
+
+class StatelessTokenRefreshAPI(StatelessTokensEnabledMixin, views.TokenRefreshView):
+    """
+    Takes a refresh token and returns a new refresh token and access token.
+    """
+
+    serializer_class = StatelessTokenRefreshSerializer
+
+
+class StatelessTokenVerifyAPI(StatelessTokensEnabledMixin, views.TokenVerifyView):
+    pass
+
+
+class StatelessTokenBlacklistAPI(StatelessTokensEnabledMixin, views.TokenBlacklistView):
+    """
+    Takes a refresh token and blacklists it (logs out). The access tokens
+    issued with it stay valid until they expire.
+    """
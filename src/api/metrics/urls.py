@@ -0,0 +1,7 @@
+from django.urls import path
+
+from api.metrics.views import MetricsAPI
+
+urlpatterns = [
+    path("", MetricsAPI.as_view(), name="metrics"),
+]
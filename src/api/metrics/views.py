@@ -0,0 +1,64 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, views
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core.authentication import MetricsTokenAuthentication
+from core.metrics import format_metric, render_metrics
+from core.renderers import PrometheusRenderer
+from services.polls import question_cache_stats, vote_outbox_stats
+
+__all__ = [
+    "MetricsAPI",
+]
+
+
+class IsMetricsScraperOrStaff(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if isinstance(request.successful_authenticator, MetricsTokenAuthentication):
+            return True
+        return request.user.is_staff
+
+
+def polls_metrics():
+    cache = question_cache_stats()
+    yield from format_metric(
+        "polls_question_cache_lookups_total",
+        "Lookups of the question cache in this process.",
+        "counter",
+        [
+            ("", (("result", "hit"),), cache["hits"]),
+            ("", (("result", "miss"),), cache["misses"]),
+        ],
+    )
+    outbox = vote_outbox_stats()
+    yield from format_metric(
+        "polls_vote_outbox_depth",
+        "Votes waiting in the outbox.",
+        "gauge",
+        [("", (), outbox["depth"])],
+    )
+    yield from format_metric(
+        "polls_vote_outbox_lag_seconds",
+        "Age of the oldest vote waiting in the outbox.",
+        "gauge",
+        [("", (), outbox["lag_seconds"])],
+    )
+
+
+@extend_schema(exclude=True)
+class MetricsAPI(views.APIView):
+    """
+    The request histograms of this process (see core/middleware.py) and the
+    state of the polls, for Prometheus.
+    """
+
+    authentication_classes = [
+        MetricsTokenAuthentication,
+        *api_settings.DEFAULT_AUTHENTICATION_CLASSES,
+    ]
+    permission_classes = [IsMetricsScraperOrStaff]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request, *args, **kwargs):
+        return Response(render_metrics(polls_metrics()))
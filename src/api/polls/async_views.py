@@ -0,0 +1,169 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+
+from api.polls.serializers import (
+    QuestionStatisticsSerializer,
+    choice_detail_rows,
+    question_detail_rows,
+)
+from core.async_views import db_run, error_response, json_response, sse_response
+from core.conditional import aconditional_get, make_etag, not_modified, set_validators
+from db.polls.models import Choice, Question
+from services.polls import (
+    choice_last_modified,
+    choices_last_modified,
+    question_cache_get_or_set,
+    question_last_modified,
+    vote_tallies_stream,
+    votes_per_question,
+)
+
+__all__ = [
+    "question_retrieve",
+    "question_statistics",
+    "question_statistics_live",
+    "choice_list",
+    "choice_retrieve",
+]
+
+# Seconds between comments sent on idle streams, and milliseconds the clients
+# wait before reconnecting.
+LIVE_KEEPALIVE = 15
+LIVE_RETRY = 1000
+
+# Asynchronous versions of the read-only actions of QuestionViewSet and
+# ChoiceViewSet, with the same responses, served when API_ASYNC_READS is
+# enabled (see api/polls/urls.py). Invalid primary keys are answered like
+# the DRF views answer them.
+
+
+async def question_validators(request, pk):
+    result = await db_run(question_last_modified, question_pk=pk)
+    if result is None:
+        return None
+    last_modified, choices_count = result
+    return make_etag(pk, last_modified, choices_count), last_modified
+
+
+def _question_detail(pk):
+    row = Question.objects.filter(pk=pk).values(*question_detail_rows.lookups).first()
+    if row is None:
+        raise Http404
+    choices = Choice.objects.filter(question_id=pk)
+    row["choices"] = list(choices.values(*choice_detail_rows.lookups))
+    return question_detail_rows.to_representation(row)
+
+
+@aconditional_get(question_validators)
+async def question_retrieve(request, pk):
+    try:
+        data = await db_run(
+            question_cache_get_or_set,
+            question_pk=pk,
+            default=lambda: _question_detail(pk),
+            etag=request.validators and request.validators[0],
+        )
+    except (Http404, ValidationError):
+        return error_response(Http404())
+    return json_response(data)
+
+
+def _question_statistics(pk):
+    try:
+        questions = Question.objects.filter(pk=pk)
+        question_pk = questions.values_list("pk", flat=True).first()
+    except ValidationError:
+        question_pk = None
+    if question_pk is None:
+        raise Http404
+    return question_pk, list(votes_per_question(question=question_pk))
+
+
+async def question_statistics(request, pk):
+    try:
+        question_pk, statistics = await db_run(_question_statistics, pk)
+    except Http404 as exc:
+        return error_response(exc)
+
+    # Same ETag as QuestionViewSet.statistics.
+    etag = make_etag(question_pk, [tuple(row.values()) for row in statistics])
+    response = not_modified(request, etag=etag, last_modified=None)
+    if response is None:
+        response = json_response(
+            QuestionStatisticsSerializer(statistics, many=True).data
+        )
+    return set_validators(response, etag=etag, last_modified=None)
+
+
+def _question_exists(pk):
+    try:
+        return Question.objects.filter(pk=pk).exists()
+    except ValidationError:
+        return False
+
+
+async def question_statistics_live(request, pk):
+    """
+    Server-Sent Events stream of the statistics of the question: the current
+    ones, then new ones whenever votes change.
+    """
+    if not await db_run(_question_exists, pk):
+        return error_response(Http404())
+
+    async def events():
+        deadline = time.monotonic() + settings.POLLS_LIVE_TALLIES_STREAM_TIMEOUT
+        stream = vote_tallies_stream(question_pk=pk, keepalive=LIVE_KEEPALIVE)
+        try:
+            async for statistics in stream:
+                if statistics is None:
+                    yield None
+                else:
+                    output = QuestionStatisticsSerializer(statistics, many=True)
+                    yield "statistics", output.data
+                if time.monotonic() >= deadline:
+                    break
+        finally:
+            await stream.aclose()
+
+    return sse_response(events(), retry=LIVE_RETRY)
+
+
+async def choices_validators(request, question_pk):
+    last_modified, count = await db_run(choices_last_modified, question_pk=question_pk)
+    return make_etag(question_pk, last_modified, count), last_modified
+
+
+def _choice_rows(**filters):
+    return list(Choice.objects.filter(**filters).values(*choice_detail_rows.lookups))
+
+
+@aconditional_get(choices_validators)
+async def choice_list(request, question_pk):
+    try:
+        rows = await db_run(_choice_rows, question_id=question_pk)
+    except ValidationError as exc:
+        return error_response(exc)
+    return json_response(choice_detail_rows.many(rows))
+
+
+async def choice_validators(request, question_pk, pk):
+    last_modified = await db_run(
+        choice_last_modified, question_pk=question_pk, choice_pk=pk
+    )
+    if last_modified is None:
+        return None
+    return make_etag(pk, last_modified), last_modified
+
+
+@aconditional_get(choice_validators)
+async def choice_retrieve(request, question_pk, pk):
+    try:
+        rows = await db_run(_choice_rows, question_id=question_pk, pk=pk)
+    except ValidationError:
+        rows = []
+    if not rows:
+        return error_response(Http404())
+    return json_response(choice_detail_rows.to_representation(rows[0]))
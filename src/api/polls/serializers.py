@@ -1,19 +1,37 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework import serializers
 
+from core.serializers import RowSerializer
 from db.common.types import UserModelType
+from db.polls.models import VOTES_BATCH_MAX_SIZE
+from services.polls import (
+    EXPORT_DATA,
+    TIMELINE_GRANULARITIES,
+    TIMELINE_MINUTES_MAX_WINDOW,
+)
 
 __all__ = [
     "ChoicesCreateSerializer",
     "QuestionFilterSerializer",
     "QuestionCreateSerializer",
+    "QuestionExportFilterSerializer",
     "QuestionUpdateSerializer",
     "QuestionDetailSerializer",
     "QuestionListSerializer",
     "QuestionStatisticsSerializer",
+    "QuestionTimelineFilterSerializer",
+    "QuestionTimelineSerializer",
     "VoteCreateSerializer",
+    "VotesBatchCreateSerializer",
+    "VoteResultSerializer",
     "ChoiceDetailSerializer",
     "ChoiceUpdateSerializer",
+    "choice_detail_rows",
+    "question_detail_rows",
+    "question_list_rows",
 ]
 
 User: UserModelType = get_user_model()
@@ -44,6 +62,21 @@ class VoteCreateSerializer(serializers.Serializer):
     choice_pk = serializers.IntegerField(min_value=1, required=True)
 
 
+class VotesBatchCreateSerializer(serializers.Serializer):
+    choices = serializers.ListField(
+        required=True,
+        allow_empty=False,
+        max_length=VOTES_BATCH_MAX_SIZE,
+        child=serializers.UUIDField(),
+    )
+
+
+class VoteResultSerializer(serializers.Serializer):
+    choice_pk = serializers.UUIDField()
+    status = serializers.IntegerField(help_text="Status of the single vote request")
+    message = serializers.CharField(required=False)
+
+
 class ChoiceDetailSerializer(serializers.Serializer):
     pk = serializers.UUIDField()
     text = serializers.CharField()
@@ -51,7 +84,50 @@ class ChoiceDetailSerializer(serializers.Serializer):
 
 class QuestionStatisticsSerializer(serializers.Serializer):
     choice_pk = serializers.UUIDField(source="pk")
-    votes = serializers.IntegerField(source="vote__count")
+    votes = serializers.IntegerField()
+    percentage = serializers.FloatField(
+        help_text="Share of the votes of the question, rounded to 2 decimals"
+    )
+
+
+class QuestionTimelineFilterSerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(
+        choices=TIMELINE_GRANULARITIES, default="hour", required=False
+    )
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        # Minutes are counted in the votes themselves, over a bounded range.
+        if attrs["granularity"] == "minute":
+            since, until = attrs.get("since"), attrs.get("until", timezone.now())
+            if since is None:
+                raise serializers.ValidationError(
+                    {"since": "This field is required for minutes."}, code="required"
+                )
+            if until - since > TIMELINE_MINUTES_MAX_WINDOW:
+                raise serializers.ValidationError(
+                    {
+                        "until": f"Minutes are listed over at most "
+                        f"{TIMELINE_MINUTES_MAX_WINDOW // timedelta(hours=1)} "
+                        f"hours from since."
+                    },
+                    code="invalid",
+                )
+        return attrs
+
+
+class QuestionExportFilterSerializer(serializers.Serializer):
+    data = serializers.ChoiceField(
+        choices=list(EXPORT_DATA), default="votes", required=False
+    )
+    compression = serializers.ChoiceField(choices=["gzip"], required=False)
+
+
+class QuestionTimelineSerializer(serializers.Serializer):
+    time = serializers.DateTimeField(help_text="Start of the minute, hour or day")
+    choice_pk = serializers.UUIDField(source="choice")
+    votes = serializers.IntegerField()
 
 
 class UserSerializer(serializers.Serializer):
@@ -66,10 +142,8 @@ class QuestionDetailSerializer(serializers.Serializer):
     owner = UserSerializer()
     created = serializers.DateTimeField()
     modified = serializers.DateTimeField()
-    choices = ChoiceDetailSerializer(
-        many=True,
-        source="choice_set",
-    )
+    # Prefetched with Prefetch("choice_set", to_attr="choices").
+    choices = ChoiceDetailSerializer(many=True)
 
 
 class QuestionListSerializer(serializers.Serializer):
@@ -99,3 +173,9 @@ class ChoiceUpdateSerializer(serializers.Serializer):
         allow_null=False,
         allow_blank=False,
     )
+
+
+# Fast paths for rendering .values() rows, e.g. question_list_rows.lookups.
+choice_detail_rows = RowSerializer(ChoiceDetailSerializer)
+question_detail_rows = RowSerializer(QuestionDetailSerializer)
+question_list_rows = RowSerializer(QuestionListSerializer)
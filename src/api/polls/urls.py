@@ -1,15 +1,71 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import URLPattern, include, path
 from rest_framework_nested.routers import NestedSimpleRouter, SimpleRouter
 
-from api.polls.views import ChoiceViewSet, QuestionViewSet, VoteCreateDeleteAPI
+from api.polls import async_views
+from api.polls.views import (
+    ChoiceViewSet,
+    QuestionViewSet,
+    VoteCreateDeleteAPI,
+    VotesBatchCreateAPI,
+)
+from core.async_views import async_reads
+
+
+class ChoicesRouter(NestedSimpleRouter):
+    """Also routes ``PUT`` on the list of choices, which replaces all of them."""
+
+    routes = [
+        route._replace(mapping={**route.mapping, "put": "replace"})
+        if route.name == "{basename}-list"
+        else route
+        for route in NestedSimpleRouter.routes
+    ]
+
 
 questions_router = SimpleRouter()
 questions_router.register(r"questions", QuestionViewSet)
-choices_router = NestedSimpleRouter(questions_router, "questions", lookup="question")
+choices_router = ChoicesRouter(questions_router, "questions", lookup="question")
 choices_router.register(r"choices", ChoiceViewSet, "question-choices")
 
+ASYNC_READS = {
+    "question-detail": async_views.question_retrieve,
+    "question-statistics": async_views.question_statistics,
+    "question-choices-list": async_views.choice_list,
+    "question-choices-detail": async_views.choice_retrieve,
+}
+
+
+def with_async_reads(urls):
+    """The router URLs, with GET and HEAD served by the async views."""
+    if not settings.API_ASYNC_READS:
+        return urls
+    return [
+        URLPattern(
+            url.pattern,
+            async_reads(url.callback, read=ASYNC_READS[url.name]),
+            url.default_args,
+            url.name,
+        )
+        if url.name in ASYNC_READS
+        else url
+        for url in urls
+    ]
+
+
+# Streams need an event loop, they are only served alongside the async reads.
+live_urls = [
+    path(
+        r"questions/<uuid:pk>/statistics/live/",
+        async_views.question_statistics_live,
+        name="question-statistics-live",
+    ),
+]
+
 urlpatterns = [
-    path(r"", include(questions_router.urls)),
-    path(r"", include(choices_router.urls)),
+    path(r"", include(with_async_reads(questions_router.urls))),
+    path(r"", include(with_async_reads(choices_router.urls))),
+    *(live_urls if settings.API_ASYNC_READS else []),
+    path(r"votes/batch/", VotesBatchCreateAPI.as_view(), name="votes-batch"),
     path(r"votes/<uuid:pk>/", VoteCreateDeleteAPI.as_view(), name="vote"),
 ]
@@ -1,9 +1,11 @@
+from django.conf import settings
+from django.db.models import Prefetch
 from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import mixins, status, views, viewsets
+from rest_framework import exceptions, mixins, status, views, viewsets
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
@@ -15,28 +17,47 @@ from api.polls.serializers import (
     ChoiceUpdateSerializer,
     QuestionCreateSerializer,
     QuestionDetailSerializer,
+    QuestionExportFilterSerializer,
     QuestionListSerializer,
     QuestionStatisticsSerializer,
+    QuestionTimelineFilterSerializer,
+    QuestionTimelineSerializer,
     QuestionUpdateSerializer,
+    VoteResultSerializer,
+    VotesBatchCreateSerializer,
+    question_list_rows,
 )
-from db.polls.models import Choice, Question
+from core.conditional import conditional_get, make_etag, not_modified, set_validators
+from core.filters import FullTextSearchFilter, RankOrderingFilter
+from core.renderers import CSVRenderer, NDJSONRenderer
+from core.streaming import gzip_stream, streaming_response
+from db.polls.models import SEARCH_CONFIG, Choice, Question
 from services.polls import (
     QuestionFilter,
     cancel_vote,
     choice_delete,
+    choice_last_modified,
     choice_update,
     choices_create,
+    choices_last_modified,
     choices_replace,
     perform_vote,
+    perform_votes,
+    polls_export,
+    question_cache_get_or_set,
     question_create,
     question_destroy,
+    question_last_modified,
     question_update,
+    vote_enqueue,
     votes_per_question,
+    votes_timeline,
 )
 
 __all__ = [
     "QuestionViewSet",
     "VoteCreateDeleteAPI",
+    "VotesBatchCreateAPI",
     "ChoiceViewSet",
 ]
 
@@ -72,34 +93,77 @@ __all__ = [
 )
 @extend_schema(tags=[SCHEMA_TAG_POLLS])
 class QuestionViewSet(viewsets.ModelViewSet):
-    queryset = Question.objects.select_related("owner").prefetch_related("choice_set")
+    queryset = Question.objects.select_related("owner").prefetch_related(
+        Prefetch("choice_set", to_attr="choices")
+    )
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [
         DjangoFilterBackend,
-        SearchFilter,
-        OrderingFilter,
+        FullTextSearchFilter,
+        RankOrderingFilter,
     ]
     filterset_class = QuestionFilter
+    search_config = SEARCH_CONFIG
+    # Substring search only, the full-text search uses Question.search_vector.
     search_fields = [
         "title",
         "text",
-        "created_by__username",
+        "owner__username",
     ]
     ordering = "-created"
     ordering_fields = [
         "title",
         "text",
-        "created_by__username",
+        "owner__username",
         "created",
         "modified",
     ]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # Rendered from values() rows, see list().
+            return queryset.select_related(None).prefetch_related(None)
+        return queryset
+
     def get_serializer_class(self):
         return {
             "retrieve": QuestionDetailSerializer,
             "list": QuestionListSerializer,
         }[self.action]
 
+    def list(self, request, *args, **kwargs):
+        # Only the listed columns, and the ordering ones the pagination cursor
+        # is made of, as dicts rendered by the compiled serializer: neither the
+        # choices nor the whole owner row are loaded into model instances.
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        fields = dict.fromkeys(
+            [*question_list_rows.lookups, *(order.lstrip("-") for order in ordering)]
+        )
+        rows = queryset.values(*fields)
+
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(question_list_rows.many(rows))
+        return self.get_paginated_response(question_list_rows.many(page))
+
+    def question_validators(self, request, *args, **kwargs):
+        result = question_last_modified(question_pk=kwargs["pk"])
+        if result is None:
+            return None
+        last_modified, choices_count = result
+        return make_etag(kwargs["pk"], last_modified, choices_count), last_modified
+
+    @conditional_get(question_validators)
+    def retrieve(self, request, *args, **kwargs):
+        payload = question_cache_get_or_set(
+            question_pk=kwargs["pk"],
+            default=lambda: self.get_serializer(self.get_object()).data,
+            etag=request.validators and request.validators[0],
+        )
+        return Response(payload, status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         input_ = QuestionCreateSerializer(data=request.data)
         input_.is_valid(raise_exception=True)
@@ -128,39 +192,108 @@ class QuestionViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @extend_schema(
-        summary="Replace question choices",
-        request=ChoicesCreateSerializer,
-        responses={201: ChoiceDetailSerializer(many=True)},
-        operation_id="api_polls_questions_choices_replace",
+        summary="Calculate votes per choice for the specified question",
+        responses={200: QuestionStatisticsSerializer(many=True)},
     )
     @action(
-        methods=["PUT"],
+        methods=["GET"],
         detail=True,
         pagination_class=None,
-        permission_classes=[IsAuthenticated],
     )
-    def choices(self, request, *args, **kwargs):
-        question = self.get_object()
-        input_ = ChoicesCreateSerializer(data=request.data)
-        input_.is_valid(raise_exception=True)
-        choices = choices_replace(question=question, **input_.validated_data)
-        output = ChoiceDetailSerializer(choices, many=True)
-        return Response(output.data, status.HTTP_201_CREATED)
+    def statistics(self, request, *args, **kwargs):
+        question = get_object_or_404(Question.objects.only("pk"), pk=kwargs["pk"])
+        statistics = list(votes_per_question(question=question))
+        # Counters are cheap to read, the ETag saves rendering and bandwidth.
+        etag = make_etag(question.pk, [tuple(row.values()) for row in statistics])
+        response = not_modified(request, etag=etag, last_modified=None)
+        if response is None:
+            output = QuestionStatisticsSerializer(statistics, many=True)
+            response = Response(output.data, status.HTTP_200_OK)
+        return set_validators(response, etag=etag, last_modified=None)
 
     @extend_schema(
-        summary="Calculate votes per choice for the specified question",
-        responses={200: QuestionStatisticsSerializer(many=True)},
+        summary="Votes per choice of the question over time",
+        parameters=[QuestionTimelineFilterSerializer],
+        responses={200: QuestionTimelineSerializer(many=True)},
     )
     @action(
         methods=["GET"],
         detail=True,
+        url_path="statistics/timeline",
         pagination_class=None,
     )
-    def statistics(self, request, *args, **kwargs):
-        statistics = votes_per_question(question=self.get_object())
-        output = QuestionStatisticsSerializer(statistics, many=True)
+    def timeline(self, request, *args, **kwargs):
+        question = get_object_or_404(Question.objects.only("pk"), pk=kwargs["pk"])
+        params = QuestionTimelineFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        timeline = votes_timeline(question=question, **params.validated_data)
+        output = QuestionTimelineSerializer(timeline, many=True)
         return Response(output.data, status.HTTP_200_OK)
 
+    @extend_schema(
+        summary="Download the votes or the results of the question",
+        description="Only for the owner of the question and the staff. The "
+        "format is CSV or NDJSON, picked from the Accept header or the "
+        '"format" parameter.',
+        parameters=[QuestionExportFilterSerializer],
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        pagination_class=None,
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        question = get_object_or_404(
+            Question.objects.only("pk", "owner_id"), pk=kwargs["pk"]
+        )
+        if question.owner_id != request.user.pk and not request.user.is_staff:
+            raise exceptions.PermissionDenied("You can't export this question.")
+        return self.export_response(request, question=question)
+
+    @extend_schema(
+        summary="Download the votes or the results of every question",
+        operation_id="api_polls_questions_export_all",
+        description="Only for the staff, see the export of a single question.",
+        parameters=[QuestionExportFilterSerializer],
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        url_name="export-all",
+        pagination_class=None,
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export_all(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            raise exceptions.PermissionDenied("You can't export every question.")
+        return self.export_response(request, question=None)
+
+    def export_response(self, request, *, question):
+        params = QuestionExportFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data, compression = (
+            params.validated_data["data"],
+            params.validated_data.get("compression"),
+        )
+        renderer = request.accepted_renderer
+        chunks = polls_export(data=data, format=renderer.format, question=question)
+
+        filename = f"{data}-{question.pk if question else 'all'}.{renderer.format}"
+        content_type = f"{renderer.media_type}; charset={renderer.charset}"
+        if compression == "gzip":
+            chunks = gzip_stream(chunks)
+            filename += ".gz"
+            content_type = "application/gzip"
+        response = streaming_response(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
 
 @extend_schema(tags=[SCHEMA_TAG_POLLS])
 @extend_schema_view(
@@ -210,11 +343,47 @@ class ChoiceViewSet(
         if self.action in ["retrieve", "list"]:
             return ChoiceDetailSerializer
 
+    def choices_validators(self, request, *args, **kwargs):
+        last_modified, count = choices_last_modified(question_pk=kwargs["question_pk"])
+        return make_etag(kwargs["question_pk"], last_modified, count), last_modified
+
+    def choice_validators(self, request, *args, **kwargs):
+        last_modified = choice_last_modified(
+            question_pk=kwargs["question_pk"], choice_pk=kwargs["pk"]
+        )
+        if last_modified is None:
+            return None
+        return make_etag(kwargs["pk"], last_modified), last_modified
+
+    @conditional_get(choices_validators)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(choice_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         question = get_object_or_404(Question, pk=kwargs["question_pk"])
         input_ = ChoicesCreateSerializer(data=request.data)
         input_.is_valid(raise_exception=True)
-        choices = choices_create(question=question, **input_.validated_data)
+        choices = choices_create(
+            question=question, new_choices=input_.validated_data["choices"]
+        )
+        output = ChoiceDetailSerializer(choices, many=True)
+        return Response(output.data, status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary="Replace question choices",
+        request=ChoicesCreateSerializer,
+        responses={201: ChoiceDetailSerializer(many=True)},
+        operation_id="api_polls_questions_choices_replace",
+    )
+    def replace(self, request, *args, **kwargs):
+        question = get_object_or_404(Question, pk=kwargs["question_pk"])
+        input_ = ChoicesCreateSerializer(data=request.data)
+        input_.is_valid(raise_exception=True)
+        choices = choices_replace(question=question, **input_.validated_data)
         output = ChoiceDetailSerializer(choices, many=True)
         return Response(output.data, status.HTTP_201_CREATED)
 
@@ -235,8 +404,17 @@ class ChoiceViewSet(
 class VoteCreateDeleteAPI(views.APIView):
     permission_classes = [IsAuthenticated]
 
-    @extend_schema(summary="Perform vote", responses={201: None})
+    @extend_schema(
+        summary="Perform vote",
+        description="Answers 202 instead of 201 when votes are ingested in "
+        "the background, in which case a second vote in the same poll is "
+        "silently dropped.",
+        responses={201: None, 202: None},
+    )
     def post(self, request, *args, **kwargs):
+        if settings.POLLS_VOTE_INGESTION == "buffered":
+            vote_enqueue(choice_pk=kwargs["pk"], user=request.user)
+            return Response(status=status.HTTP_202_ACCEPTED)
         perform_vote(choice_pk=kwargs["pk"], user=request.user)
         return Response(status=status.HTTP_201_CREATED)
 
@@ -249,3 +427,43 @@ class VoteCreateDeleteAPI(views.APIView):
         if isinstance(exc, Choice.DoesNotExist):
             raise Http404 from exc
         return super().handle_exception(exc)
+
+
+@extend_schema(tags=[SCHEMA_TAG_POLLS])
+class VotesBatchCreateAPI(views.APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Perform several votes",
+        description="Each vote succeeds or fails on its own, the results are "
+        "in the order of the choices, with the status code the single vote "
+        "request would have had.",
+        request=VotesBatchCreateSerializer,
+        responses={200: VoteResultSerializer(many=True)},
+    )
+    def post(self, request, *args, **kwargs):
+        input_ = VotesBatchCreateSerializer(data=request.data)
+        input_.is_valid(raise_exception=True)
+        results = perform_votes(
+            choice_pks=input_.validated_data["choices"], user=request.user
+        )
+        output = VoteResultSerializer(
+            [self.get_result_data(result) for result in results], many=True
+        )
+        return Response(output.data, status.HTTP_200_OK)
+
+    @staticmethod
+    def get_result_data(result):
+        if result.error is None:
+            return {"choice_pk": result.choice_pk, "status": status.HTTP_201_CREATED}
+        if isinstance(result.error, Choice.DoesNotExist):
+            return {
+                "choice_pk": result.choice_pk,
+                "status": status.HTTP_404_NOT_FOUND,
+                "message": exceptions.NotFound.default_detail,
+            }
+        return {
+            "choice_pk": result.choice_pk,
+            "status": status.HTTP_400_BAD_REQUEST,
+            "message": " ".join(result.error.messages),
+        }
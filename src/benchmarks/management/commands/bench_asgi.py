@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.utils import benchmark_database, create_users
+from config.env import BASE_DIR
+from db.polls.models import Choice, Question
+
+ENDPOINTS = {
+    "retrieve": "/api/polls/questions/{pk}/",
+    "statistics": "/api/polls/questions/{pk}/statistics/",
+    "choices": "/api/polls/questions/{pk}/choices/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of a single WSGI process (gunicorn, threads) "
+        "and a single ASGI process (uvicorn, async reads) serving the read "
+        "endpoints of the polls to many concurrent keep-alive clients. "
+        "Requires gunicorn and uvicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument("--duration", type=float, default=15)
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--questions", type=int, default=1_000)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--endpoint", choices=sorted(ENDPOINTS), default="statistics"
+        )
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        for server in ("gunicorn", "uvicorn"):
+            if shutil.which(server) is None:
+                raise CommandError(f"{server} isn't installed.")
+
+        with benchmark_database(keepdb=options["keepdb"]):
+            pks = self.seed(options["questions"])
+            paths = [ENDPOINTS[options["endpoint"]].format(pk=pk) for pk in pks]
+            servers = {
+                "wsgi": [
+                    "gunicorn",
+                    "config.wsgi",
+                    "--worker-class=gthread",
+                    "--workers=1",
+                    f"--threads={options['threads']}",
+                    f"--bind=127.0.0.1:{options['port']}",
+                ],
+                "asgi": [
+                    "uvicorn",
+                    "config.asgi:application",
+                    "--workers=1",
+                    "--no-access-log",
+                    f"--port={options['port']}",
+                ],
+            }
+            for name, command in servers.items():
+                with self.server(command, options["port"], asgi=name == "asgi"):
+                    results = asyncio.run(
+                        self.load(
+                            options["port"],
+                            paths,
+                            options["clients"],
+                            options["duration"],
+                        )
+                    )
+                self.report(name, options["duration"], *results)
+
+    @staticmethod
+    def seed(count):
+        owner = create_users(1)[0]
+        questions = Question.objects.bulk_create(
+            Question(
+                title=f"Benchmark question #{i}",
+                text=f"Benchmark question text #{i}",
+                owner=owner,
+            )
+            for i in range(count)
+        )
+        Choice.objects.bulk_create(
+            Choice(text=f"Choice #{c}", question=question)
+            for question in questions
+            for c in range(4)
+        )
+        return [question.pk for question in questions]
+
+    @staticmethod
+    def server(command, port, *, asgi):
+        db = connection.settings_dict
+        env = {
+            **os.environ,
+            "DB_URL": (
+                f"postgres://{quote(db['USER'])}:{quote(db['PASSWORD'] or '')}"
+                f"@{db['HOST']}:{db['PORT']}/{db['NAME']}?conn_max_age=60"
+            ),
+            "ALLOWED_HOSTS": "127.0.0.1",
+            "DJANGO_DEBUG": "False",
+            "API_ASYNC_READS": str(asgi),
+        }
+        process = subprocess.Popen(
+            command,
+            cwd=str(BASE_DIR),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return _Server(process, port)
+
+    async def load(self, port, paths, clients, duration):
+        deadline = time.monotonic() + duration
+        latencies, errors = [], []
+        await asyncio.gather(
+            *(
+                self.client(port, paths, deadline, latencies, errors)
+                for _ in range(clients)
+            )
+        )
+        return latencies, errors
+
+    @staticmethod
+    async def client(port, paths, deadline, latencies, errors):
+        reader = writer = None
+        while time.monotonic() < deadline:
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                request = (
+                    f"GET {random.choice(paths)} HTTP/1.1\r\n"
+                    f"Host: 127.0.0.1\r\nAccept: application/json\r\n\r\n"
+                )
+                started = time.perf_counter()
+                writer.write(request.encode())
+                status = int((await reader.readline()).split()[1])
+                headers = {}
+                while line := (await reader.readline()).strip():
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                if status != 200:
+                    errors.append(status)
+                else:
+                    latencies.append(time.perf_counter() - started)
+                if headers.get("connection", "").lower() == "close":
+                    writer.close()
+                    writer = None
+            except (
+                OSError,
+                IndexError,
+                ValueError,
+                asyncio.IncompleteReadError,
+            ) as exc:
+                errors.append(type(exc).__name__)
+                writer = None
+                await asyncio.sleep(0.01)
+        if writer is not None:
+            writer.close()
+
+    def report(self, name, duration, latencies, errors):
+        if not latencies:
+            raise CommandError(f"{name}: no successful request, errors: {errors[:5]}")
+        latencies.sort()
+        self.stdout.write(
+            f"{name}: {len(latencies) / duration:7.0f} requests/s "
+            f"p50={statistics.median(latencies) * 1000:6.1f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99)] * 1000:7.1f}ms "
+            f"errors={dict(Counter(errors))}"
+        )
+
+
+class _Server:
+    def __init__(self, process, port):
+        self.process = process
+        self.port = port
+
+    def __enter__(self):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"{self.process.args[0]} exited.")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"{self.process.args[0]} didn't start.")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        sys.stdout.flush()
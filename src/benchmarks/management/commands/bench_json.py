@@ -0,0 +1,79 @@
+import io
+import statistics
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.polls.serializers import QuestionDetailSerializer
+from benchmarks.utils import Timer, build_questions
+from core.fastjson import FastJSONParser, FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the JSON renderer and parser of DRF with the orjson based "
+        "ones over pages of QuestionDetailSerializer payloads, and over the "
+        "same payloads with UUIDs and datetimes left as Python objects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=1_000)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--choices", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        questions = build_questions(options["page_size"], choices=options["choices"])
+        serialized = QuestionDetailSerializer(questions, many=True).data
+        native = [self.native(question) for question in questions]
+        pages = options["pages"]
+
+        for name, data in (("serialized", serialized), ("native", native)):
+            timings = [
+                self.measure(options["repeat"], pages, lambda: renderer.render(data))
+                for renderer in (JSONRenderer(), FastJSONRenderer())
+            ]
+            self.report(f"render {name}", pages, *timings)
+
+        content = JSONRenderer().render(serialized)
+        timings = [
+            self.measure(
+                options["repeat"],
+                pages,
+                lambda: parser.parse(io.BytesIO(content)),
+            )
+            for parser in (JSONParser(), FastJSONParser())
+        ]
+        self.report("parse", pages, *timings)
+        self.stdout.write(f"page size: {len(content)} bytes")
+
+    @staticmethod
+    def native(question):
+        return {
+            "pk": question.pk,
+            "title": question.title,
+            "text": question.text,
+            "owner": {"pk": question.owner.pk, "username": question.owner.username},
+            "created": question.created,
+            "modified": question.modified,
+            "choices": [
+                {"pk": choice.pk, "text": choice.text} for choice in question.choices
+            ],
+        }
+
+    @staticmethod
+    def measure(repeat, pages, run):
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                for _ in range(pages):
+                    run()
+            timings.append(timer.elapsed)
+        return statistics.median(timings)
+
+    def report(self, name, pages, drf, fast):
+        self.stdout.write(
+            f"{name:<18} json={pages / drf:8.0f} pages/s "
+            f"orjson={pages / fast:8.0f} pages/s speedup={drf / fast:.1f}x"
+        )
@@ -0,0 +1,108 @@
+import base64
+import statistics
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from benchmarks.utils import Timer, benchmark_database, create_users
+from core.pagination import CursorPagination
+from db.polls.models import Question
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the cost of fetching deep pages of the question list with "
+        "offset (page number) and keyset (cursor) pagination."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        # Requests are built by the test request factory.
+        with benchmark_database(keepdb=options["keepdb"]), override_settings(
+            ALLOWED_HOSTS=["testserver"]
+        ):
+            self.seed(options["rows"])
+            page_size = CursorPagination.page_size
+            last_page = options["rows"] // page_size
+            pages = [1, 10, 100, 1_000, 10_000, 100_000, last_page]
+            pages = sorted({page for page in pages if page <= last_page})
+
+            for ordering in ("-created", "title"):
+                self.stdout.write(f"ordering={ordering}")
+                for page in pages:
+                    offset = self.measure(
+                        options["repeat"], self.offset_page, ordering, page
+                    )
+                    keyset = self.measure(
+                        options["repeat"], self.keyset_page, ordering, page
+                    )
+                    self.stdout.write(
+                        f"  page={page:<8} offset={offset * 1000:9.2f}ms "
+                        f"keyset={keyset * 1000:7.2f}ms"
+                    )
+
+    @staticmethod
+    def seed(rows):
+        (owner,) = create_users(1)
+        with connection.cursor() as cursor:
+            # Titles repeat every 1000 rows, so that the tie-breaker matters.
+            cursor.execute(
+                """
+                INSERT INTO polls_question (id, created, modified, title, text, owner_id)
+                SELECT gen_random_uuid(),
+                       now() - make_interval(secs => i),
+                       now() - make_interval(secs => i),
+                       'Benchmark question #' || (i %% 1000),
+                       'Benchmark question text #' || i,
+                       %s
+                FROM generate_series(1, %s) AS i
+                """,
+                [owner.pk, rows],
+            )
+            cursor.execute("ANALYZE polls_question")
+
+    @staticmethod
+    def measure(repeat, fetch, *args):
+        timings = []
+        for _ in range(repeat):
+            query = fetch(*args)
+            with Timer() as timer:
+                query()
+            timings.append(timer.elapsed)
+        return statistics.median(timings)
+
+    @staticmethod
+    def queryset():
+        return Question.objects.select_related("owner")
+
+    def offset_page(self, ordering, page):
+        paginator = PageNumberPagination()
+        paginator.page_size = CursorPagination.page_size
+        request = Request(APIRequestFactory().get("/", {"page": page}))
+        queryset = self.queryset().order_by(ordering, "id")
+        return lambda: paginator.paginate_queryset(queryset, request)
+
+    def keyset_page(self, ordering, page):
+        paginator = CursorPagination()
+        paginator.ordering = ordering
+        request = Request(APIRequestFactory().get("/"))
+        query = {}
+        if page > 1:
+            # The cursor a client would have got from the previous page, not timed.
+            full_ordering = paginator.get_ordering(request, None, None)
+            offset = (page - 1) * paginator.page_size - 1
+            previous = self.queryset().order_by(*full_ordering)[offset]
+            position = paginator._get_position_from_instance(previous, full_ordering)
+            cursor = base64.b64encode(urlencode({"p": position}).encode()).decode()
+            query = {"cursor": cursor}
+        request = Request(APIRequestFactory().get("/", query))
+        return lambda: paginator.paginate_queryset(self.queryset(), request)
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from benchmarks.utils import create_users, percentile
+from config.env import BASE_DIR
+from db.polls.models import Choice, Question
+
+# Each client runs them in this order, voting for a choice of the question it
+# just read and cancelling the vote, so that it can vote again.
+SCENARIO = (
+    ("list", "GET", "/api/polls/questions/"),
+    ("retrieve", "GET", "/api/polls/questions/{question}/"),
+    ("statistics", "GET", "/api/polls/questions/{question}/statistics/"),
+    ("vote", "POST", "/api/polls/votes/{choice}/"),
+    ("cancel-vote", "DELETE", "/api/polls/votes/{choice}/"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with concurrent keep-alive clients listing, "
+        "reading, voting in and cancelling votes in the polls of its database "
+        "(see seed_polls), and report the latency percentiles and the "
+        "throughput of each endpoint, optionally to a JSON file to compare "
+        "runs across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument(
+            "--questions",
+            type=int,
+            default=1_000,
+            help="Number of random questions the clients pick from.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Compare the results with those of this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError("Only http://host[:port] URLs are supported.")
+        rng = random.Random(options["seed"])
+        polls = self.polls(options["questions"], rng)
+        tokens = self.tokens(options["clients"])
+
+        started = timezone.now()
+        results = asyncio.run(
+            self.load(
+                url.hostname, url.port or 80, polls, tokens, options["duration"], rng
+            )
+        )
+        report = {
+            "commit": self.commit(),
+            "started": started.isoformat(),
+            "options": {
+                name: options[name]
+                for name in ("url", "clients", "duration", "questions", "seed")
+            },
+            "endpoints": {
+                name: self.summary(*results[name], options["duration"])
+                for name, _, _ in SCENARIO
+            },
+        }
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)["endpoints"]
+        for name, summary in report["endpoints"].items():
+            self.write(name, summary, baseline and baseline.get(name))
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Written to {options['output']}")
+
+    @staticmethod
+    def polls(count, rng):
+        """``(question pk, choice pks)`` of random questions."""
+        choices = defaultdict(list)
+        for question_pk, choice_pk in (
+            Choice.objects.filter(
+                question__in=Question.objects.order_by("?").values("pk")[:count]
+            )
+            .order_by("question", "text")
+            .values_list("question", "pk")
+        ):
+            choices[question_pk].append(choice_pk)
+        if not choices:
+            raise CommandError("There is no poll, seed some with seed_polls.")
+        polls = sorted(choices.items())
+        rng.shuffle(polls)
+        return polls
+
+    @staticmethod
+    def tokens(count):
+        # New users, who haven't voted in any poll yet.
+        users = create_users(count, prefix="load")
+        return [
+            token.key
+            for token in Token.objects.bulk_create(
+                Token(key=Token.generate_key(), user=user) for user in users
+            )
+        ]
+
+    @staticmethod
+    def commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=str(BASE_DIR),
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    async def load(self, host, port, polls, tokens, duration, rng):
+        deadline = time.monotonic() + duration
+        results = defaultdict(lambda: ([], []))
+        await asyncio.gather(
+            *(
+                self.client(
+                    host,
+                    port,
+                    token,
+                    polls,
+                    random.Random(rng.random()),
+                    deadline,
+                    results,
+                )
+                for token in tokens
+            )
+        )
+        return results
+
+    @staticmethod
+    async def client(host, port, token, polls, rng, deadline, results):
+        reader = writer = None
+        while time.monotonic() < deadline:
+            question, choices = rng.choice(polls)
+            choice = rng.choice(choices)
+            for name, method, path in SCENARIO:
+                latencies, errors = results[name]
+                request = (
+                    f"{method} {path.format(question=question, choice=choice)} "
+                    f"HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n"
+                    f"Authorization: Token {token}\r\nContent-Length: 0\r\n\r\n"
+                )
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(host, port)
+                    started = time.perf_counter()
+                    writer.write(request.encode())
+                    status = int((await reader.readline()).split()[1])
+                    headers = {}
+                    while line := (await reader.readline()).strip():
+                        header, _, value = line.decode().partition(":")
+                        headers[header.lower()] = value.strip()
+                    await reader.readexactly(int(headers.get("content-length", 0)))
+                    if status >= 400:
+                        errors.append(status)
+                    else:
+                        latencies.append(time.perf_counter() - started)
+                    if headers.get("connection", "").lower() == "close":
+                        writer.close()
+                        writer = None
+                except (
+                    OSError,
+                    IndexError,
+                    ValueError,
+                    asyncio.IncompleteReadError,
+                ) as exc:
+                    errors.append(type(exc).__name__)
+                    writer = None
+                    await asyncio.sleep(0.01)
+        if writer is not None:
+            writer.close()
+
+    @staticmethod
+    def summary(latencies, errors, duration):
+        latencies = sorted(latencies)
+        summary = {
+            "requests": len(latencies),
+            "errors": len(errors),
+            "rps": round(len(latencies) / duration, 1),
+        }
+        if latencies:
+            summary.update(
+                {
+                    f"{name}_ms": round(value * 1000, 2)
+                    for name, value in (
+                        ("mean", statistics.fmean(latencies)),
+                        ("p50", percentile(latencies, 50)),
+                        ("p95", percentile(latencies, 95)),
+                        ("p99", percentile(latencies, 99)),
+                    )
+                }
+            )
+        return summary
+
+    def write(self, name, summary, baseline):
+        line = f"{name:>12}: {summary['rps']:7.1f} requests/s"
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if key in summary:
+                line += f" {key[:3]}={summary[key]:7.1f}ms"
+        line += f" errors={summary['errors']}"
+        if baseline and baseline.get("rps"):
+            line += f" ({summary['rps'] / baseline['rps'] - 1:+.0%} requests/s"
+            if baseline.get("p95_ms") and "p95_ms" in summary:
+                line += f", {summary['p95_ms'] / baseline['p95_ms'] - 1:+.0%} p95"
+            line += ")"
+        self.stdout.write(line)
@@ -0,0 +1,67 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from api.polls.serializers import (
+    QuestionDetailSerializer,
+    QuestionListSerializer,
+    question_detail_rows,
+    question_list_rows,
+)
+from benchmarks.utils import Timer, build_questions
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the rows per second rendered by the DRF serializers of the "
+        "question list and detail and by their RowSerializer fast paths. "
+        "Everything is in memory, the database isn't used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--choices", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        questions = build_questions(options["rows"], choices=options["choices"])
+        rows = [self.row(question) for question in questions]
+        cases = [
+            ("list", QuestionListSerializer, question_list_rows),
+            ("detail", QuestionDetailSerializer, question_detail_rows),
+        ]
+        for name, serializer_class, row_serializer in cases:
+            drf = self.measure(
+                options["repeat"],
+                lambda: serializer_class(questions, many=True).data,
+            )
+            fast = self.measure(options["repeat"], lambda: row_serializer.many(rows))
+            self.stdout.write(
+                f"{name:<7} serializer={len(rows) / drf:9.0f} rows/s "
+                f"rows={len(rows) / fast:9.0f} rows/s speedup={drf / fast:.1f}x"
+            )
+
+    @staticmethod
+    def row(question):
+        # What values(*question_detail_rows.lookups) would return.
+        return {
+            "pk": question.pk,
+            "title": question.title,
+            "text": question.text,
+            "owner__pk": question.owner.pk,
+            "owner__username": question.owner.username,
+            "created": question.created,
+            "modified": question.modified,
+            "choices": [
+                {"pk": choice.pk, "text": choice.text} for choice in question.choices
+            ],
+        }
+
+    @staticmethod
+    def measure(repeat, render):
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                render()
+            timings.append(timer.elapsed)
+        return statistics.median(timings)
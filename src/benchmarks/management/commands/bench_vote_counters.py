@@ -0,0 +1,65 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks.utils import Timer, benchmark_database, create_users
+from db.polls.models import Choice, Question
+from services.polls import perform_vote, votes_per_question
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare perform_vote throughput for single-row and sharded vote "
+        "counters, with many threads voting for the same choice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--votes-per-thread", type=int, default=200)
+        parser.add_argument("--shards", type=int, default=16)
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options["keepdb"]):
+            users = create_users(options["threads"] * options["votes_per_thread"])
+            for shards in (1, options["shards"]):
+                votes, elapsed = self.run(users, shards, options["threads"])
+                self.stdout.write(
+                    f"shards={shards:<4} votes={votes:<8} "
+                    f"elapsed={elapsed:.2f}s throughput={votes / elapsed:.0f} votes/s"
+                )
+
+    @staticmethod
+    def run(users, shards, threads):
+        question = Question.objects.create(
+            title="Benchmark question",
+            text="Benchmark question text",
+            owner=users[0],
+            vote_counter_shards=shards,
+        )
+        choice = Choice.objects.create(text="The only choice", question=question)
+        barrier = threading.Barrier(threads + 1)
+
+        def vote(voters):
+            try:
+                barrier.wait()
+                for user in voters:
+                    perform_vote(choice_pk=choice.pk, user=user)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=vote, args=(users[i::threads],))
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        with Timer() as timer:
+            barrier.wait()
+            for worker in workers:
+                worker.join()
+
+        (statistics,) = votes_per_question(question=question)
+        assert statistics["votes"] == len(users), statistics
+        return len(users), timer.elapsed
@@ -0,0 +1,94 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks.utils import Timer, benchmark_database, create_users
+from db.polls.models import Choice, Question
+from services.polls import (
+    perform_vote,
+    vote_enqueue,
+    vote_outbox_drain,
+    votes_per_question,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of synchronous vote inserts with the buffered "
+        "ingestion (outbox appends, then a drain), with many threads voting "
+        "in the same poll."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--votes-per-thread", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options["keepdb"]):
+            users = create_users(options["threads"] * options["votes_per_thread"])
+
+            question, choices = self.create_question(users[0])
+            votes, elapsed = self.burst(
+                perform_vote, users, choices, options["threads"]
+            )
+            self.check_votes(question, votes)
+            self.write("sync", votes, elapsed)
+
+            question, choices = self.create_question(users[0])
+            votes, elapsed = self.burst(
+                vote_enqueue, users, choices, options["threads"]
+            )
+            self.write("buffered (accept)", votes, elapsed)
+            with Timer() as drain_timer:
+                while vote_outbox_drain(batch_size=options["batch_size"]):
+                    pass
+            self.check_votes(question, votes)
+            self.write("buffered (drain)", votes, drain_timer.elapsed)
+
+    @staticmethod
+    def create_question(owner):
+        question = Question.objects.create(
+            title="Benchmark question", text="Benchmark question text", owner=owner
+        )
+        choices = Choice.objects.bulk_create(
+            Choice(text=text, question=question) for text in ("A", "B", "C", "D")
+        )
+        return question, choices
+
+    @staticmethod
+    def burst(vote, users, choices, threads):
+        barrier = threading.Barrier(threads + 1)
+
+        def run(voters):
+            try:
+                barrier.wait()
+                for i, user in enumerate(voters):
+                    vote(choice_pk=choices[i % len(choices)].pk, user=user)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=run, args=(users[i::threads],))
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        with Timer() as timer:
+            barrier.wait()
+            for worker in workers:
+                worker.join()
+        return len(users), timer.elapsed
+
+    @staticmethod
+    def check_votes(question, expected):
+        votes = sum(row["votes"] for row in votes_per_question(question=question))
+        assert votes == expected, (votes, expected)
+
+    def write(self, mode, votes, elapsed):
+        self.stdout.write(
+            f"{mode:<18} votes={votes:<8} elapsed={elapsed:.2f}s "
+            f"throughput={votes / elapsed:.0f} votes/s"
+        )
@@ -0,0 +1,156 @@
+import random
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from benchmarks.utils import Timer, copy_rows, create_users
+from db.polls.models import Choice, Question, Vote
+from services.polls import vote_buckets_rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the configured database with a large, reproducible dataset of "
+        "users, questions, choices and votes, e.g. for bench_load. The rows "
+        "are loaded with bulk_create and COPY, and the vote counters and "
+        "buckets are built in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--questions", type=int, default=1_000)
+        parser.add_argument("--choices", type=int, default=4)
+        parser.add_argument(
+            "--votes",
+            type=int,
+            default=1_000_000,
+            help="Spread evenly across the questions.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="The votes are spread over the last days.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        users, questions = options["users"], options["questions"]
+        if options["votes"] > users * questions:
+            raise CommandError("There can't be more votes than users per question.")
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        self.batch_size = options["batch_size"]
+
+        with Timer() as timer, transaction.atomic():
+            with Timer() as step:
+                owner_pks = [user.pk for user in create_users(users, prefix="seed")]
+            self.write("users", users, step.elapsed)
+
+            with Timer() as step:
+                question_pks = self.seed_questions(owner_pks, questions)
+            self.write("questions", questions, step.elapsed)
+
+            # The choice counters are set from the votes, so these come first.
+            choice_pks = {
+                question_pk: [self.uuid() for _ in range(options["choices"])]
+                for question_pk in question_pks
+            }
+            votes = self.votes(
+                owner_pks, choice_pks, options["votes"], timedelta(options["days"])
+            )
+            with Timer() as step:
+                counts = Counter()
+                count = copy_rows(
+                    Vote,
+                    (
+                        "id",
+                        "created",
+                        "modified",
+                        "date_voted",
+                        "question",
+                        "choice",
+                        "owner",
+                    ),
+                    self.counted(votes, counts),
+                    batch_size=self.batch_size,
+                )
+            self.write("votes", count, step.elapsed)
+
+            with Timer() as step:
+                count = self.seed_choices(choice_pks, counts)
+                buckets = vote_buckets_rebuild()
+            self.write("choices", count, step.elapsed)
+            self.stdout.write(f"{buckets} vote buckets")
+        self.write("total", None, timer.elapsed)
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def seed_questions(self, owner_pks, count):
+        question_pks = [self.uuid() for _ in range(count)]
+        copy_rows(
+            Question,
+            ("id", "created", "modified", "title", "text", "owner"),
+            (
+                (
+                    pk,
+                    self.now - timedelta(minutes=i),
+                    self.now - timedelta(minutes=i),
+                    f"Seeded question #{i}",
+                    f"Seeded question text #{i}",
+                    self.random.choice(owner_pks),
+                )
+                for i, pk in enumerate(question_pks)
+            ),
+            batch_size=self.batch_size,
+        )
+        return question_pks
+
+    def seed_choices(self, choice_pks, counts):
+        return copy_rows(
+            Choice,
+            ("id", "created", "modified", "text", "question", "vote_count"),
+            (
+                (pk, self.now, self.now, f"Choice #{i}", question_pk, counts[pk])
+                for question_pk, pks in choice_pks.items()
+                for i, pk in enumerate(pks)
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def votes(self, owner_pks, choice_pks, count, period):
+        """Rows of votes, by distinct users for each question."""
+        per_question, remainder = divmod(count, len(choice_pks))
+        seconds = int(period.total_seconds())
+        for i, (question_pk, pks) in enumerate(choice_pks.items()):
+            voters = per_question + (i < remainder)
+            # Consecutive users from a random offset are distinct.
+            start = self.random.randrange(len(owner_pks))
+            for v in range(voters):
+                voted = self.now - timedelta(seconds=self.random.randrange(seconds))
+                yield (
+                    self.uuid(),
+                    voted,
+                    voted,
+                    voted,
+                    question_pk,
+                    self.random.choice(pks),
+                    owner_pks[(start + v) % len(owner_pks)],
+                )
+
+    @staticmethod
+    def counted(votes, counts):
+        for vote in votes:
+            counts[vote[5]] += 1
+            yield vote
+
+    def write(self, name, count, elapsed):
+        rate = f" ({count / elapsed:,.0f} rows/s)" if count and elapsed else ""
+        count = f"{count:,} " if count is not None else ""
+        self.stdout.write(f"{count}{name} in {elapsed:.1f}s{rate}")
@@ -0,0 +1,138 @@
+import io
+import itertools
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Iterable, List, Sequence, Type
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, models
+from django.utils import timezone
+
+from db.common.types import UserModelType
+from db.polls.models import Choice, Question
+
+__all__ = [
+    "benchmark_database",
+    "build_questions",
+    "copy_rows",
+    "create_users",
+    "percentile",
+    "Timer",
+]
+
+User: UserModelType = get_user_model()
+
+
+@contextmanager
+def benchmark_database(*, keepdb: bool = False, verbosity: int = 0):
+    """
+    Run the benchmark against a throwaway test database, so that it neither
+    touches nor depends on the data of the configured one.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, serialize=False, keepdb=keepdb
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=verbosity, keepdb=keepdb
+        )
+
+
+def create_users(count: int, *, prefix: str = "bench") -> List[UserModelType]:
+    password = make_password(None)
+    offset = User.objects.count()
+    return User.objects.bulk_create(
+        User(
+            username=f"{prefix}_{offset + i}",
+            email=f"{prefix}_{offset + i}@example.com",
+            password=password,
+        )
+        for i in range(count)
+    )
+
+
+def build_questions(count: int, *, choices: int) -> List[Question]:
+    """
+    Questions with their owner and prefetched choices, in memory only, for
+    benchmarks of the rendering of payloads.
+    """
+    now = timezone.now()
+    owner = User(pk=1, username="bench_owner")
+    questions = []
+    for i in range(count):
+        question = Question(
+            pk=uuid.uuid4(),
+            title=f"Benchmark question #{i}",
+            text=f"Benchmark question text #{i}",
+            owner=owner,
+            created=now - timedelta(seconds=i),
+            modified=now - timedelta(seconds=i),
+        )
+        question.choices = [
+            Choice(pk=uuid.uuid4(), text=f"Choice #{c}", question=question)
+            for c in range(choices)
+        ]
+        questions.append(question)
+    return questions
+
+
+def _copy_value(value: Any) -> str:
+    # The text format of COPY: no tabs, newlines or backslashes are expected.
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value)
+
+
+def copy_rows(
+    model: Type[models.Model],
+    fields: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    batch_size: int = 100_000,
+) -> int:
+    """
+    Load ``rows`` of values of the columns of ``fields`` into the table of
+    ``model`` with ``COPY ... FROM STDIN``, ``batch_size`` rows at a time.
+    Triggers run, but ``save()`` and the signals don't: defaults must be
+    given. Returns the number of rows.
+    """
+    meta = model._meta
+    columns = ", ".join(
+        connection.ops.quote_name(meta.get_field(field).column) for field in fields
+    )
+    sql = f"COPY {connection.ops.quote_name(meta.db_table)} ({columns}) FROM STDIN"
+    count = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(itertools.islice(rows, batch_size)):
+            buffer = io.StringIO()
+            for row in batch:
+                buffer.write("\t".join(map(_copy_value, row)))
+                buffer.write("\n")
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            count += len(batch)
+    return count
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """The nearest-rank percentile of sorted ``values``."""
+    index = max(0, min(len(values) - 1, round(len(values) * percent / 100) - 1))
+    return values[index]
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from config.env import env
+
+# CachedTokenAuthentication keeps up to AUTH_TOKEN_CACHE_SIZE tokens in the
+# memory of each process for AUTH_TOKEN_CACHE_TTL seconds, which is also how
+# long another process may accept a token after it has been deleted.
+AUTH_TOKEN_CACHE_TTL = env.int("AUTH_TOKEN_CACHE_TTL", default=30)
+AUTH_TOKEN_CACHE_SIZE = env.int("AUTH_TOKEN_CACHE_SIZE", default=10_000)
+
+# Alias of a cache shared by the processes (e.g. "default" with a Redis
+# CACHE_URL) that tokens are also kept in, empty to disable. Invalidations
+# are immediate there.
+AUTH_TOKEN_SHARED_CACHE = env.str("AUTH_TOKEN_SHARED_CACHE", default="")
+AUTH_TOKEN_SHARED_CACHE_TTL = env.int("AUTH_TOKEN_SHARED_CACHE_TTL", default=300)
+
+# Issue short-lived access tokens, signed with SECRET_KEY, that are verified
+# without querying the database, and refresh tokens recorded in the database
+# (see api/auth/views.py). Revoking them takes up to ACCESS_TOKEN_LIFETIME.
+AUTH_STATELESS_TOKENS = env.bool("AUTH_STATELESS_TOKENS", default=False)
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        seconds=env.int("AUTH_ACCESS_TOKEN_LIFETIME", default=300)
+    ),
+    "REFRESH_TOKEN_LIFETIME": timedelta(
+        seconds=env.int("AUTH_REFRESH_TOKEN_LIFETIME", default=7 * 24 * 3600)
+    ),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+}
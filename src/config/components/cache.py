@@ -0,0 +1,3 @@
+from config.env import env
+
+CACHES = {"default": env.cache_url("CACHE_URL", default="locmemcache://")}
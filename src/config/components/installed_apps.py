@@ -1,12 +1,14 @@
 LOCAL_APPS = [
     "db.users.apps.UsersConfig",
     "db.polls.apps.PollsConfig",
+    "benchmarks.apps.BenchmarksConfig",
 ]
 
 THIRD_PARTY_APPS = [
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
+    "rest_framework_simplejwt.token_blacklist",
     "djoser",
     "django_filters",
     "drf_spectacular",
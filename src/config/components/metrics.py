@@ -0,0 +1,9 @@
+from config.env import env
+
+# Share of the requests whose queries, timings and response size are recorded
+# (see core/middleware.py), from 0 (none) to 1 (all).
+METRICS_SAMPLE_RATE = env.float("METRICS_SAMPLE_RATE", default=0.0)
+
+# Bearer token of the Prometheus scraper of /api/metrics/, which staff users
+# can read too. Empty: staff users only.
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
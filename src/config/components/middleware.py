@@ -1,4 +1,6 @@
 MIDDLEWARE = [
+    # First, so that it times the other middlewares too.
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -0,0 +1,34 @@
+from config.env import env
+
+# Number of counter rows each choice's vote count is spread across.
+# 1 keeps the count in the ``Choice.vote_count`` column, higher values remove
+# row lock contention on very popular questions. Can be overridden per question.
+POLLS_VOTE_COUNTER_SHARDS = env.int("POLLS_VOTE_COUNTER_SHARDS", default=1)
+
+# Alias of the cache the serialized questions are kept in, empty to disable.
+# With a cache local to each process, like the default "locmemcache://", each
+# process caches its own copies: they are keyed by the ETag of the question, so
+# the writes made by other processes are noticed all the same. A cache shared
+# by the processes (e.g. a Redis or Memcached CACHE_URL) is filled only once.
+POLLS_QUESTION_CACHE = env.str("POLLS_QUESTION_CACHE", default="default")
+
+# Seconds a serialized question is kept in the cache. Cached entries are
+# invalidated on every write anyway, so this only bounds the memory use.
+POLLS_QUESTION_CACHE_TIMEOUT = env.int("POLLS_QUESTION_CACHE_TIMEOUT", default=300)
+
+# "sync" inserts votes in the request. "buffered" only appends them to the
+# VoteOutbox table and answers 202, the drain_vote_outbox worker inserts them
+# in batches. Meant for bursts that the synchronous inserts can't keep up with.
+POLLS_VOTE_INGESTION = env.str("POLLS_VOTE_INGESTION", default="sync")
+
+# Live vote tallies (GET /questions/{pk}/statistics/live/, ASGI only): at most
+# one update per question every POLLS_LIVE_TALLIES_INTERVAL milliseconds.
+# With the "local" transport only the votes cast in the same process are
+# noticed, "postgres" shares them between processes with LISTEN/NOTIFY.
+POLLS_LIVE_TALLIES_INTERVAL = env.int("POLLS_LIVE_TALLIES_INTERVAL", default=500)
+POLLS_LIVE_TALLIES_TRANSPORT = env.str("POLLS_LIVE_TALLIES_TRANSPORT", default="local")
+# Streams are closed after this many seconds and the clients reconnect: Django
+# doesn't notice disconnected clients while streaming.
+POLLS_LIVE_TALLIES_STREAM_TIMEOUT = env.int(
+    "POLLS_LIVE_TALLIES_STREAM_TIMEOUT", default=300
+)
@@ -1,10 +1,40 @@
+from importlib.util import find_spec
+
+from config.env import env
+
+# Encode and decode JSON with orjson (core.fastjson) instead of the json
+# module, for the same output. DRF's renderer and parser are kept if orjson
+# isn't installed.
+REST_FAST_JSON = env.bool("REST_FAST_JSON", default=False) and bool(find_spec("orjson"))
+
+# Serve the read-only endpoints of the polls with async views (see
+# api/polls/async_views.py), for ASGI deployments (config/asgi.py). Their
+# queries run in API_ASYNC_READS_DB_THREADS threads, and connections, per
+# process, which are reused if the DB_URL sets a conn_max_age.
+API_ASYNC_READS = env.bool("API_ASYNC_READS", default=False)
+API_ASYNC_READS_DB_THREADS = env.int("API_ASYNC_READS_DB_THREADS", default=16)
+
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.CursorPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "core.authentication.CachedTokenAuthentication",
+        "core.authentication.StatelessTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.fastjson.FastJSONRenderer"
+        if REST_FAST_JSON
+        else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.fastjson.FastJSONParser"
+        if REST_FAST_JSON
+        else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
     "EXCEPTION_HANDLER": "core.exception_handlers.exception_handler",
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -14,14 +14,18 @@ from split_settings.tools import include
 
 base_settings = [
     "components/app.py",
+    "components/auth.py",
     "components/base.py",
+    "components/cache.py",
     "components/cors.py",
     "components/db.py",
     "components/debug.py",
     "components/djoser.py",
     "components/installed_apps.py",
+    "components/metrics.py",
     "components/middleware.py",
     "components/oas3.py",
+    "components/polls.py",
     "components/rest.py",
     "components/static.py",
     "components/templates.py",
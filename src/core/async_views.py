@@ -0,0 +1,135 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, AsyncIterable, Awaitable, Callable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from core.exception_handlers import exception_handler
+
+__all__ = [
+    "async_reads",
+    "db_run",
+    "error_response",
+    "json_response",
+    "sse_response",
+]
+
+_db_executor = None
+_db_executor_lock = threading.Lock()
+
+
+def _get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(
+                max_workers=settings.API_ASYNC_READS_DB_THREADS,
+                thread_name_prefix="async-db",
+            )
+        return _db_executor
+
+
+def _in_db_thread(function, *args, **kwargs):
+    # There are no request boundaries in these threads to apply CONN_MAX_AGE
+    # and CONN_HEALTH_CHECKS at, so it's done before every call.
+    close_old_connections()
+    return function(*args, **kwargs)
+
+
+async def db_run(function: Callable, *args, **kwargs) -> Any:
+    """
+    Run ``function``, which uses the ORM, in one of the (at most
+    ``API_ASYNC_READS_DB_THREADS``) threads dedicated to the database, each
+    with its own connection, persistent if ``CONN_MAX_AGE`` allows.
+
+    Django's async ORM methods would run it in a new thread, with a new
+    connection, for each request being served: as many connections as
+    requests in flight, which the database runs out of.
+    """
+    if not settings.API_ASYNC_READS_DB_THREADS:
+        # In the thread of the request, e.g. in tests, within their transaction.
+        return await sync_to_async(function)(*args, **kwargs)
+    return await sync_to_async(
+        _in_db_thread, thread_sensitive=False, executor=_get_db_executor()
+    )(function, *args, **kwargs)
+
+
+def _json_renderer() -> JSONRenderer:
+    renderer_class = next(
+        renderer_class
+        for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES
+        if issubclass(renderer_class, JSONRenderer)
+    )
+    return renderer_class()
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    """JSON response rendered like the DRF views would render ``data``."""
+    renderer = _json_renderer()
+    response = HttpResponse(
+        renderer.render(data), status=status, content_type=renderer.media_type
+    )
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def sse_response(
+    events: AsyncIterable[Optional[Tuple[str, Any]]], *, retry: int
+) -> StreamingHttpResponse:
+    """
+    Server-Sent Events stream of the ``(event, data)`` pairs, with the data
+    rendered to JSON. ``None`` sends a comment, which keeps idle connections
+    open through proxies. Clients reconnect after ``retry`` milliseconds
+    when the stream ends.
+    """
+    renderer = _json_renderer()
+
+    async def stream():
+        yield f"retry: {retry}\n\n".encode()
+        async for event in events:
+            if event is None:
+                yield b": keepalive\n\n"
+                continue
+            name, data = event
+            # The compact JSON has no line breaks, it fits in one data line.
+            yield b"event: %s\ndata: %s\n\n" % (name.encode(), renderer.render(data))
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Don't let nginx buffer the events.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def error_response(exc: Exception) -> HttpResponse:
+    """The response of the DRF views to ``exc``, e.g. ``Http404``."""
+    response = exception_handler(exc, {})
+    return json_response(response.data, status=response.status_code)
+
+
+def async_reads(view: Callable, *, read: Callable[..., Awaitable[HttpResponse]]):
+    """
+    Async view serving ``GET`` and ``HEAD`` with ``read``, an async function
+    receiving the same arguments as ``view``, and the other methods with the
+    (DRF) ``view``, in a thread.
+
+    The ``read`` functions skip DRF entirely: anyone can read, and JSON is the
+    only format.
+    """
+    sync_view = sync_to_async(view)
+
+    # Also copies the attributes of the DRF view (cls, actions, csrf_exempt...)
+    # that the schema generation and the middlewares look at.
+    @wraps(view)
+    async def dispatch(request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            return await read(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    return dispatch
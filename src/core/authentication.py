@@ -0,0 +1,233 @@
+import copy
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import router
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from db.common.types import UserModelType
+
+__all__ = [
+    "CachedTokenAuthentication",
+    "MetricsTokenAuthentication",
+    "StatelessTokenAuthentication",
+    "stateless_tokens_for_user",
+    "token_cache_clear",
+    "token_cache_invalidate",
+]
+
+User: UserModelType = get_user_model()
+
+# Fields of the user carried by the stateless access tokens, as claims of
+# the same name.
+STATELESS_TOKEN_USER_FIELDS = ("username", "email")
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory mapping with a bounded size, evicting the least
+    recently used entries, and a time to live.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def _get_local_cache() -> LRUCache:
+    global _local_cache
+    with _local_cache_lock:
+        if _local_cache is None:
+            _local_cache = LRUCache(
+                max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+                ttl=settings.AUTH_TOKEN_CACHE_TTL,
+            )
+        return _local_cache
+
+
+def _shared_cache_key(key: str) -> str:
+    # Don't expose the tokens themselves in the cache keys.
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_cache_invalidate(*, key: str):
+    """Forget the token, in this process and in the shared cache."""
+    _get_local_cache().delete(key)
+    if settings.AUTH_TOKEN_SHARED_CACHE:
+        caches[settings.AUTH_TOKEN_SHARED_CACHE].delete(_shared_cache_key(key))
+
+
+def token_cache_clear():
+    """Forget every token cached in this process."""
+    global _local_cache
+    with _local_cache_lock:
+        _local_cache = None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` that caches the token, with its user, in process
+    memory (``AUTH_TOKEN_CACHE_SIZE`` tokens for ``AUTH_TOKEN_CACHE_TTL``
+    seconds) and optionally in the ``AUTH_TOKEN_SHARED_CACHE`` cache, so that
+    authenticated requests don't query the database.
+
+    Deleting a token (logging out) or saving its user (e.g. deactivating it)
+    invalidates the token in this process and in the shared cache. Other
+    processes may keep accepting it from their memory for up to
+    ``AUTH_TOKEN_CACHE_TTL`` seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        local_cache = _get_local_cache()
+        shared_cache = (
+            caches[settings.AUTH_TOKEN_SHARED_CACHE]
+            if settings.AUTH_TOKEN_SHARED_CACHE
+            else None
+        )
+
+        token = local_cache.get(key)
+        if token is None and shared_cache is not None:
+            token = shared_cache.get(_shared_cache_key(key))
+            if token is not None:
+                local_cache.set(key, token)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            local_cache.set(key, token)
+            if shared_cache is not None:
+                shared_cache.set(
+                    _shared_cache_key(key),
+                    token,
+                    timeout=settings.AUTH_TOKEN_SHARED_CACHE_TTL,
+                )
+
+        # The cached instances are shared between requests, which get copies.
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token.user, token
+
+
+def stateless_tokens_for_user(*, user: UserModelType) -> RefreshToken:
+    """
+    A new refresh token of the user, recorded in the database, whose
+    ``access_token`` carries the fields of the user that
+    ``StatelessTokenAuthentication`` needs.
+    """
+    refresh = RefreshToken.for_user(user)
+    for field in STATELESS_TOKEN_USER_FIELDS:
+        refresh[field] = getattr(user, field)
+    return refresh
+
+
+class StatelessTokenAuthentication(JWTAuthentication):
+    """
+    Authenticates ``Bearer`` access tokens issued by the ``jwt/`` endpoints
+    when ``AUTH_STATELESS_TOKENS`` is enabled, by checking their signature
+    only. The user is built from the claims of the token, without querying the
+    database; its other fields are loaded the first time they are accessed.
+
+    Access tokens can't be revoked: logging out (blacklisting the refresh
+    token) or deactivating the user takes effect when the access token
+    expires, after ``ACCESS_TOKEN_LIFETIME`` at most.
+    """
+
+    def authenticate(self, request):
+        if not settings.AUTH_STATELESS_TOKENS:
+            return None
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            claims = {
+                User._meta.pk.attname: validated_token[jwt_settings.USER_ID_CLAIM],
+                **{
+                    field: validated_token[field]
+                    for field in STATELESS_TOKEN_USER_FIELDS
+                },
+            }
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        # Tokens are only issued to active users.
+        claims["is_active"] = True
+
+        # The fields missing from the claims are deferred, as in a queryset
+        # using only(), so that saving the user doesn't overwrite them.
+        field_names = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            router.db_for_read(User),
+            field_names,
+            [claims[field_name] for field_name in field_names],
+        )
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates the metrics scraper, as an anonymous user, by the
+    ``Authorization: Bearer <METRICS_TOKEN>`` header. Other headers are left
+    to the next authentication classes.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            return None
+        expected = f"Bearer {token}".encode()
+        if not hmac.compare_digest(get_authorization_header(request), expected):
+            return None
+        return AnonymousUser(), None
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
+class StatelessTokenScheme(SimpleJWTScheme):
+    target_class = StatelessTokenAuthentication
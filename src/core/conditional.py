@@ -0,0 +1,103 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+__all__ = [
+    "aconditional_get",
+    "conditional_get",
+    "make_etag",
+    "not_modified",
+    "set_validators",
+]
+
+Validators = Tuple[Optional[str], Optional[datetime]]
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag of the representation built from ``parts``. It is weak because
+    the same resource is rendered differently depending on the negotiated
+    format.
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request, *, etag: Optional[str], last_modified: Optional[datetime]):
+    """
+    ``304 Not Modified`` (or ``412 Precondition Failed``) response if the
+    request preconditions match the validators, ``None`` otherwise.
+    """
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+
+def set_validators(response, *, etag: Optional[str], last_modified: Optional[datetime]):
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        if etag:
+            response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified.timestamp())
+            )
+    return response
+
+
+def conditional_get(validators: Callable[..., Optional[Validators]]):
+    """
+    Decorator for the read-only actions of DRF views, like
+    ``django.views.decorators.http.condition`` but with the ETag and the
+    last modification time computed by a single ``validators`` callable.
+
+    ``validators`` receives the same arguments as the decorated method and
+    returns ``(etag, last_modified)``, or ``None`` if the resource doesn't
+    exist, in which case the action runs unconditionally. It is meant to be
+    much cheaper than the action itself, because when the client's copy is
+    fresh the action isn't run at all. The action finds the result in
+    ``request.validators``.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            result = request.validators = validators(view, request, *args, **kwargs)
+            if result is None:
+                return method(view, request, *args, **kwargs)
+
+            etag, last_modified = result
+            response = not_modified(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            return set_validators(response, etag=etag, last_modified=last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+def aconditional_get(validators: Callable[..., Awaitable[Optional[Validators]]]):
+    """``conditional_get`` for async function views, with async validators."""
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            result = request.validators = await validators(request, *args, **kwargs)
+            if result is None:
+                return await view(request, *args, **kwargs)
+
+            etag, last_modified = result
+            response = not_modified(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return set_validators(response, etag=etag, last_modified=last_modified)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,71 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+__all__ = [
+    "FullTextSearchFilter",
+    "RankOrderingFilter",
+]
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Full-text search over the stored ``search_vector_field`` of the view's
+    model, e.g. ``?search=best pizza -pineapple`` (web search syntax). The
+    matching rows are annotated with their ``search_rank``.
+
+    ``?search_mode=substring`` falls back to the substring matching of the
+    base class over ``search_fields``, for partial words and usernames.
+    """
+
+    search_mode_param = "search_mode"
+    search_vector_field = "search_vector"
+    search_config = None
+    rank_annotation = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get(self.search_mode_param) == "substring":
+            return super().filter_queryset(request, queryset, view)
+
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return queryset
+
+        config = getattr(view, "search_config", self.search_config)
+        query = SearchQuery(term, config=config, search_type="websearch")
+        vector = F(getattr(view, "search_vector_field", self.search_vector_field))
+        # ts_rank() returns a real. As a double precision value, it survives
+        # the round trip through the pagination cursor exactly.
+        return queryset.filter(**{vector.name: query}).annotate(
+            **{self.rank_annotation: Cast(SearchRank(vector, query), FloatField())}
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.search_mode_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'substring' to match parts of words.",
+                "schema": {"type": "string", "enum": ["substring"]},
+            },
+        ]
+
+
+class RankOrderingFilter(OrderingFilter):
+    """
+    Orders the results of a full-text search by relevance, unless an explicit
+    ordering is requested.
+    """
+
+    rank_annotation = FullTextSearchFilter.rank_annotation
+
+    def get_ordering(self, request, queryset, view):
+        if (
+            not request.query_params.get(self.ordering_param)
+            and self.rank_annotation in queryset.query.annotations
+        ):
+            return ["-" + self.rank_annotation]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,167 @@
+import bisect
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.db.backends.signals import connection_created
+
+__all__ = [
+    "Histogram",
+    "RequestSample",
+    "current_sample",
+    "format_metric",
+    "instrument_connection",
+    "render_metrics",
+    "REQUEST_DB_QUERIES",
+    "REQUEST_DB_SECONDS",
+    "REQUEST_DURATION_SECONDS",
+    "REQUEST_RENDER_SECONDS",
+    "RESPONSE_SIZE_BYTES",
+]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+def format_metric(
+    name: str, help: str, type: str, samples: Iterable[Tuple[str, Labels, float]]
+) -> Iterator[str]:
+    """
+    Lines of a metric in the Prometheus text exposition format, from
+    ``(suffix, labels, value)`` samples.
+    """
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {type}"
+    for suffix, labels, value in samples:
+        yield f"{name}{suffix}{_format_labels(labels)} {value:g}"
+
+
+class Histogram:
+    """Cumulative histogram of the values observed in this process, per labels."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # Per labels: [count of each bucket, then of +Inf], sum.
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            counts[index] += 1
+            total[0] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._series.items()
+            )
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield "_bucket", labels + (("le", bound),), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+    def render(self) -> Iterator[str]:
+        return format_metric(self.name, self.help, "histogram", self.samples())
+
+
+_SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_DURATION_SECONDS = Histogram(
+    "api_request_duration_seconds", "Time to build the response.", _SECONDS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "api_request_db_seconds", "Time spent in SQL queries.", _SECONDS
+)
+REQUEST_RENDER_SECONDS = Histogram(
+    "api_request_render_seconds", "Time to render the response body.", _SECONDS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "api_request_db_queries", "Number of SQL queries.", (0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+RESPONSE_SIZE_BYTES = Histogram(
+    "api_response_size_bytes",
+    "Size of the response body.",
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+
+HISTOGRAMS = (
+    REQUEST_DURATION_SECONDS,
+    REQUEST_DB_SECONDS,
+    REQUEST_DB_QUERIES,
+    REQUEST_RENDER_SECONDS,
+    RESPONSE_SIZE_BYTES,
+)
+
+
+def render_metrics(*extra: Iterable[str]) -> str:
+    """The histograms, and the ``extra`` metrics, in the Prometheus format."""
+    lines = [line for histogram in HISTOGRAMS for line in histogram.render()]
+    for metric in extra:
+        lines.extend(metric)
+    return "\n".join(lines) + "\n"
+
+
+class RequestSample:
+    """What a sampled request spent its time on, filled while it is served."""
+
+    __slots__ = ("queries", "db_time", "render_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+
+# The sample of the request being served, if it is sampled. Context variables
+# follow the request into the threads of sync_to_async, and so into db_run.
+current_sample: ContextVar[Optional[RequestSample]] = ContextVar(
+    "current_sample", default=None
+)
+
+
+def _record_query(execute, sql, params, many, context):
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_time += perf_counter() - started
+
+
+def instrument_connection(connection, **kwargs):
+    """Count the queries of ``connection`` in the current sample."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(instrument_connection, dispatch_uid="metrics")
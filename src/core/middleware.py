@@ -0,0 +1,113 @@
+import random
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+
+__all__ = [
+    "MetricsMiddleware",
+]
+
+
+def _view_label(request) -> str:
+    """``QuestionViewSet.retrieve``, or the URL name of plain Django views."""
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+    view = match.func
+    view_class = getattr(view, "cls", None) or getattr(view, "view_class", None)
+    if view_class is None:
+        return match.view_name
+    method = request.method.lower()
+    action = (getattr(view, "actions", None) or {}).get(method, method)
+    return f"{view_class.__name__}.{action}"
+
+
+class MetricsMiddleware:
+    """
+    Records the number and the duration of the SQL queries, the rendering
+    time, the total time and the size of the response of a random
+    ``METRICS_SAMPLE_RATE`` share of the requests, per view action. They are
+    added to the ``Server-Timing`` header of the response and to the
+    histograms exposed to Prometheus by ``api/metrics/``. The other requests
+    only pay for a random number.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        sample, started = self.start()
+        token = metrics.current_sample.set(sample)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+        return self.finish(request, response, sample, started)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        sample, started = self.start()
+        token = metrics.current_sample.set(sample)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+        return self.finish(request, response, sample, started)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this, by the handler.
+        sample = metrics.current_sample.get()
+        if sample is None:
+            return response
+        render_start = perf_counter()
+
+        def rendered(response):
+            sample.render_time = perf_counter() - render_start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def start():
+        # Connections of this thread opened before core.metrics was imported,
+        # e.g. by the test runner. The others are instrumented when created.
+        for connection in connections.all(initialized_only=True):
+            metrics.instrument_connection(connection)
+        return metrics.RequestSample(), perf_counter()
+
+    @staticmethod
+    def finish(request, response, sample, started):
+        total = perf_counter() - started
+        view = _view_label(request)
+        metrics.REQUEST_DURATION_SECONDS.observe(total, view=view)
+        metrics.REQUEST_DB_SECONDS.observe(sample.db_time, view=view)
+        metrics.REQUEST_DB_QUERIES.observe(sample.queries, view=view)
+        metrics.REQUEST_RENDER_SECONDS.observe(sample.render_time, view=view)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE_BYTES.observe(len(response.content), view=view)
+
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={sample.db_time * 1000:.2f};desc="{sample.queries} queries"',
+                f"render;dur={sample.render_time * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+        return response
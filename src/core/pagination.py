@@ -1,6 +1,12 @@
+import json
 from collections import OrderedDict
+from functools import reduce
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination as _CursorPagination
+from rest_framework.pagination import _reverse_ordering
 from rest_framework.response import Response
 
 
@@ -19,7 +25,116 @@ def get_paginated_response(pagination_class, serializer_class, queryset, request
 
 
 class CursorPagination(_CursorPagination):
+    """
+    Keyset pagination: the cursor holds the values of every ordering field of
+    the last row on the page, and the next page is selected with a
+    ``WHERE (a, b, id) > (x, y, z)`` style condition instead of an ``OFFSET``,
+    so every page costs the same no matter how deep it is. No ``COUNT(*)``
+    is run either.
+
+    Unlike the base class, which only compares the first ordering field and
+    falls back to offsets on ties, the ordering is made unique by appending
+    the ``id`` tie-breaker, which supports any (also non-unique) ordering the
+    view allows. For the deep pages to be cheap, the ordering needs a
+    matching ``(field, id)`` index.
+    """
+
     page_size = 10
+    tie_breaker = "id"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        fields = [order.lstrip("-") for order in ordering]
+        if self.tie_breaker in fields or "pk" in fields:
+            return ordering
+        # Same direction as the last field, so that a (field, id) index can
+        # be scanned in a single direction.
+        direction = "-" if ordering[-1].startswith("-") else ""
+        return (*ordering, direction + self.tie_breaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor and self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(ordering, position))
+            except (DjangoValidationError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Positions are unique, so the offsets of the base class are always 0.
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = position is not None
+            self.has_previous = has_following_position
+            self.next_position = position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = position is not None
+            self.next_position = following_position
+            self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, ordering, position):
+        values = json.loads(position)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError("Cursor doesn't match the ordering.")
+
+        # (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z), with
+        # the comparison flipped for descending fields.
+        condition = Q()
+        equal = {}
+        for order, value in zip(ordering, values):
+            field = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+
+        # The redundant bound on the first field lets the database use it
+        # as an index range.
+        first = ordering[0].lstrip("-")
+        lookup = "lte" if ordering[0].startswith("-") else "gte"
+        return Q(**{f"{first}__{lookup}": values[0]}) & condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps(
+            [str(self._get_value(instance, order.lstrip("-"))) for order in ordering]
+        )
+
+    @staticmethod
+    def _get_value(instance, field):
+        if isinstance(instance, dict):
+            return instance[field]
+        try:
+            return getattr(instance, field)
+        except AttributeError:
+            return reduce(getattr, field.split("__"), instance)
 
     def get_paginated_response(self, data):
         return Response(
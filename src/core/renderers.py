@@ -0,0 +1,45 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+__all__ = [
+    "CSVRenderer",
+    "NDJSONRenderer",
+    "PrometheusRenderer",
+]
+
+
+class TextRenderer(BaseRenderer):
+    """
+    Text already in the format of the renderer. Anything else, i.e. the
+    errors, is rendered as JSON, with the content type of JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, str):
+            response = (renderer_context or {}).get("response")
+            if response is not None:
+                response["Content-Type"] = JSONRenderer.media_type
+            return JSONRenderer().render(data)
+        return data.encode(self.charset)
+
+
+class PrometheusRenderer(TextRenderer):
+    """The Prometheus exposition format."""
+
+    media_type = "text/plain"
+    format = "prometheus"
+
+
+class CSVRenderer(TextRenderer):
+    """CSV, e.g. of the exports streamed by the views themselves."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(TextRenderer):
+    """Newline-delimited JSON, e.g. of the exports streamed by the views."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
@@ -0,0 +1,123 @@
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Type
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+__all__ = [
+    "RowSerializer",
+]
+
+Row = Mapping[str, Any]
+
+_SIMPLE_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+}
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable:
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or hasattr(field, "timezone")
+        or not settings.USE_TZ
+    ):
+        return lambda tz: field.to_representation
+
+    def bind(tz):
+        def convert(value):
+            # DateTimeField.to_representation() of an aware datetime.
+            value = value.astimezone(tz).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return convert
+
+    return bind
+
+
+def _converter(field: serializers.Field) -> Callable:
+    """
+    Returns a function of the current time zone returning the
+    to_representation() of the field, or an equivalent shortcut.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        convert = str
+    else:
+        convert = _SIMPLE_CONVERTERS.get(type(field), field.to_representation)
+    return lambda tz: convert
+
+
+class RowSerializer:
+    """
+    Read-only counterpart of a DRF ``Serializer`` for ``.values()`` rows,
+    whose output renders to the same JSON as ``serializer_class(obj).data``.
+
+    The fields are inspected once, when the ``RowSerializer`` is created, and
+    compiled to ``(name, itemgetter, converter)`` accessors. The row keys are
+    the ``lookups`` of the fields: the source of a nested serializer is a
+    prefix of the lookups of its fields (``owner__username``). The rows of a
+    nested ``many=True`` serializer are fetched separately, and listed in the
+    row under its ``many_lookups`` key (``choices``). Nested objects can't
+    be null.
+    """
+
+    def __init__(self, serializer_class: Type[serializers.Serializer], prefix=""):
+        self.serializer_class = serializer_class
+        # Arguments of values(), and the keys the caller adds lists of rows to.
+        self.lookups: List[str] = []
+        self.many_lookups: List[str] = []
+        self._accessors = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                raise TypeError(f"{serializer_class.__name__}.{name}: source='*'")
+            lookup = prefix + "__".join(field.source_attrs)
+            if isinstance(field, serializers.ListSerializer):
+                child = RowSerializer(type(field.child))
+                self._accessors.append((name, itemgetter(lookup), child._bind_many))
+                self.many_lookups.append(lookup)
+            elif isinstance(field, serializers.Serializer):
+                child = RowSerializer(type(field), prefix=lookup + "__")
+                self._accessors.append((name, None, child._bind))
+                self.lookups.extend(child.lookups)
+                self.many_lookups.extend(child.many_lookups)
+            else:
+                self._accessors.append((name, itemgetter(lookup), _converter(field)))
+                self.lookups.append(lookup)
+
+    def _bind(self, tz) -> Callable[[Row], Dict[str, Any]]:
+        # Looking the current time zone up once per call, not once per value,
+        # is most of the speedup over DateTimeField.
+        accessors = [(name, getter, bind(tz)) for name, getter, bind in self._accessors]
+
+        def to_representation(row):
+            data = {}
+            for name, getter, convert in accessors:
+                if getter is None:
+                    # Nested object, flattened in the row.
+                    data[name] = convert(row)
+                    continue
+                value = getter(row)
+                data[name] = None if value is None else convert(value)
+            return data
+
+        return to_representation
+
+    def _bind_many(self, tz) -> Callable[[Iterable[Row]], List[Dict[str, Any]]]:
+        to_representation = self._bind(tz)
+        return lambda rows: [to_representation(row) for row in rows]
+
+    def to_representation(self, row: Row) -> Dict[str, Any]:
+        return self._bind(timezone.get_current_timezone())(row)
+
+    def many(self, rows: Iterable[Row]) -> List[Dict[str, Any]]:
+        return self._bind_many(timezone.get_current_timezone())(rows)
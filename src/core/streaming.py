@@ -0,0 +1,46 @@
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+__all__ = [
+    "gzip_stream",
+    "streaming_response",
+]
+
+_END = object()
+
+
+def gzip_stream(
+    chunks: Iterable[Union[str, bytes]], *, level: int = 6
+) -> Iterator[bytes]:
+    """Compress ``chunks`` into a gzip file as they are produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def _iterate_in_view_thread(chunks: Iterator) -> AsyncIterator:
+    # The thread the sync view ran in, and so its database connection, e.g.
+    # for the server-side cursor the chunks are read from.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, _END)) is not _END:
+        yield chunk
+
+
+def streaming_response(chunks: Iterable, **kwargs) -> StreamingHttpResponse:
+    """
+    ``StreamingHttpResponse`` sending ``chunks`` as they are produced. Served
+    by ASGI (``API_ASYNC_READS``), Django would read a synchronous iterator
+    to the end before sending anything, so it is pulled from asynchronously.
+    """
+    if settings.API_ASYNC_READS:
+        chunks = _iterate_in_view_thread(iter(chunks))
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.polls import vote_outbox_drain, vote_outbox_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert the votes buffered in the outbox (POLLS_VOTE_INGESTION=buffered) "
+        "in batches. Runs until interrupted, unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds to wait when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the outbox is empty.",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Only print the depth of the outbox and the age of its oldest vote.",
+        )
+
+    def handle(self, *args, batch_size, interval, once, stats, verbosity, **options):
+        if stats:
+            self.write_stats()
+            return
+
+        drained = 0
+        try:
+            while True:
+                count = vote_outbox_drain(batch_size=batch_size)
+                drained += count
+                if count and verbosity >= 2:
+                    self.stdout.write(f"Drained {count} vote(s).")
+                    self.write_stats()
+                if count < batch_size:
+                    if once:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Drained {drained} vote(s) in total."))
+
+    def write_stats(self):
+        self.stdout.write(
+            "Outbox depth: %(depth)s, oldest vote: %(lag_seconds).1fs."
+            % vote_outbox_stats()
+        )
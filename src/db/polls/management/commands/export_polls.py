@@ -0,0 +1,57 @@
+import sys
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.streaming import gzip_stream
+from services.polls import EXPORT_CHUNK_SIZE, EXPORT_DATA, EXPORT_FORMATS, polls_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the votes, or the vote counts of the choices, of a question or "
+        "of every question as CSV or NDJSON, streamed with constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--question",
+            help="Primary key of the only question to export.",
+        )
+        parser.add_argument("--data", choices=list(EXPORT_DATA), default="votes")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the output with gzip.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--output",
+            default="-",
+            help='The file to write, "-" (the default) for the standard output.',
+        )
+
+    def handle(self, *args, question, data, format, gzip, chunk_size, output, **kw):
+        if question is not None:
+            try:
+                question = uuid.UUID(question)
+            except ValueError:
+                raise CommandError(f"{question!r} isn't the primary key of a question.")
+        chunks = polls_export(
+            data=data, format=format, question=question, chunk_size=chunk_size
+        )
+        if gzip:
+            chunks = gzip_stream(chunks)
+        else:
+            chunks = (chunk.encode() for chunk in chunks)
+
+        file = sys.stdout.buffer if output == "-" else open(output, "wb")
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+        finally:
+            if file is sys.stdout.buffer:
+                file.flush()
+            else:
+                file.close()
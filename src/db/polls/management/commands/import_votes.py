@@ -0,0 +1,57 @@
+import gzip
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.polls import VOTE_IMPORT_FORMATS, votes_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Import votes from a CSV file with a header, or an NDJSON file, with "
+        "the choice, owner and optionally question, date_voted and id of each "
+        "vote. Invalid votes are skipped and reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help='The file to import, "-" for the standard input.'
+        )
+        parser.add_argument(
+            "--format",
+            choices=VOTE_IMPORT_FORMATS,
+            help="Guessed from the extension of the file by default.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the votes.",
+        )
+
+    def handle(self, *args, path, format=None, dry_run=False, **options):
+        name = path[:-3] if path.endswith(".gz") else path
+        format = format or next(
+            (f for f in VOTE_IMPORT_FORMATS if name.endswith(f".{f}")), None
+        )
+        if format is None:
+            raise CommandError("Can't guess the format of the file, use --format.")
+
+        if path == "-":
+            file = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        elif path.endswith(".gz"):
+            file = gzip.open(path, "rt", encoding="utf-8", newline="")
+        else:
+            file = open(path, encoding="utf-8", newline="")
+        with file:
+            result = votes_import(file=file, format=format, dry_run=dry_run)
+
+        for line, error in result.errors:
+            self.stdout.write(f"Line {line}: {error}")
+        for error, count in sorted(result.rejected.items()):
+            self.stdout.write(self.style.WARNING(f"Rejected {count} vote(s): {error}."))
+        if dry_run:
+            message = f"{result.imported} valid vote(s), nothing imported."
+        else:
+            message = f"Imported {result.imported} vote(s)."
+        self.stdout.write(self.style.SUCCESS(message))
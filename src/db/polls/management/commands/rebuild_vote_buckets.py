@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from services.polls import vote_buckets_rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly vote buckets from the Vote table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--question",
+            help="Primary key of the only question to rebuild the buckets of.",
+        )
+
+    def handle(self, *args, question=None, **options):
+        count = vote_buckets_rebuild(question_pk=question)
+        self.stdout.write(self.style.SUCCESS("Rebuilt %s vote bucket(s)." % count))
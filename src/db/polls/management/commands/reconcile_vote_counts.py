@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from services.polls import vote_counts_reconcile
+
+
+class Command(BaseCommand):
+    help = "Find (and optionally fix) drift between vote counters and votes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rebuild the drifted counters from the Vote table.",
+        )
+
+    def handle(self, *args, fix=False, **options):
+        drifted = vote_counts_reconcile(fix=fix)
+        for row in drifted:
+            self.stdout.write(
+                "Choice %(pk)s (question %(question_id)s): "
+                "counter=%(votes)s, actual=%(actual_count)s" % row
+            )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All vote counters are in sync."))
+        elif fix:
+            self.stdout.write(self.style.SUCCESS("Fixed %s counter(s)." % len(drifted)))
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    "%s counter(s) drifted, run with --fix to rebuild them."
+                    % len(drifted)
+                )
+            )
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_vote_count(apps, schema_editor):
+    Choice = apps.get_model('polls', 'Choice')
+    Vote = apps.get_model('polls', 'Vote')
+    votes = (
+        Vote.objects.filter(choice=OuterRef('pk'))
+        .order_by()
+        .values('choice')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Choice.objects.update(vote_count=Coalesce(Subquery(votes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0003_alter_choice_text_alter_question_text_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='choice',
+            name='vote_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Denormalized number of votes, maintained by the vote services'),
+        ),
+        migrations.RunPython(populate_vote_count, migrations.RunPython.noop),
+    ]
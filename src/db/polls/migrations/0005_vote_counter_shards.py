@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:43
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_choice_vote_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='vote_counter_shards',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Number of vote counter rows per choice. Falls back to the POLLS_VOTE_COUNTER_SHARDS setting when empty.', null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.CreateModel(
+            name='VoteCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_counter_shards', to='polls.choice')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='votecountershard',
+            constraint=models.UniqueConstraint(fields=('choice', 'shard'), name='single_counter_per_choice_shard'),
+        ),
+    ]
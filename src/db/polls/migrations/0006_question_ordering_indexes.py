@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_vote_counter_shards'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['created', 'id'], name='polls_question_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['modified', 'id'], name='polls_question_modified_id'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['title', 'id'], name='polls_question_title_id'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:59
+
+import warnings
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The value of polls.models.SEARCH_CONFIG when this migration was written,
+# inlined so that the migration always replays the same.
+SEARCH_CONFIG = 'english'
+
+SEARCH_VECTOR = f"""
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({{row}}title, '')), 'A') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({{row}}text, '')), 'B')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION polls_question_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER polls_question_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, text ON polls_question
+    FOR EACH ROW EXECUTE FUNCTION polls_question_search_vector_update();
+
+UPDATE polls_question SET search_vector = {SEARCH_VECTOR.format(row='')};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER polls_question_search_vector_update ON polls_question;
+DROP FUNCTION polls_question_search_vector_update();
+"""
+
+# The substring search uses "UPPER(column) LIKE UPPER('%term%')", which a
+# trigram index on the same expression serves.
+TRIGRAM_INDEXES = {
+    'polls_question_title_trgm': ('polls_question', 'title'),
+    'polls_question_text_trgm': ('polls_question', 'text'),
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm ships with the contrib package, which not every server has.
+    # Without it the substring search still works, by sequential scans.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            warnings.warn(
+                'The pg_trgm extension is not available, '
+                'substring search of questions will not be indexed.'
+            )
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, (table, column) in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} '
+                f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_question_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted lexemes of the title (A) and the text (B), maintained by a database trigger', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='polls_question_search_vector'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
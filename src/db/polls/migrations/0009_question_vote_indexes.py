@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_vote_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['owner', '-created', '-id'], name='polls_question_owner_created'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['owner', 'choice'], name='polls_vote_owner_choice'),
+        ),
+    ]
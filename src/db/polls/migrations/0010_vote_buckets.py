@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The existing votes, all in shard 0.
+POPULATE_VOTE_BUCKETS = """
+INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+SELECT question_id, choice_id, date_trunc('hour', date_voted, 'UTC'), 0, count(*)
+FROM polls_vote
+GROUP BY 1, 2, 3
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_question_vote_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour, in UTC')),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_buckets', to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bucket'], name='polls_votebucket_question')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='votebucket',
+            constraint=models.UniqueConstraint(fields=('choice', 'bucket', 'shard'), name='single_vote_bucket_per_choice_shard'),
+        ),
+        migrations.RunSQL(POPULATE_VOTE_BUCKETS, migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,12 @@
 from .choice import Choice
-from .constants import CHOICES_MAX_NUMBER, CHOICES_MIN_NUMBER
+from .constants import (
+    CHOICES_MAX_NUMBER,
+    CHOICES_MIN_NUMBER,
+    SEARCH_CONFIG,
+    VOTES_BATCH_MAX_SIZE,
+)
 from .question import Question
 from .vote import Vote
+from .vote_bucket import VoteBucket
+from .vote_counter import VoteCounterShard
+from .vote_outbox import VoteOutbox
@@ -13,6 +13,11 @@ class Choice(BaseModel):
         "polls.Question",
         on_delete=models.CASCADE,
     )
+    vote_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of votes, maintained by the vote services",
+    )
 
     class Meta:
         constraints = (
@@ -1,2 +1,8 @@
 CHOICES_MIN_NUMBER = 2
 CHOICES_MAX_NUMBER = 10
+VOTES_BATCH_MAX_SIZE = 100
+
+# Text search configuration of Question.search_vector, also inlined in the
+# trigger of polls migration 0007: changing it takes a new migration replacing
+# the trigger function and recomputing the vectors.
+SEARCH_CONFIG = "english"
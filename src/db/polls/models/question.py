@@ -1,4 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MinValueValidator
 from django.db import models
 
 from db.common.models import BaseModel, WithOwnerMixin
@@ -19,6 +22,46 @@ class Question(
         null=False,
         blank=False,
     )
+    vote_counter_shards = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Number of vote counter rows per choice. "
+        "Falls back to the POLLS_VOTE_COUNTER_SHARDS setting when empty.",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted lexemes of the title (A) and the text (B), "
+        "maintained by a database trigger",
+    )
+
+    class Meta:
+        # Keyset pagination of the question list orders by (field, id).
+        # There is no index for "text": it is unbounded and rarely sorted by.
+        indexes = (
+            # The default ordering of the questions of a single owner.
+            models.Index(
+                name="polls_question_owner_created",
+                fields=("owner", "-created", "-id"),
+            ),
+            models.Index(
+                name="polls_question_created_id",
+                fields=("created", "id"),
+            ),
+            models.Index(
+                name="polls_question_modified_id",
+                fields=("modified", "id"),
+            ),
+            models.Index(
+                name="polls_question_title_id",
+                fields=("title", "id"),
+            ),
+            GinIndex(
+                name="polls_question_search_vector",
+                fields=("search_vector",),
+            ),
+        )
 
     def __str__(self):
         return self.title
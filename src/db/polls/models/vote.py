@@ -28,6 +28,18 @@ class Vote(
     )
 
     class Meta:
+        indexes = [
+            # Looking up the vote of a user for a choice, e.g. in cancel_vote.
+            models.Index(
+                name="polls_vote_owner_choice",
+                fields=["owner", "choice"],
+            ),
+            # The votes of a question over time, see votes_timeline.
+            models.Index(
+                name="polls_vote_question_voted",
+                fields=["question", "date_voted"],
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 name="single_vote_for_question",
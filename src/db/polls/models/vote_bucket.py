@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class VoteBucket(models.Model):
+    """
+    Number of votes cast for a choice during an hour, maintained by the vote
+    services in the transaction of the votes. Spread across shards like the
+    vote counters (see ``VoteCounterShard``), so the count of an hour is the
+    sum of its shards. Rebuilt from the ``Vote`` table by
+    ``rebuild_vote_buckets``.
+    """
+
+    question = models.ForeignKey(
+        "polls.Question",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    choice = models.ForeignKey(
+        "polls.Choice",
+        on_delete=models.CASCADE,
+        related_name="vote_buckets",
+    )
+    bucket = models.DateTimeField(help_text="Start of the hour, in UTC")
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            # The votes over time of a question.
+            models.Index(
+                name="polls_votebucket_question",
+                fields=("question", "bucket"),
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                name="single_vote_bucket_per_choice_shard",
+                fields=("choice", "bucket", "shard"),
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.choice_id}@{self.bucket:%Y-%m-%dT%H}#{self.shard}: {self.count}"
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class VoteCounterShard(models.Model):
+    """
+    One of the rows the vote count of a choice is spread across, so that
+    concurrent votes for the same choice don't queue up on a single row lock.
+    """
+
+    choice = models.ForeignKey(
+        "polls.Choice",
+        on_delete=models.CASCADE,
+        related_name="vote_counter_shards",
+    )
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                name="single_counter_per_choice_shard",
+                fields=("choice", "shard"),
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.choice_id}#{self.shard}: {self.count}"
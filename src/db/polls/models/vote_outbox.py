@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from db.common.types import UserModelType
+
+User: UserModelType = get_user_model()
+
+
+class VoteOutbox(models.Model):
+    """
+    A vote accepted by the API in the buffered ingestion mode, waiting for
+    ``drain_vote_outbox`` to insert it. The rows are drained in ``id`` order.
+    """
+
+    choice = models.ForeignKey(
+        "polls.Choice",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    created = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.owner_id} -> {self.choice_id}"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "db.users"
+
+    def ready(self):
+        from db.users import signals  # noqa: F401
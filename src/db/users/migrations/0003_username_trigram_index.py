@@ -0,0 +1,43 @@
+import warnings
+
+from django.db import migrations
+
+INDEX_NAME = 'auth_user_username_trgm'
+
+
+def create_trigram_index(apps, schema_editor):
+    # The substring search of questions by owner uses
+    # "UPPER(username) LIKE UPPER('%term%')", which this index serves. It
+    # needs pg_trgm, which ships with the contrib package.
+    table = apps.get_model('users', 'User')._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            warnings.warn(
+                'The pg_trgm extension is not available, '
+                'substring search of usernames will not be indexed.'
+            )
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # Created by polls migration 0007 on databases migrated before.
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+            f'ON {schema_editor.quote_name(table)} '
+            f'USING gin (UPPER(username) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_username_upper_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import ASCIIUsernameValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 
@@ -23,3 +24,7 @@ class User(AbstractUser):
         abstract = False
         swappable = "AUTH_USER_MODEL"
         db_table = "auth_user"
+        indexes = [
+            # Case-insensitive lookups, e.g. username__iexact.
+            models.Index(Upper("username"), name="auth_user_username_upper"),
+        ]
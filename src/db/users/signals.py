@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import token_cache_invalidate
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="token_cache_invalidate_token")
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache_invalidate(key=instance.key)
+
+
+@receiver(post_save, sender=User, dispatch_uid="token_cache_invalidate_user")
+def invalidate_user_tokens(sender, instance, created, update_fields, **kwargs):
+    # The cached user would be stale, e.g. still active. Logging in only
+    # updates last_login, which the token cache can live with.
+    if created or update_fields == frozenset({"last_login"}):
+        return
+    for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+        token_cache_invalidate(key=key)
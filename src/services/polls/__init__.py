@@ -1,3 +1,27 @@
-from .choice import choice_delete, choice_update, choices_create, choices_replace
-from .question import QuestionFilter, question_create, question_destroy, question_update
-from .vote import cancel_vote, perform_vote, votes_per_question
+from .cache import question_cache_get_or_set, question_cache_stats
+from .choice import (
+    choice_delete,
+    choice_last_modified,
+    choice_update,
+    choices_create,
+    choices_last_modified,
+    choices_replace,
+)
+from .counter import vote_buckets_rebuild, vote_counts_reconcile, votes_per_question
+from .export import EXPORT_CHUNK_SIZE, EXPORT_DATA, EXPORT_FORMATS, polls_export
+from .outbox import vote_enqueue, vote_outbox_drain, vote_outbox_stats
+from .question import (
+    QuestionFilter,
+    question_create,
+    question_destroy,
+    question_last_modified,
+    question_update,
+)
+from .tallies import vote_tallies_changed, vote_tallies_stream
+from .timeline import (
+    TIMELINE_GRANULARITIES,
+    TIMELINE_MINUTES_MAX_WINDOW,
+    votes_timeline,
+)
+from .vote import VoteResult, cancel_vote, perform_vote, perform_votes
+from .vote_import import VOTE_IMPORT_FORMATS, VoteImportResult, votes_import
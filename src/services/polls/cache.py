@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+__all__ = [
+    "question_cache_get_or_set",
+    "question_cache_invalidate",
+    "question_cache_stats",
+]
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _version_key(question_pk: UUID) -> str:
+    return f"polls:question:{question_pk}:version"
+
+
+def _payload_key(question_pk: UUID, version: int, etag: Optional[str]) -> str:
+    key = f"polls:question:{question_pk}:{version}"
+    return key if etag is None else f"{key}:{etag}"
+
+
+def _count(event: str):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def _question_cache() -> Optional[BaseCache]:
+    """The ``POLLS_QUESTION_CACHE`` cache, ``None`` if it's disabled."""
+    if not settings.POLLS_QUESTION_CACHE:
+        return None
+    return caches[settings.POLLS_QUESTION_CACHE]
+
+
+def question_cache_get_or_set(
+    *, question_pk: Any, default: Callable[[], Any], etag: Optional[str] = None
+) -> Any:
+    """
+    Return the cached payload of the question, computing it with ``default``
+    on a miss. The payload is stored under the current version of the
+    question, so a write racing with the computation can't leave a stale
+    payload behind: the write bumps the version and the payload is orphaned.
+    The payload is always computed if ``POLLS_QUESTION_CACHE`` is disabled.
+
+    The version is bumped in the cache of the process making the write only,
+    if it isn't shared (e.g. locmem). ``etag``, the ETag of the question read
+    from the database (see ``question_last_modified``), is also part of the
+    key, so that the other processes don't serve a question modified since.
+    """
+    cache = _question_cache()
+    if cache is None:
+        return default()
+    try:
+        question_pk = UUID(str(question_pk))
+    except ValueError:
+        return default()
+
+    # The initial version is time based, so that a version key evicted from
+    # the cache doesn't resurrect payloads stored under its old value.
+    version = cache.get_or_set(_version_key(question_pk), time.time_ns, timeout=None)
+    key = _payload_key(question_pk, version, etag)
+    payload = cache.get(key)
+    if payload is not None:
+        _count("hits")
+        return payload
+
+    _count("misses")
+    payload = default()
+    cache.set(key, payload, timeout=settings.POLLS_QUESTION_CACHE_TIMEOUT)
+    return payload
+
+
+def question_cache_invalidate(*, question_pk: UUID):
+    """Drop the cached payload of the question once the transaction commits."""
+    cache = _question_cache()
+    if cache is None:
+        return
+
+    def bump_version():
+        try:
+            cache.incr(_version_key(question_pk))
+        except ValueError:
+            # Nothing has been cached for this question.
+            pass
+
+    transaction.on_commit(bump_version)
+
+
+def question_cache_stats() -> Dict[str, int]:
+    """Hits and misses of the question cache in this process."""
+    with _stats_lock:
+        return {"hits": _stats["hits"], "misses": _stats["misses"]}
@@ -1,9 +1,12 @@
-from typing import Iterable, Sequence
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Count, Max
 
 from db.polls.models import CHOICES_MAX_NUMBER, CHOICES_MIN_NUMBER, Choice, Question
+from services.polls.cache import question_cache_invalidate
 
 
 def validate_choice_set(choices):
@@ -20,21 +23,38 @@ def validate_choice_set(choices):
 
 
 def choices_create(
-    *, new_choices: Sequence[str], question: Question
-) -> Sequence[Choice]:
-    existing_choices = {choice.text for choice in question.choice_set.all()}
-    validate_choice_set(existing_choices | set(new_choices))
+    *,
+    new_choices: Sequence[str],
+    question: Question,
+    existing_choices: Optional[Iterable[str]] = None,
+) -> List[Choice]:
+    """
+    Create the choices with a single INSERT. The texts of the question's
+    choices are queried, unless the caller passes them as ``existing_choices``
+    (e.g. none, for a question that has just been created).
+
+    The choices are validated in memory: their primary keys are fresh UUIDs,
+    the question is the one passed in and the uniqueness of the texts is
+    checked by ``validate_choice_set``, so none of the per-instance queries
+    of ``full_clean`` is needed.
+    """
+    if existing_choices is None:
+        existing_choices = question.choice_set.values_list("text", flat=True)
+    validate_choice_set([*existing_choices, *new_choices])
     instances = [Choice(text=text, question=question) for text in new_choices]
     for instance in instances:
-        instance.full_clean()
-    question.choice_set.add(*instances, bulk=False)
+        instance.clean_fields(exclude={"question"})
+    Choice.objects.bulk_create(instances)
+    question_cache_invalidate(question_pk=question.pk)
     return instances
 
 
 def choices_replace(*, question: Question, choices: Sequence[str]) -> Iterable[Choice]:
     with transaction.atomic():
         question.choice_set.all().delete()
-        return choices_create(new_choices=choices, question=question)
+        return choices_create(
+            new_choices=choices, question=question, existing_choices=()
+        )
 
 
 def choice_update(*, choice: Choice, text: str):
@@ -43,6 +63,7 @@ def choice_update(*, choice: Choice, text: str):
     validate_choice_set((existing_choices - {choice.text}) | {text})
     choice.text = text
     choice.save(update_fields=["text"])
+    question_cache_invalidate(question_pk=choice.question_id)
     return choice
 
 
@@ -54,3 +75,26 @@ def choice_delete(*, choice: Choice):
             "few of them."
         )
     choice.delete()
+    question_cache_invalidate(question_pk=choice.question_id)
+
+
+def choices_last_modified(*, question_pk: Any) -> Tuple[Optional[datetime], int]:
+    """When the choices of the question were last modified and how many exist."""
+    try:
+        result = Choice.objects.filter(question_id=question_pk).aggregate(
+            last_modified=Max("modified"), count=Count("pk")
+        )
+    except ValidationError:
+        return None, 0
+    return result["last_modified"], result["count"]
+
+
+def choice_last_modified(*, question_pk: Any, choice_pk: Any) -> Optional[datetime]:
+    try:
+        return (
+            Choice.objects.filter(pk=choice_pk, question_id=question_pk)
+            .values_list("modified", flat=True)
+            .first()
+        )
+    except ValidationError:
+        return None
@@ -0,0 +1,210 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    FloatField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from db.polls.models import Choice, Vote, VoteBucket, VoteCounterShard
+
+__all__ = [
+    "vote_counter_shards",
+    "vote_counter_add",
+    "vote_counters_add",
+    "vote_counts",
+    "votes_per_question",
+    "vote_counts_reconcile",
+    "vote_buckets_rebuild",
+]
+
+
+def vote_counter_shards(*, question_shards: Optional[int]) -> int:
+    """Number of counter shards of a question with the given ``vote_counter_shards``."""
+    return question_shards or settings.POLLS_VOTE_COUNTER_SHARDS
+
+
+_COUNTERS_UPDATE_SQL = """
+UPDATE polls_choice
+SET vote_count = polls_choice.vote_count + counter.delta
+FROM unnest(%(choice_ids)s::uuid[], %(deltas)s::int[]) AS counter (choice_id, delta)
+WHERE polls_choice.id = counter.choice_id
+"""
+
+_COUNTER_SHARDS_UPSERT_SQL = """
+INSERT INTO polls_votecountershard (choice_id, shard, count)
+SELECT *
+FROM unnest(%(choice_ids)s::uuid[], %(shards)s::smallint[], %(deltas)s::int[])
+ON CONFLICT ON CONSTRAINT single_counter_per_choice_shard
+DO UPDATE SET count = polls_votecountershard.count + excluded.count
+"""
+
+
+def vote_counter_add(*, choice_pk: Any, shards: int, user_pk: int, delta: int):
+    """
+    Add ``delta`` to the vote count of the choice. Must be called in the same
+    transaction as the vote insert/delete it accounts for. ``shards`` is the
+    number of shards of the choice's question, see ``vote_counter_shards``.
+
+    With a single shard the count lives in ``Choice.vote_count``. Otherwise it
+    is spread across ``VoteCounterShard`` rows and the shard is picked by the
+    voter, so that a vote and its cancellation hit the same row.
+    """
+    vote_counters_add(votes=[(choice_pk, shards, user_pk)], delta=delta)
+
+
+def vote_counters_add(*, votes: Iterable[Tuple[Any, int, int]], delta: int):
+    """
+    ``vote_counter_add`` for several ``(choice_pk, shards, user_pk)`` votes at
+    once, with at most two statements. The counters are passed in primary key
+    order, so that concurrent calls lock them in the same order.
+    """
+    unsharded, sharded = Counter(), Counter()
+    for choice_pk, shards, user_pk in votes:
+        if shards <= 1:
+            unsharded[choice_pk] += delta
+        else:
+            sharded[choice_pk, user_pk % shards] += delta
+
+    with connection.cursor() as cursor:
+        if unsharded:
+            choice_ids, deltas = zip(*sorted(unsharded.items()))
+            cursor.execute(
+                _COUNTERS_UPDATE_SQL,
+                {"choice_ids": list(choice_ids), "deltas": list(deltas)},
+            )
+        if sharded:
+            keys, deltas = zip(*sorted(sharded.items()))
+            choice_ids, shard_numbers = zip(*keys)
+            cursor.execute(
+                _COUNTER_SHARDS_UPSERT_SQL,
+                {
+                    "choice_ids": list(choice_ids),
+                    "shards": list(shard_numbers),
+                    "deltas": list(deltas),
+                },
+            )
+
+
+def vote_counts(choices: QuerySet) -> QuerySet:
+    """Annotate choices with ``votes``, summing the counter column and shards."""
+    shards = (
+        VoteCounterShard.objects.filter(choice=OuterRef("pk"))
+        .order_by()
+        .values("choice")
+        .annotate(total=Sum("count"))
+        .values("total")
+    )
+    return choices.annotate(votes=F("vote_count") + Coalesce(Subquery(shards), 0))
+
+
+def votes_per_question(*, question) -> QuerySet:
+    """
+    The votes of each choice of the question, from the counters, and their
+    share of the votes of the question in percent.
+    """
+    total = Window(Sum("votes"))
+    percentage = Round(
+        Cast("votes", DecimalField(max_digits=20, decimal_places=2))
+        * 100
+        / NullIf(total, 0),
+        precision=2,
+        output_field=FloatField(),
+    )
+    return (
+        vote_counts(Choice.objects.filter(question=question))
+        .annotate(percentage=Coalesce(percentage, 0.0))
+        .values("pk", "votes", "percentage")
+    )
+
+
+def _actual_vote_count() -> Coalesce:
+    votes = (
+        Vote.objects.filter(choice=OuterRef("pk"))
+        .order_by()
+        .values("choice")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(votes), 0)
+
+
+def vote_counts_reconcile(*, fix: bool = False) -> List[Dict[str, Any]]:
+    """
+    Compare the denormalized vote counters with the actual number of votes and
+    return the choices that drifted. If ``fix`` is set, the drifted counters
+    are rebuilt from the ``Vote`` table into ``Choice.vote_count``.
+
+    The fix is safe under live traffic. The counter shards of the choices are
+    locked first, which waits for the votes that updated them to commit and
+    holds off the next ones. Then the choices, which the votes inserting new
+    shards need a share lock on to commit (their foreign keys are deferred).
+    So the deleted shards count no vote the recount doesn't see, and the
+    increments held off are written to new shards once the fix commits.
+    """
+    drifted = list(
+        vote_counts(Choice.objects.all())
+        .annotate(actual_count=_actual_vote_count())
+        .exclude(votes=F("actual_count"))
+        .values("pk", "question_id", "votes", "actual_count")
+    )
+    if fix and drifted:
+        choice_ids = [row["pk"] for row in drifted]
+        with transaction.atomic():
+            list(
+                VoteCounterShard.objects.select_for_update()
+                .filter(choice__in=choice_ids)
+                .order_by("choice", "shard")
+                .values_list("pk", flat=True)
+            )
+            list(
+                Choice.objects.select_for_update()
+                .filter(pk__in=choice_ids)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            VoteCounterShard.objects.filter(choice__in=choice_ids).delete()
+            Choice.objects.filter(pk__in=choice_ids).update(
+                vote_count=_actual_vote_count()
+            )
+    return drifted
+
+
+_VOTE_BUCKETS_POPULATE_SQL = """
+INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+SELECT question_id, choice_id, date_trunc('hour', date_voted, 'UTC'), 0, count(*)
+FROM polls_vote
+WHERE %(question_id)s::uuid IS NULL OR question_id = %(question_id)s::uuid
+GROUP BY 1, 2, 3
+"""
+
+
+def vote_buckets_rebuild(*, question_pk: Optional[Any] = None) -> int:
+    """
+    Recompute the ``VoteBucket`` rows of the question, or of every question,
+    from the ``Vote`` table, and return how many there are. The choices are
+    locked meanwhile, like in ``vote_counts_reconcile``, which holds off the
+    votes for questions with a single counter shard only: run it when the
+    polls are quiet.
+    """
+    choices = Choice.objects.select_for_update()
+    buckets = VoteBucket.objects.all()
+    if question_pk is not None:
+        choices = choices.filter(question=question_pk)
+        buckets = buckets.filter(question=question_pk)
+    with transaction.atomic():
+        list(choices.values_list("pk", flat=True))
+        buckets.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(_VOTE_BUCKETS_POPULATE_SQL, {"question_id": question_pk})
+            return cursor.rowcount
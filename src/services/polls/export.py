@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional, Sequence
+from uuid import UUID
+
+from db.polls.models import Choice, Vote
+from services.polls.counter import vote_counts
+
+__all__ = [
+    "EXPORT_CHUNK_SIZE",
+    "EXPORT_DATA",
+    "EXPORT_FORMATS",
+    "polls_export",
+]
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# The fields of each kind of export. The votes can be imported back with
+# votes_import.
+EXPORT_DATA = {
+    "votes": ("id", "question", "choice", "owner", "date_voted"),
+    "results": ("question", "choice", "text", "votes"),
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Spreadsheets evaluate the cells starting with these as formulas.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    # Free text, e.g. the choices, is quoted to be shown as is.
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return _value(value)
+
+
+def _csv_lines(fields: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row):
+        writer.writerow(row)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(fields)
+    for row in rows:
+        yield line(map(_csv_value, row))
+
+
+def _ndjson_lines(fields: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        record = dict(zip(fields, map(_value, row)))
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _chunks(lines: Iterator[str], size: int) -> Iterator[str]:
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def polls_export(
+    *,
+    data: str,
+    format: str,
+    question: Optional[Any] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    The votes, or the vote counts of the choices ("results"), of the question
+    or of every question, as CSV with a header or as NDJSON, in chunks of
+    ``chunk_size`` rows. The rows are read from a server-side cursor as the
+    chunks are consumed, so the memory used doesn't depend on their number.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {format!r}.")
+    fields = EXPORT_DATA[data]
+    if data == "votes":
+        rows = Vote.objects.order_by("question", "date_voted", "id").values_list(
+            "id", "question", "choice", "owner", "date_voted"
+        )
+    else:
+        rows = vote_counts(
+            Choice.objects.order_by("question", "text", "id")
+        ).values_list("question", "id", "text", "votes")
+    if question is not None:
+        rows = rows.filter(question=question)
+
+    rows = rows.iterator(chunk_size=chunk_size)
+    lines = (_csv_lines if format == "csv" else _ndjson_lines)(fields, rows)
+    return _chunks(lines, chunk_size)
@@ -0,0 +1,73 @@
+from typing import Any, Dict
+
+from django.db import connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from db.common.types import UserModelType
+from db.polls.models import Choice, VoteOutbox
+from services.polls.vote import votes_insert
+
+__all__ = [
+    "vote_enqueue",
+    "vote_outbox_drain",
+    "vote_outbox_stats",
+]
+
+# Cheap validation: the choice must exist. Whether the user has already
+# voted in the poll is only known when the vote is drained.
+_ENQUEUE_SQL = """
+INSERT INTO polls_voteoutbox (choice_id, owner_id, created)
+SELECT id, %(owner_id)s, %(now)s FROM polls_choice WHERE id = %(choice_id)s
+RETURNING id
+"""
+
+_DEQUEUE_SQL = """
+DELETE FROM polls_voteoutbox
+WHERE id IN (
+    SELECT id FROM polls_voteoutbox
+    ORDER BY id
+    LIMIT %(batch_size)s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, choice_id, owner_id, created
+"""
+
+
+def vote_enqueue(*, choice_pk: Any, user: UserModelType):
+    """Append the vote to the outbox, for ``vote_outbox_drain`` to insert it."""
+    params = {"choice_id": choice_pk, "owner_id": user.pk, "now": timezone.now()}
+    with connection.cursor() as cursor:
+        cursor.execute(_ENQUEUE_SQL, params)
+        if cursor.fetchone() is None:
+            raise Choice.DoesNotExist("Choice matching query does not exist.")
+
+
+def vote_outbox_drain(*, batch_size: int = 1000) -> int:
+    """
+    Move up to ``batch_size`` of the oldest votes from the outbox into the
+    Vote table, in one transaction, and return how many were taken. Votes
+    that ``perform_vote`` would have refused (a second vote in the poll, a
+    choice deleted in the meantime) are dropped.
+
+    Rows locked by a concurrent drain are skipped, so several workers can
+    drain the outbox in parallel.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_DEQUEUE_SQL, {"batch_size": batch_size})
+            entries = sorted(cursor.fetchall())
+        if entries:
+            # Voted when enqueued, not when drained.
+            votes_insert(votes=[entry[1:] for entry in entries])
+    return len(entries)
+
+
+def vote_outbox_stats() -> Dict[str, Any]:
+    """Number of votes waiting in the outbox and the age of the oldest one."""
+    stats = VoteOutbox.objects.aggregate(depth=Count("pk"), oldest=Min("created"))
+    oldest = stats["oldest"]
+    return {
+        "depth": stats["depth"],
+        "lag_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+    }
@@ -1,18 +1,23 @@
-from typing import Any, Dict, Sequence
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import django_filters
 from django.contrib.auth import get_user_model
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
 
 from db.common.types import UserModelType
 from db.polls.models import Question
 from services.common import model_update
+from services.polls.cache import question_cache_invalidate
 from services.polls.choice import choices_create
 
 __all__ = [
     "question_create",
     "question_destroy",
+    "question_last_modified",
     "question_update",
     "QuestionFilter",
 ]
@@ -38,7 +43,7 @@ class QuestionFilter(django_filters.FilterSet):
         lookup_expr="lte",
     )
     modified_after = django_filters.DateTimeFilter(
-        field_name="modigied",
+        field_name="modified",
         lookup_expr="gte",
     )
 
@@ -52,12 +57,15 @@ def question_update(
     question, has_updated = model_update(
         instance=question, fields=["title", "text"], data=data
     )
+    if has_updated:
+        question_cache_invalidate(question_pk=question.pk)
     return question
 
 
 def question_destroy(*, question: Question, destroyed_by: UserModelType):
     if destroyed_by != question.owner:
         raise PermissionDenied("You can't delete this question.")
+    question_cache_invalidate(question_pk=question.pk)
     question.delete()
 
 
@@ -65,8 +73,35 @@ def question_create(
     *, title: str, text: str, created_by: UserModelType, choices: Sequence[str]
 ) -> Question:
     question = Question(title=title, text=text, owner=created_by)
-    question.full_clean()
+    # The owner is an existing user and the primary key a fresh UUID, their
+    # checks would only cost queries.
+    question.full_clean(exclude={"owner"}, validate_unique=False)
     with transaction.atomic():
         question.save()
-        choices_create(new_choices=choices, question=question)
-    return Question.objects.get(id=question.pk)
+        instances = choices_create(
+            new_choices=choices, question=question, existing_choices=()
+        )
+    # Like Prefetch("choice_set", to_attr="choices"), for the serializers.
+    question.choices = list(instances)
+    return question
+
+
+def question_last_modified(*, question_pk: Any) -> Optional[Tuple[datetime, int]]:
+    """
+    When the question or any of its choices was last modified, and the number
+    of choices (so that deleted choices are noticed too). Computed by a single
+    aggregate query without loading the question. ``None`` if the question
+    doesn't exist.
+    """
+    try:
+        return (
+            Question.objects.filter(pk=question_pk)
+            .annotate(
+                last_modified=Greatest("modified", Max("choice__modified")),
+                choices_count=Count("choice"),
+            )
+            .values_list("last_modified", "choices_count")
+            .first()
+        )
+    except ValidationError:
+        return None
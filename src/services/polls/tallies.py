@@ -0,0 +1,252 @@
+import asyncio
+import atexit
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+from core.async_views import db_run
+from services.polls.counter import votes_per_question
+
+__all__ = [
+    "vote_tallies_changed",
+    "vote_tallies_stream",
+]
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "polls_vote_tallies"
+
+# Seconds a stream waits for the listener to connect before subscribing.
+LISTENER_READY_TIMEOUT = 5
+
+Tallies = List[Dict[str, Any]]
+
+
+def _tallies(question_pk: UUID) -> Tallies:
+    return list(votes_per_question(question=question_pk))
+
+
+def _put_latest(queue: asyncio.Queue, tallies: Tallies):
+    # A subscriber that is behind only needs the latest tallies.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(tallies)
+
+
+class _Channel:
+    """
+    The subscribers to the tallies of one question in one event loop. The
+    tallies are fetched once per change, or once per interval when the changes
+    come faster, and fanned out to all of them.
+    """
+
+    def __init__(self, question_pk: UUID):
+        self.question_pk = question_pk
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        self.queues: Set[asyncio.Queue] = set()
+        self.task = self.loop.create_task(self._publish())
+
+    async def _publish(self):
+        interval = settings.POLLS_LIVE_TALLIES_INTERVAL / 1000
+        while True:
+            await self.changed.wait()
+            self.changed.clear()
+            try:
+                tallies = await db_run(_tallies, self.question_pk)
+            except Exception:
+                logger.exception("Fetching the tallies of %s failed", self.question_pk)
+            else:
+                for queue in self.queues:
+                    _put_latest(queue, tallies)
+            # The changes made meanwhile are published together afterwards.
+            await asyncio.sleep(interval)
+
+    def notify(self):
+        """Thread-safe."""
+        try:
+            self.loop.call_soon_threadsafe(self.changed.set)
+        except RuntimeError:
+            # The loop is closed, the subscribers are gone.
+            pass
+
+
+class _Broker:
+    """In-process publish/subscribe of the questions whose votes changed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: Dict[UUID, List[_Channel]] = defaultdict(list)
+
+    def subscribe(self, question_pk: UUID) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            channels = self._channels[question_pk]
+            channel = next((c for c in channels if c.loop is loop), None)
+            if channel is None:
+                channel = _Channel(question_pk)
+                channels.append(channel)
+            channel.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, question_pk: UUID, queue: asyncio.Queue):
+        with self._lock:
+            channels = self._channels[question_pk]
+            for channel in channels:
+                if queue in channel.queues:
+                    channel.queues.remove(queue)
+                    if not channel.queues:
+                        channel.task.cancel()
+                        channels.remove(channel)
+                    break
+            if not channels:
+                del self._channels[question_pk]
+
+    def notify(self, question_pks: Optional[Iterable[UUID]] = None):
+        """Thread-safe. ``None`` notifies the subscribers of every question."""
+        with self._lock:
+            if question_pks is None:
+                question_pks = list(self._channels)
+            channels = [
+                channel
+                for question_pk in set(question_pks)
+                for channel in self._channels.get(question_pk, ())
+            ]
+        for channel in channels:
+            channel.notify()
+
+
+_broker = _Broker()
+
+
+class _PostgresListener(threading.Thread):
+    """
+    LISTENs to the notifications sent by ``vote_tallies_changed`` in every
+    process, on a connection of its own, and forwards them to the broker,
+    until ``stop()``.
+    """
+
+    # Seconds between the checks of the stop event while waiting.
+    poll_interval = 1
+
+    def __init__(self):
+        super().__init__(name="vote-tallies-listener", daemon=True)
+        self.listening = threading.Event()
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                self.listen()
+            except Exception:
+                if self.stopping.is_set():
+                    break
+                logger.exception("Listening to %s failed", NOTIFY_CHANNEL)
+                self.stopping.wait(1)
+
+    def listen(self):
+        db = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            db.ensure_connection()
+            with db.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            # Notifications sent while the connection was down are lost.
+            _broker.notify()
+            self.listening.set()
+            raw = db.connection
+            while not self.stopping.is_set():
+                if select.select([raw], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                raw.poll()
+                question_pks = {UUID(n.payload) for n in raw.notifies}
+                raw.notifies.clear()
+                _broker.notify(question_pks)
+        finally:
+            self.listening.clear()
+            db.close()
+
+    def stop(self, timeout: float = 5):
+        """Stop listening, and close the connection."""
+        self.stopping.set()
+        self.join(timeout)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener() -> _PostgresListener:
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = _PostgresListener()
+            _listener.start()
+        return _listener
+
+
+def _stop_listener():
+    """Stop the listener of this process, if it runs, e.g. at exit."""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+def vote_tallies_changed(*, question_pks: Iterable[Any]):
+    """
+    Tell the subscribers that votes of the questions changed, once the
+    transaction commits: in this process, or with a NOTIFY in every process
+    listening to the database if ``POLLS_LIVE_TALLIES_TRANSPORT`` is
+    "postgres".
+    """
+    question_pks = {UUID(str(question_pk)) for question_pk in question_pks}
+    if not question_pks:
+        return
+    if settings.POLLS_LIVE_TALLIES_TRANSPORT == "postgres":
+        # Sent on commit, and dropped on rollback, by PostgreSQL.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, pk) FROM unnest(%s::text[]) AS pk",
+                [NOTIFY_CHANNEL, [str(question_pk) for question_pk in question_pks]],
+            )
+    else:
+        transaction.on_commit(lambda: _broker.notify(question_pks))
+
+
+async def vote_tallies_stream(
+    *, question_pk: Any, keepalive: float
+) -> AsyncIterator[Optional[Tallies]]:
+    """
+    Yield the vote counts of the choices of the question (like
+    ``votes_per_question``), then again whenever votes change, at most once
+    every ``POLLS_LIVE_TALLIES_INTERVAL`` milliseconds. ``None`` is yielded
+    when nothing changed for ``keepalive`` seconds.
+    """
+    question_pk = UUID(str(question_pk))
+    if settings.POLLS_LIVE_TALLIES_TRANSPORT == "postgres":
+        # Once listening, the changes made after the first fetch aren't missed.
+        listener = _ensure_listener()
+        await asyncio.get_running_loop().run_in_executor(
+            None, listener.listening.wait, LISTENER_READY_TIMEOUT
+        )
+    queue = _broker.subscribe(question_pk)
+    try:
+        yield await db_run(_tallies, question_pk)
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+    finally:
+        _broker.unsubscribe(question_pk, queue)
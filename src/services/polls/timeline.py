@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from django.db.models import Count, QuerySet, Sum
+from django.db.models.functions import Trunc
+
+from db.polls.models import Vote, VoteBucket
+
+__all__ = [
+    "TIMELINE_GRANULARITIES",
+    "TIMELINE_MINUTES_MAX_WINDOW",
+    "votes_timeline",
+]
+
+TIMELINE_GRANULARITIES = ("minute", "hour", "day")
+
+# Minutes are counted in the Vote table, so their range is bounded.
+TIMELINE_MINUTES_MAX_WINDOW = timedelta(hours=24)
+
+
+def _truncate(value: datetime, granularity: str) -> datetime:
+    value = value.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    if granularity in ("hour", "day"):
+        value = value.replace(minute=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def votes_timeline(
+    *,
+    question: Any,
+    granularity: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> QuerySet:
+    """
+    Number of votes for each choice of the question per minute, hour or day
+    (in UTC), as ``time``, ``choice`` and ``votes`` rows ordered by time. Only
+    the intervals with votes are listed, from the one ``since`` falls in to
+    the last one starting before ``until``.
+
+    Everything is aggregated by the database. Hours and days are summed from
+    the ``VoteBucket`` rows, whose number doesn't depend on the number of
+    votes. Minutes are counted in the ``Vote`` table, in the range of the
+    ``(question, date_voted)`` index, which is why ``since`` is required for
+    them, at most ``TIMELINE_MINUTES_MAX_WINDOW`` before ``until`` (or now).
+    """
+    if granularity not in TIMELINE_GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}")
+    if granularity == "minute" and (
+        since is None
+        or (until or datetime.now(timezone.utc)) - since > TIMELINE_MINUTES_MAX_WINDOW
+    ):
+        raise ValueError(
+            f"Minutes need a since at most {TIMELINE_MINUTES_MAX_WINDOW} before until"
+        )
+    if granularity == "minute":
+        rows, field, votes = Vote.objects.all(), "date_voted", Count("pk")
+    else:
+        rows, field, votes = VoteBucket.objects.all(), "bucket", Sum("count")
+
+    rows = rows.filter(question=question)
+    if since is not None:
+        rows = rows.filter(**{f"{field}__gte": _truncate(since, granularity)})
+    if until is not None:
+        rows = rows.filter(**{f"{field}__lt": until})
+    return (
+        rows.annotate(time=Trunc(field, granularity, tzinfo=timezone.utc))
+        .values("time", "choice")
+        .annotate(votes=votes)
+        # Hours whose votes were all cancelled.
+        .filter(votes__gt=0)
+        .order_by("time", "choice")
+    )
@@ -1,33 +1,274 @@
-from uuid import UUID
+import uuid
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
 
-from django.core.exceptions import ValidationError
-from django.db.models import Count
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
 
 from db.common.types import UserModelType
-from db.polls.models import Choice, Vote
+from db.polls.models import Choice, Vote, VoteOutbox
+from services.polls.counter import (
+    vote_counter_add,
+    vote_counter_shards,
+    vote_counters_add,
+)
+from services.polls.tallies import vote_tallies_changed
 
 __all__ = [
+    "VoteResult",
     "perform_vote",
+    "perform_votes",
+    "votes_insert",
     "cancel_vote",
-    "votes_per_question",
 ]
 
+# The question is derived from the choice, which is what Vote.clean checks,
+# and a second vote for the question is skipped instead of failing, which is
+# what the unique constraint checks. The choice row is returned either way,
+# so that the caller can tell a missing choice from a repeated vote.
+_VOTE_INSERT_SQL = """
+WITH choice AS (
+    SELECT polls_choice.id, polls_choice.question_id,
+           polls_question.vote_counter_shards
+    FROM polls_choice
+    INNER JOIN polls_question ON polls_question.id = polls_choice.question_id
+    WHERE polls_choice.id = %(choice_id)s
+), vote AS (
+    INSERT INTO polls_vote
+        (id, created, modified, date_voted, owner_id, question_id, choice_id)
+    SELECT %(id)s, %(now)s, %(now)s, %(now)s, %(owner_id)s, question_id, id
+    FROM choice
+    ON CONFLICT ON CONSTRAINT single_vote_for_question DO NOTHING
+    RETURNING id
+), bucket AS (
+    INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+    SELECT question_id, id, date_trunc('hour', %(now)s, 'UTC'),
+           %(owner_id)s %% COALESCE(vote_counter_shards, %(shards)s), 1
+    FROM choice
+    WHERE EXISTS (SELECT FROM vote)
+    ON CONFLICT ON CONSTRAINT single_vote_bucket_per_choice_shard
+    DO UPDATE SET count = polls_votebucket.count + excluded.count
+)
+SELECT question_id, vote_counter_shards, EXISTS (SELECT FROM vote) FROM choice
+"""
+
+
+# Same as _VOTE_INSERT_SQL for a list of (choice, owner, date voted) votes,
+# voted now when the date is NULL. Only the
+# first vote of each owner in each question is inserted, so a batch can't vote
+# twice in the same poll either. One row is returned per vote, in order.
+_VOTES_INSERT_SQL = """
+WITH input AS (
+    SELECT *
+    FROM unnest(
+        %(choice_ids)s::uuid[],
+        %(owner_ids)s::bigint[],
+        %(ids)s::uuid[],
+        %(dates)s::timestamptz[]
+    ) WITH ORDINALITY AS input (choice_id, owner_id, id, date_voted, position)
+), choice AS (
+    SELECT DISTINCT ON (polls_choice.question_id, input.owner_id)
+           input.position, input.id AS vote_id, input.owner_id, polls_choice.id,
+           COALESCE(input.date_voted, %(now)s) AS date_voted,
+           polls_choice.question_id, polls_question.vote_counter_shards
+    FROM input
+    INNER JOIN polls_choice ON polls_choice.id = input.choice_id
+    INNER JOIN polls_question ON polls_question.id = polls_choice.question_id
+    ORDER BY polls_choice.question_id, input.owner_id, input.position
+), vote AS (
+    INSERT INTO polls_vote
+        (id, created, modified, date_voted, owner_id, question_id, choice_id)
+    SELECT vote_id, %(now)s, %(now)s, date_voted, owner_id, question_id, id
+    FROM choice
+    ON CONFLICT ON CONSTRAINT single_vote_for_question DO NOTHING
+    RETURNING id
+), bucket AS (
+    INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+    SELECT choice.question_id, choice.id, date_trunc('hour', choice.date_voted, 'UTC'),
+           choice.owner_id %% COALESCE(choice.vote_counter_shards, %(shards)s),
+           count(*)
+    FROM vote
+    INNER JOIN choice ON choice.vote_id = vote.id
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 2, 3, 4
+    ON CONFLICT ON CONSTRAINT single_vote_bucket_per_choice_shard
+    DO UPDATE SET count = polls_votebucket.count + excluded.count
+)
+SELECT EXISTS (SELECT FROM polls_choice WHERE polls_choice.id = input.choice_id),
+       vote.id IS NOT NULL,
+       choice.vote_counter_shards,
+       choice.question_id
+FROM input
+LEFT JOIN choice ON choice.position = input.position
+LEFT JOIN vote ON vote.id = choice.vote_id
+ORDER BY input.position
+"""
+
+
+# Deletes the vote of the user for the choice and takes it out of the vote
+# bucket of its hour, in the current shard of the voter.
+_VOTE_DELETE_SQL = """
+WITH vote AS (
+    DELETE FROM polls_vote
+    WHERE choice_id = %(choice_id)s AND owner_id = %(owner_id)s
+    RETURNING question_id, choice_id, date_voted
+), bucket AS (
+    INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+    SELECT question_id, choice_id, date_trunc('hour', date_voted, 'UTC'),
+           %(shard)s, -count(*)
+    FROM vote
+    GROUP BY 1, 2, 3
+    ON CONFLICT ON CONSTRAINT single_vote_bucket_per_choice_shard
+    DO UPDATE SET count = polls_votebucket.count + excluded.count
+)
+SELECT count(*) FROM vote
+"""
+
+
+class VoteResult(NamedTuple):
+    choice_pk: Any
+    error: Optional[Exception] = None
+
+
+def _single_vote_error() -> ValidationError:
+    constraint = next(
+        constraint
+        for constraint in Vote._meta.constraints
+        if constraint.name == "single_vote_for_question"
+    )
+    return ValidationError(
+        {NON_FIELD_ERRORS: [constraint.get_violation_error_message()]}
+    )
+
 
 def perform_vote(*, choice_pk: int, user: UserModelType):
-    choice = Choice.objects.select_related("question").get(id=choice_pk)
+    """
+    Vote for the choice with a single ``INSERT ... SELECT`` statement, plus
+    the counter update, instead of loading the choice and validating the
+    vote with ``full_clean`` first.
+    """
+    try:
+        choice_pk = uuid.UUID(str(choice_pk))
+    except ValueError:
+        raise Choice.DoesNotExist("Choice matching query does not exist.") from None
 
-    vote = Vote(choice=choice, question=choice.question, owner=user)
-    vote.full_clean()
-    vote.save()
+    params = {
+        "id": uuid.uuid4(),
+        "now": timezone.now(),
+        "owner_id": user.pk,
+        "choice_id": choice_pk,
+        "shards": settings.POLLS_VOTE_COUNTER_SHARDS,
+    }
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_VOTE_INSERT_SQL, params)
+            row = cursor.fetchone()
+        if row is None:
+            raise Choice.DoesNotExist("Choice matching query does not exist.")
+        question_pk, question_shards, inserted = row
+        if not inserted:
+            raise _single_vote_error()
+        vote_tallies_changed(question_pks=[question_pk])
+        vote_counter_add(
+            choice_pk=choice_pk,
+            shards=vote_counter_shards(question_shards=question_shards),
+            user_pk=user.pk,
+            delta=1,
+        )
 
 
-def cancel_vote(*, choice_pk: int, user: UserModelType):
-    choice = Choice.objects.get(id=choice_pk)
+def votes_insert(*, votes: Sequence[Tuple[Any, ...]]) -> List[Optional[Exception]]:
+    """
+    Insert ``(choice_pk, user_pk)`` votes, cast now, or ``(choice_pk, user_pk,
+    date_voted)`` votes with a single statement and update the vote counters,
+    in the caller's transaction. Returns, for each vote,
+    ``None`` if it was inserted or the error ``perform_vote`` would have
+    raised for it.
+    """
+    choice_ids = []
+    for choice_pk, *_ in votes:
+        try:
+            choice_ids.append(uuid.UUID(str(choice_pk)))
+        except ValueError:
+            # Can't match any choice.
+            choice_ids.append(uuid.UUID(int=0))
+    owner_ids = [vote[1] for vote in votes]
+    dates = [vote[2] if len(vote) > 2 else None for vote in votes]
+
+    params = {
+        "choice_ids": choice_ids,
+        "owner_ids": owner_ids,
+        "ids": [uuid.uuid4() for _ in votes],
+        "dates": dates,
+        "now": timezone.now(),
+        "shards": settings.POLLS_VOTE_COUNTER_SHARDS,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(_VOTES_INSERT_SQL, params)
+        rows = cursor.fetchall()
+
+    errors, counters, question_pks = [], [], set()
+    for choice_id, user_pk, (exists, inserted, shards, question_pk) in zip(
+        choice_ids, owner_ids, rows
+    ):
+        if not exists:
+            errors.append(Choice.DoesNotExist("Choice matching query does not exist."))
+        elif not inserted:
+            errors.append(_single_vote_error())
+        else:
+            errors.append(None)
+            shards = vote_counter_shards(question_shards=shards)
+            counters.append((choice_id, shards, user_pk))
+            question_pks.add(question_pk)
+    vote_counters_add(votes=counters, delta=1)
+    vote_tallies_changed(question_pks=question_pks)
+    return errors
 
-    number_deleted, _ = Vote.objects.filter(choice=choice, owner=user).delete()
-    if number_deleted == 0:
-        raise ValidationError("You didn't vote for this choice.")
 
+def perform_votes(
+    *, choice_pks: Sequence[Any], user: UserModelType
+) -> List[VoteResult]:
+    """
+    Vote for several choices (e.g. one per question of a survey) with a single
+    INSERT in a single transaction. Unlike ``perform_vote``, an unknown choice
+    or a repeated vote doesn't fail the call: the error is returned in the
+    result of that choice, and the other votes are recorded.
+    """
+    with transaction.atomic():
+        errors = votes_insert(votes=[(choice_pk, user.pk) for choice_pk in choice_pks])
+    return [
+        VoteResult(choice_pk, error) for choice_pk, error in zip(choice_pks, errors)
+    ]
+
+
+def cancel_vote(*, choice_pk: int, user: UserModelType):
+    choice = Choice.objects.select_related("question").get(id=choice_pk)
 
-def votes_per_question(*, question) -> dict[UUID, int]:
-    return Choice.objects.filter(question=question).annotate(Count("vote")).values("id")
+    with transaction.atomic():
+        # A vote still waiting in the outbox is cancelled before it's counted.
+        number_pending, _ = VoteOutbox.objects.filter(
+            choice=choice, owner=user
+        ).delete()
+        shards = vote_counter_shards(
+            question_shards=choice.question.vote_counter_shards
+        )
+        params = {
+            "choice_id": choice.pk,
+            "owner_id": user.pk,
+            "shard": user.pk % shards if shards > 1 else 0,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(_VOTE_DELETE_SQL, params)
+            (number_deleted,) = cursor.fetchone()
+        if number_deleted == 0:
+            if number_pending:
+                return
+            raise ValidationError("You didn't vote for this choice.")
+        vote_counter_add(
+            choice_pk=choice.pk,
+            shards=shards,
+            user_pk=user.pk,
+            delta=-number_deleted,
+        )
+        vote_tallies_changed(question_pks=[choice.question_id])
@@ -0,0 +1,307 @@
+import csv
+import itertools
+import json
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, TextIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from db.common.types import UserModelType
+from services.polls.tallies import vote_tallies_changed
+
+__all__ = [
+    "VOTE_IMPORT_FORMATS",
+    "VoteImportResult",
+    "votes_import",
+]
+
+User: UserModelType = get_user_model()
+
+VOTE_IMPORT_FORMATS = ("csv", "ndjson")
+
+# The fields of the imported votes. "question" is optional and checked against
+# the question of the choice, "date_voted" defaults to now and "id" to a random
+# UUID.
+VOTE_IMPORT_FIELDS = ("choice", "owner", "question", "date_voted", "id")
+
+_STAGING_TABLE = "polls_vote_import"
+
+_STAGING_CREATE_SQL = f"""
+CREATE TEMPORARY TABLE {_STAGING_TABLE} (
+    line bigint PRIMARY KEY,
+    id uuid,
+    choice_id uuid,
+    owner_id bigint,
+    expected_question_id uuid,
+    date_voted timestamptz,
+    question_id uuid,
+    error text
+) ON COMMIT DROP
+"""
+
+_STAGING_COPY_SQL = f"""
+COPY {_STAGING_TABLE}
+    (line, id, choice_id, owner_id, expected_question_id, date_voted, error)
+FROM STDIN
+"""
+
+# The rows are checked like perform_vote does, but for all of them at once: the
+# choice must exist, and belong to the question if one is given, the owner
+# must exist, and nobody can vote twice in a poll, neither in the file nor
+# with the votes already recorded. The given ids must be new too.
+_STAGING_VALIDATE_SQL = [
+    f"""
+    UPDATE {_STAGING_TABLE} AS staging
+    SET question_id = polls_choice.question_id,
+        error = CASE
+            WHEN polls_choice.id IS NULL THEN 'unknown choice'
+            WHEN staging.expected_question_id <> polls_choice.question_id
+                THEN 'choice of another question'
+            WHEN owner.id IS NULL THEN 'unknown owner'
+        END
+    FROM {_STAGING_TABLE} AS input
+    LEFT JOIN polls_choice ON polls_choice.id = input.choice_id
+    LEFT JOIN {{user_table}} AS owner ON owner.id = input.owner_id
+    WHERE staging.line = input.line AND staging.error IS NULL
+    """,
+    f"""
+    UPDATE {_STAGING_TABLE} AS staging
+    SET error = 'repeated vote for the question'
+    FROM (
+        SELECT line, row_number() OVER (
+            PARTITION BY question_id, owner_id ORDER BY line
+        ) AS number
+        FROM {_STAGING_TABLE}
+        WHERE error IS NULL
+    ) AS repeated
+    WHERE staging.line = repeated.line AND repeated.number > 1
+    """,
+    f"""
+    UPDATE {_STAGING_TABLE} AS staging
+    SET error = 'already voted for the question'
+    FROM polls_vote
+    WHERE staging.error IS NULL
+      AND polls_vote.question_id = staging.question_id
+      AND polls_vote.owner_id = staging.owner_id
+    """,
+    f"""
+    UPDATE {_STAGING_TABLE} AS staging
+    SET error = 'vote id already used'
+    FROM (
+        SELECT line, row_number() OVER (PARTITION BY id ORDER BY line) AS number
+        FROM {_STAGING_TABLE}
+        WHERE error IS NULL AND id IS NOT NULL
+    ) AS used
+    WHERE staging.line = used.line
+      AND (
+        used.number > 1
+        OR EXISTS (SELECT FROM polls_vote WHERE polls_vote.id = staging.id)
+      )
+    """,
+]
+
+# Inserts the valid votes, and adds them to the hourly buckets and to the
+# counters of their choices, like _VOTES_INSERT_SQL and vote_counters_add do
+# for the votes of the API. Votes recorded meanwhile still win.
+_STAGING_MERGE_SQL = f"""
+WITH vote AS (
+    INSERT INTO polls_vote
+        (id, created, modified, date_voted, owner_id, question_id, choice_id)
+    SELECT COALESCE(id, gen_random_uuid()), %(now)s, %(now)s,
+           COALESCE(date_voted, %(now)s), owner_id, question_id, choice_id
+    FROM {_STAGING_TABLE}
+    WHERE error IS NULL
+    ORDER BY line
+    ON CONFLICT ON CONSTRAINT single_vote_for_question DO NOTHING
+    RETURNING question_id, choice_id, owner_id, date_voted
+), counted AS (
+    SELECT vote.question_id, vote.choice_id, vote.owner_id, vote.date_voted,
+           COALESCE(polls_question.vote_counter_shards, %(shards)s) AS shards
+    FROM vote
+    INNER JOIN polls_question ON polls_question.id = vote.question_id
+), bucket AS (
+    INSERT INTO polls_votebucket (question_id, choice_id, bucket, shard, count)
+    SELECT question_id, choice_id, date_trunc('hour', date_voted, 'UTC'),
+           owner_id %% shards, count(*)
+    FROM counted
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 2, 3, 4
+    ON CONFLICT ON CONSTRAINT single_vote_bucket_per_choice_shard
+    DO UPDATE SET count = polls_votebucket.count + excluded.count
+), unsharded AS (
+    UPDATE polls_choice
+    SET vote_count = polls_choice.vote_count + counter.delta
+    FROM (
+        SELECT choice_id, count(*) AS delta
+        FROM counted
+        WHERE shards <= 1
+        GROUP BY 1
+    ) AS counter
+    WHERE polls_choice.id = counter.choice_id
+), sharded AS (
+    INSERT INTO polls_votecountershard (choice_id, shard, count)
+    SELECT choice_id, owner_id %% shards, count(*)
+    FROM counted
+    WHERE shards > 1
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT ON CONSTRAINT single_counter_per_choice_shard
+    DO UPDATE SET count = polls_votecountershard.count + excluded.count
+)
+SELECT question_id, count(*) FROM counted GROUP BY 1
+"""
+
+
+class VoteImportResult(NamedTuple):
+    imported: int
+    # Number of rejected votes per reason.
+    rejected: Dict[str, int]
+    # The first rejected votes, as (line, reason).
+    errors: List[tuple]
+
+
+def _read_csv(file: TextIO) -> Iterator[tuple]:
+    reader = csv.DictReader(file)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _read_ndjson(file: TextIO) -> Iterator[tuple]:
+    for line, text in enumerate(file, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            yield line, ValueError("not a JSON object")
+        else:
+            yield line, record
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return r"\N"
+    # Free text, in the error messages.
+    return str(value).replace("\\", "\\\\").replace("\t", " ").replace("\n", " ")
+
+
+def _field(record: Dict[str, Any], field: str) -> Any:
+    value = record.get(field)
+    return str(value).strip() or None if value is not None else None
+
+
+def _staging_row(line: int, record) -> tuple:
+    """``(line, id, choice, owner, question, date_voted, error)``."""
+    try:
+        if isinstance(record, Exception):
+            raise record
+        values = {field: _field(record, field) for field in VOTE_IMPORT_FIELDS}
+        for field in ("choice", "owner"):
+            if values[field] is None:
+                raise ValueError(f"missing {field}")
+        date_voted = None
+        if values["date_voted"] is not None:
+            date_voted = parse_datetime(values["date_voted"])
+            if date_voted is None:
+                raise ValueError("invalid date_voted")
+            if timezone.is_naive(date_voted):
+                date_voted = timezone.make_aware(date_voted)
+        return (
+            line,
+            values["id"] and uuid.UUID(values["id"]),
+            uuid.UUID(values["choice"]),
+            int(values["owner"]),
+            values["question"] and uuid.UUID(values["question"]),
+            date_voted and date_voted.isoformat(),
+            None,
+        )
+    except (ValueError, TypeError, AttributeError) as exc:
+        return line, None, None, None, None, None, f"invalid row: {exc}"
+
+
+class _CopyStream:
+    """File-like object reading the lines of ``COPY ... FROM STDIN``."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self.lines = ("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+        self.buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        if size < 0:
+            return self.buffer + "".join(self.lines)
+        while len(self.buffer) < size:
+            chunk = "".join(itertools.islice(self.lines, 1000))
+            if not chunk:
+                break
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def votes_import(
+    *,
+    file: TextIO,
+    format: str,
+    dry_run: bool = False,
+    max_errors: int = 100,
+) -> VoteImportResult:
+    """
+    Import the votes of a CSV file with a header or of an NDJSON file, with
+    the ``VOTE_IMPORT_FIELDS`` of each vote, in a single transaction: they are
+    streamed with ``COPY`` into a temporary table, validated there with a
+    few set-based statements, then the valid ones are inserted, counted and
+    bucketed with a single statement. Invalid votes are skipped and reported.
+    Nothing is written if ``dry_run`` is set.
+    """
+    if format not in VOTE_IMPORT_FORMATS:
+        raise ValueError(f"Unknown format {format!r}.")
+    records = _read_csv(file) if format == "csv" else _read_ndjson(file)
+    rows = (_staging_row(line, record) for line, record in records)
+    user_table = connection.ops.quote_name(User._meta.db_table)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_STAGING_CREATE_SQL)
+            cursor.copy_expert(_STAGING_COPY_SQL, _CopyStream(rows))
+            # Temporary tables aren't analyzed automatically.
+            cursor.execute(f"ANALYZE {_STAGING_TABLE}")
+            for sql in _STAGING_VALIDATE_SQL:
+                cursor.execute(sql.format(user_table=user_table))
+
+            cursor.execute(f"SELECT count(*) FROM {_STAGING_TABLE} WHERE error IS NULL")
+            (valid,) = cursor.fetchone()
+            cursor.execute(
+                f"SELECT error, count(*) FROM {_STAGING_TABLE} "
+                f"WHERE error IS NOT NULL GROUP BY 1"
+            )
+            rejected = Counter(dict(cursor.fetchall()))
+            cursor.execute(
+                f"SELECT line, error FROM {_STAGING_TABLE} "
+                f"WHERE error IS NOT NULL ORDER BY line LIMIT %s",
+                [max_errors],
+            )
+            errors = cursor.fetchall()
+
+            if dry_run:
+                transaction.set_rollback(True)
+                return VoteImportResult(valid, dict(rejected), errors)
+
+            cursor.execute(
+                _STAGING_MERGE_SQL,
+                {"now": timezone.now(), "shards": settings.POLLS_VOTE_COUNTER_SHARDS},
+            )
+            imported = dict(cursor.fetchall())
+        vote_tallies_changed(question_pks=imported)
+
+    imported = sum(imported.values())
+    if imported < valid:
+        # Votes recorded since the validation.
+        rejected["already voted for the question"] += valid - imported
+    return VoteImportResult(imported, dict(rejected), errors)
@@ -0,0 +1,192 @@
+import uuid
+
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core import authentication
+from core.authentication import (
+    CachedTokenAuthentication,
+    LRUCache,
+    StatelessTokenAuthentication,
+    token_cache_clear,
+)
+from tests.polls.factories import ChoiceFactory
+from tests.users.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache_clear()
+    yield
+    token_cache_clear()
+
+
+@pytest.fixture()
+def token(db) -> Token:
+    return Token.objects.create(user=UserFactory())
+
+
+def authenticate(key):
+    return CachedTokenAuthentication().authenticate_credentials(key)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert [cache.get(key) for key in "abc"] == [1, None, 3]
+
+    def test_expires(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(authentication.time, "monotonic", lambda: now)
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+
+        now += 61
+
+        assert cache.get("a") is None
+
+
+class TestCachedTokenAuthentication:
+    def test_cached_after_first_request(self, token, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            user, auth = authenticate(token.key)
+        with django_assert_num_queries(0):
+            cached_user, cached_auth = authenticate(token.key)
+
+        assert (cached_user, cached_auth) == (user, auth) == (token.user, token)
+        # Every request gets its own instances.
+        assert cached_user is not user and cached_auth is not auth
+
+    def test_fail_invalid_token(self, db):
+        with pytest.raises(AuthenticationFailed):
+            authenticate("invalid")
+
+    def test_fail_after_logout(self, token):
+        authenticate(token.key)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        response = client.post("/api/auth/token/logout/")
+        assert response.status_code == 204
+        response = client.post(f"/api/polls/votes/{uuid.uuid4()}/")
+        assert response.status_code == 401
+
+    def test_fail_after_deactivation(self, token):
+        authenticate(token.key)
+        token.user.is_active = False
+        token.user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token.key)
+
+    def test_shared_cache(self, settings, token, django_assert_num_queries):
+        settings.AUTH_TOKEN_SHARED_CACHE = "default"
+        authenticate(token.key)
+        # Another process, with nothing in memory.
+        token_cache_clear()
+
+        with django_assert_num_queries(0):
+            user, _ = authenticate(token.key)
+        assert user == token.user
+
+        key = token.key
+        token.delete()
+        token_cache_clear()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(key)
+
+
+class TestStatelessTokenAuthentication:
+    """
+    POST /auth/jwt/create/
+    POST /auth/jwt/refresh/
+    POST /auth/jwt/blacklist/
+    Authorization: Bearer <access token>
+    """
+
+    @pytest.fixture()
+    def user(self, db):
+        return UserFactory()
+
+    @pytest.fixture()
+    def tokens(self, settings, user) -> dict:
+        settings.AUTH_STATELESS_TOKENS = True
+        response = APIClient().post(
+            "/api/auth/jwt/create/",
+            {"email": user.email, "password": "test_password"},
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    @staticmethod
+    def authenticate(access):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return StatelessTokenAuthentication().authenticate(request)
+
+    @staticmethod
+    def refresh(refresh):
+        return APIClient().post("/api/auth/jwt/refresh/", {"refresh": refresh})
+
+    def test_authenticate_without_queries(
+        self, user, tokens, django_assert_num_queries
+    ):
+        with django_assert_num_queries(0):
+            authenticated, _ = self.authenticate(tokens["access"])
+            assert (authenticated.pk, authenticated.username, authenticated.email) == (
+                user.pk,
+                user.username,
+                user.email,
+            )
+
+        # The other fields are loaded when needed, and saved only if loaded.
+        authenticated.first_name = "Changed"
+        authenticated.save()
+        user.refresh_from_db()
+        assert user.first_name == "Changed"
+        assert user.check_password("test_password")
+
+    def test_vote(self, tokens):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = client.post(f"/api/polls/votes/{ChoiceFactory().pk}/")
+        assert response.status_code == 201
+
+    def test_disabled_by_default(self, settings, tokens):
+        settings.AUTH_STATELESS_TOKENS = False
+
+        assert self.authenticate(tokens["access"]) is None
+        assert self.refresh(tokens["refresh"]).status_code == 404
+
+    def test_fail_invalid_access_token(self, tokens):
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(tokens["access"][:-1])
+
+    def test_refresh_once(self, tokens):
+        response = self.refresh(tokens["refresh"])
+        assert response.status_code == 200
+        assert self.authenticate(response.json()["access"]) is not None
+
+        assert self.refresh(tokens["refresh"]).status_code == 401
+        assert self.refresh(response.json()["refresh"]).status_code == 200
+
+    def test_fail_refresh_after_logout(self, tokens):
+        response = APIClient().post(
+            "/api/auth/jwt/blacklist/", {"refresh": tokens["refresh"]}
+        )
+        assert response.status_code == 200
+
+        assert self.refresh(tokens["refresh"]).status_code == 401
+
+    def test_fail_refresh_after_deactivation(self, user, tokens):
+        user.is_active = False
+        user.save()
+
+        assert self.refresh(tokens["refresh"]).status_code == 401
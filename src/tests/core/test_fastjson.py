@@ -0,0 +1,61 @@
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.fastjson import FastJSONParser, FastJSONRenderer
+
+PAYLOADS = [
+    None,
+    [],
+    {
+        "pk": uuid.uuid4(),
+        "created": datetime(2023, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        "modified": datetime(2023, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+        "naive": datetime(2023, 5, 1, 12, 30),
+        "date": date(2023, 5, 1),
+        "duration": timedelta(minutes=5),
+        "price": Decimal("1.10"),
+        "text": "Pizza \U0001f355 with\u2028separators\u2029",
+        "nested": OrderedDict([("b", 1), ("a", [1.5, True, None])]),
+        1: "non-string key",
+    },
+]
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_same_output(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_same_output_indented(self):
+        data = PAYLOADS[-1]
+        media_type = "application/json; indent=4"
+
+        assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(
+            data, media_type
+        )
+
+
+class TestFastJSONParser:
+    @staticmethod
+    def parse(parser, content: bytes):
+        return parser.parse(io.BytesIO(content))
+
+    def test_same_output(self):
+        content = JSONRenderer().render(PAYLOADS[-1])
+
+        assert self.parse(FastJSONParser(), content) == self.parse(
+            JSONParser(), content
+        )
+
+    @pytest.mark.parametrize("content", [b"{", b'{"a": NaN}', b"\xff"])
+    def test_parse_error(self, content):
+        with pytest.raises(ParseError):
+            self.parse(FastJSONParser(), content)
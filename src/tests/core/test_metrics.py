@@ -0,0 +1,115 @@
+import pytest
+from rest_framework.test import APIClient
+
+from core import metrics
+from tests.polls.factories import ChoiceFactory, QuestionFactory
+from tests.users.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_histograms():
+    for histogram in metrics.HISTOGRAMS:
+        histogram.clear()
+
+
+class TestHistogram:
+    def test_render(self):
+        histogram = metrics.Histogram("latency_seconds", "Latency.", (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, view='Quoted "view"')
+
+        assert list(histogram.render()) == [
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{view="Quoted \\"view\\"",le="0.1"} 2',
+            'latency_seconds_bucket{view="Quoted \\"view\\"",le="1"} 3',
+            'latency_seconds_bucket{view="Quoted \\"view\\"",le="+Inf"} 4',
+            'latency_seconds_sum{view="Quoted \\"view\\""} 3.65',
+            'latency_seconds_count{view="Quoted \\"view\\""} 4',
+        ]
+
+
+class TestMetricsMiddleware:
+    @pytest.fixture()
+    def question(self, db):
+        question = QuestionFactory()
+        ChoiceFactory.create_batch(2, question=question)
+        return question
+
+    def test_sampled(self, settings, question, django_assert_num_queries):
+        settings.METRICS_SAMPLE_RATE = 1
+
+        with django_assert_num_queries(3) as context:
+            response = APIClient().get(f"/api/polls/questions/{question.pk}/")
+
+        timings = dict(
+            timing.split(";", 1) for timing in response["Server-Timing"].split(", ")
+        )
+        assert timings.keys() == {"db", "render", "total"}
+        assert f'desc="{len(context)} queries"' in timings["db"]
+        [(labels, queries)] = [
+            (labels, value)
+            for suffix, labels, value in metrics.REQUEST_DB_QUERIES.samples()
+            if suffix == "_sum"
+        ]
+        assert labels == (("view", "QuestionViewSet.retrieve"),)
+        assert queries == len(context)
+        [size] = [
+            value
+            for suffix, _, value in metrics.RESPONSE_SIZE_BYTES.samples()
+            if suffix == "_sum"
+        ]
+        assert size == len(response.content)
+
+    def test_not_sampled(self, settings, question):
+        settings.METRICS_SAMPLE_RATE = 0
+
+        response = APIClient().get(f"/api/polls/questions/{question.pk}/")
+
+        assert "Server-Timing" not in response
+        assert list(metrics.REQUEST_DURATION_SECONDS.samples()) == []
+
+
+class TestMetricsAPI:
+    """
+    GET /metrics/
+
+    Bearer METRICS_TOKEN, or a staff user, is required.
+    """
+
+    uri = "/api/metrics/"
+
+    def test_200_scraper(self, settings, db):
+        settings.METRICS_SAMPLE_RATE = 1
+        settings.METRICS_TOKEN = "secret"
+        client = APIClient()
+        client.get("/api/polls/questions/")
+
+        response = client.get(self.uri, HTTP_AUTHORIZATION="Bearer secret")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/plain; charset=utf-8"
+        body = response.content.decode()
+        assert 'api_request_db_queries_count{view="QuestionViewSet.list"} 1' in body
+        assert "polls_vote_outbox_depth 0" in body
+
+    def test_200_staff(self, db):
+        client = APIClient()
+        client.force_authenticate(UserFactory(is_staff=True))
+
+        assert client.get(self.uri).status_code == 200
+
+    @pytest.mark.parametrize("token", ["", "secret"])
+    def test_401_wrong_token(self, settings, db, token):
+        settings.METRICS_TOKEN = token
+
+        response = APIClient().get(self.uri, HTTP_AUTHORIZATION="Bearer wrong")
+
+        assert response.status_code == 401
+        assert response["Content-Type"] == "application/json"
+
+    def test_403_not_staff(self, db):
+        client = APIClient()
+        client.force_authenticate(UserFactory())
+
+        assert client.get(self.uri).status_code == 403
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.db.models import Prefetch
+from django.utils import timezone as django_timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.polls.serializers import (
+    ChoiceDetailSerializer,
+    QuestionDetailSerializer,
+    QuestionListSerializer,
+    choice_detail_rows,
+    question_detail_rows,
+    question_list_rows,
+)
+from core.serializers import RowSerializer
+from db.polls.models import Choice, Question
+from tests.polls.factories import ChoiceFactory, QuestionFactory
+
+
+def render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+@pytest.fixture()
+def questions(db):
+    questions = QuestionFactory.create_batch(3)
+    # With and without microseconds.
+    Question.objects.filter(pk=questions[0].pk).update(
+        created=datetime(2023, 5, 1, 12, 30, tzinfo=timezone.utc)
+    )
+    for question in questions:
+        ChoiceFactory.create_batch(2, question=question)
+    return questions
+
+
+class TestRowSerializer:
+    def test_question_list(self, questions):
+        queryset = Question.objects.order_by("created")
+        expected = QuestionListSerializer(
+            queryset.select_related("owner"), many=True
+        ).data
+
+        rows = queryset.values(*question_list_rows.lookups)
+        assert render(question_list_rows.many(rows)) == render(expected)
+
+    def test_question_detail(self, questions):
+        question = Question.objects.prefetch_related(
+            Prefetch("choice_set", to_attr="choices")
+        ).get(pk=questions[0].pk)
+        expected = QuestionDetailSerializer(question).data
+
+        (row,) = Question.objects.filter(pk=question.pk).values(
+            *question_detail_rows.lookups
+        )
+        assert question_detail_rows.many_lookups == ["choices"]
+        row["choices"] = list(question.choice_set.values(*choice_detail_rows.lookups))
+        assert render(question_detail_rows.to_representation(row)) == render(expected)
+
+    def test_choice_detail(self, questions):
+        queryset = Choice.objects.order_by("text")
+        expected = ChoiceDetailSerializer(queryset, many=True).data
+
+        rows = queryset.values(*choice_detail_rows.lookups)
+        assert render(choice_detail_rows.many(rows)) == render(expected)
+
+    def test_current_timezone(self, questions):
+        queryset = Question.objects.order_by("created")
+        with django_timezone.override("Europe/Paris"):
+            expected = QuestionListSerializer(queryset, many=True).data
+            rows = queryset.values(*question_list_rows.lookups)
+            assert render(question_list_rows.many(rows)) == render(expected)
+
+    def test_other_fields_and_null(self):
+        class Serializer(serializers.Serializer):
+            number = serializers.FloatField()
+            date = serializers.DateTimeField(format="%Y")
+            text = serializers.CharField(source="other")
+
+        row = {"number": 1, "date": datetime(2023, 1, 1), "other": None}
+        data = RowSerializer(Serializer).to_representation(row)
+
+        assert data == {"number": 1.0, "date": "2023", "text": None}
@@ -1,6 +1,7 @@
 from typing import Any
 
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from db.common.types import UserModelType
@@ -76,3 +77,8 @@ def vote(user, choice_a) -> Vote:
         choice=choice_a,
         question=choice_a.question,
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
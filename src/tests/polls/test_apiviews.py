@@ -1,4 +1,11 @@
+import base64
+import csv
+import gzip
+import io
+import json
 import uuid
+from datetime import timedelta
+from urllib.parse import urlencode
 
 import pytest
 from django.core.exceptions import PermissionDenied, ValidationError
@@ -6,7 +13,10 @@ from django.http import Http404
 
 from api.polls import views
 from core import pagination
-from db.polls.models import Choice, Question
+from db.polls.models import Choice, Question, Vote
+from services.polls import perform_vote
+from tests.polls.factories import ChoiceFactory, QuestionFactory
+from tests.users.factories import UserFactory
 
 
 class TestQuestionList:
@@ -33,6 +43,133 @@ class TestQuestionList:
 
         assert response.status_code == 200
 
+    @pytest.mark.parametrize(
+        "ordering",
+        ["title", "-title", "text", "owner__username", "created", "-modified"],
+    )
+    def test_200_keyset_pages_cover_all_questions(self, api_client, user, ordering):
+        # Identical titles and texts make the tie-breaker matter.
+        questions = QuestionFactory.create_batch(
+            25, owner=user, title="Same title", text="Same text"
+        )
+        expected = {str(question.pk) for question in questions}
+
+        pages, uri = [], f"{self.uri}?ordering={ordering}"
+        while uri:
+            response = api_client.get(uri)
+            assert response.status_code == 200
+            pages.append([question["pk"] for question in response.json()["results"]])
+            uri = response.json()["next"]
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert {pk for page in pages for pk in page} == expected
+
+        back, uri = [], response.json()["previous"]
+        while uri:
+            response = api_client.get(uri)
+            back.insert(0, [question["pk"] for question in response.json()["results"]])
+            uri = response.json()["previous"]
+
+        assert back == pages[:-1]
+
+    @pytest.mark.parametrize(
+        "position", [b"garbage", b'["not a date", "not a uuid"]', b'["1", "2", "3"]']
+    )
+    def test_404_invalid_cursor(self, api_client, db, position):
+        cursor = base64.b64encode(urlencode({"p": position}).encode()).decode()
+        response = api_client.get(self.uri, {"cursor": cursor})
+
+        assert response.status_code == 404
+
+    def test_200_search_ranks_title_matches_first(self, api_client, user):
+        in_text = QuestionFactory(owner=user, title="Dinner", text="Best pizzas?")
+        in_title = QuestionFactory(owner=user, title="Pizza", text="Which topping?")
+        QuestionFactory(owner=user, title="Dessert", text="Ice cream or cake?")
+
+        response = api_client.get(self.uri, {"search": "pizza"})
+
+        assert response.status_code == 200
+        assert [question["pk"] for question in response.json()["results"]] == [
+            str(in_title.pk),
+            str(in_text.pk),
+        ]
+
+    def test_200_search_explicit_ordering(self, api_client, user):
+        QuestionFactory(owner=user, title="B pizza", text="Pizza pizza pizza")
+        QuestionFactory(owner=user, title="A pizza", text="Text")
+
+        response = api_client.get(self.uri, {"search": "pizza", "ordering": "title"})
+
+        titles = [question["title"] for question in response.json()["results"]]
+        assert titles == ["A pizza", "B pizza"]
+
+    def test_200_search_follows_updates(self, api_client, user, question):
+        question.title = "Renamed to something searchable"
+        question.save(update_fields=["title"])
+
+        response = api_client.get(self.uri, {"search": "searchable"})
+
+        assert [q["pk"] for q in response.json()["results"]] == [str(question.pk)]
+
+    def test_200_search_substring_mode(self, api_client, user):
+        by_title = QuestionFactory(owner=user, title="Pineapple on pizza")
+        by_owner = QuestionFactory(owner=UserFactory(username="pizzaiolo"))
+        QuestionFactory(owner=user, title="Unrelated")
+
+        for term, expected in (
+            ("NEAPP", [by_title]),
+            ("zzaio", [by_owner]),
+            ("apple zzaio", []),
+        ):
+            response = api_client.get(
+                self.uri, {"search": term, "search_mode": "substring"}
+            )
+            assert [q["pk"] for q in response.json()["results"]] == [
+                str(question.pk) for question in expected
+            ]
+
+    def test_200_search_keyset_pages_cover_all_matches(self, api_client, user):
+        # Ranks tie in groups of five, the tie-breaker orders each group.
+        questions = [
+            QuestionFactory(owner=user, title="Poll", text="poll " * (i % 5))
+            for i in range(25)
+        ]
+        QuestionFactory(owner=user, title="Other", text="Other")
+
+        pages, uri = [], f"{self.uri}?search=poll"
+        while uri:
+            response = api_client.get(uri)
+            assert response.status_code == 200
+            pages.append([question["pk"] for question in response.json()["results"]])
+            uri = response.json()["next"]
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert {pk for page in pages for pk in page} == {
+            str(question.pk) for question in questions
+        }
+
+    def test_200_selects_listed_columns_only(
+        self, api_client, user, django_assert_num_queries
+    ):
+        question = QuestionFactory(owner=user)
+        ChoiceFactory(question=question)
+
+        with django_assert_num_queries(1) as context:
+            response = api_client.get(self.uri, {"ordering": "owner__username"})
+
+        assert response.json()["results"] == [
+            {
+                "pk": str(question.pk),
+                "title": question.title,
+                "owner": {"pk": str(user.pk), "username": user.username},
+                "created": question.created.isoformat().replace("+00:00", "Z"),
+                "modified": question.modified.isoformat().replace("+00:00", "Z"),
+            }
+        ]
+        (sql,) = [query["sql"] for query in context.captured_queries]
+        assert "password" not in sql and "polls_choice" not in sql
+        assert '"polls_question"."text"' not in sql
+
 
 class TestQuestionCreate:
     """
@@ -51,6 +188,7 @@ class TestQuestionCreate:
 
             question = Question(title="blablabla", text="blablabla", owner=user)
             question.pk = uuid.uuid4()
+            question.choices = []
             return question
 
         monkeypatch.setattr(views, "question_create", create_mock)
@@ -92,6 +230,7 @@ class TestQuestionRetrieve:
 
     def test_200_question_exists(self, monkeypatch, api_client, question):
         def retrieve_mock(*args, **kwargs):
+            question.choices = list(question.choice_set.all())
             return question
 
         monkeypatch.setattr(views.QuestionViewSet, "get_object", retrieve_mock)
@@ -99,7 +238,7 @@ class TestQuestionRetrieve:
 
         assert response.status_code == 200
 
-    def test_404_non_existent_question(self, monkeypatch, api_client):
+    def test_404_non_existent_question(self, monkeypatch, api_client, db):
         def get_object(*args, **kwargs):
             raise Http404
 
@@ -109,6 +248,53 @@ class TestQuestionRetrieve:
 
         assert response.status_code == 404
 
+    def test_200_served_from_cache(self, monkeypatch, api_client, question):
+        response_miss = api_client.get(self.uri % question.pk)
+
+        def should_not_be_called(*args, **kwargs):
+            raise AssertionError("Cached question shouldn't be fetched!")
+
+        monkeypatch.setattr(views.QuestionViewSet, "get_object", should_not_be_called)
+        response_hit = api_client.get(self.uri % question.pk)
+
+        assert response_hit.status_code == 200
+        assert response_hit.json() == response_miss.json()
+
+    def test_200_written_by_another_process(self, api_client, question):
+        api_client.get(self.uri % question.pk)
+        # Not invalidated in the cache of this process.
+        Question.objects.filter(pk=question.pk).update(
+            title="New title", modified=question.modified + timedelta(seconds=1)
+        )
+
+        response = api_client.get(self.uri % question.pk)
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "New title"
+
+    def test_304_not_modified(self, api_client, question, choice_a, choice_b):
+        response = api_client.get(self.uri % question.pk)
+        assert response.has_header("Last-Modified")
+
+        response = api_client.get(
+            self.uri % question.pk, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_200_modified_when_choice_deleted(
+        self, api_client, question, choice_a, choice_b
+    ):
+        etag = api_client.get(self.uri % question.pk)["ETag"]
+        ChoiceFactory(question=question)
+        choice_b.delete()
+
+        response = api_client.get(self.uri % question.pk, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
 
 class TestQuestionUpdate:
     """
@@ -132,6 +318,7 @@ class TestQuestionUpdate:
         def update_mock(*args, **kwargs):
             question.title = updated_fields["title"]
             question.text = updated_fields["text"]
+            question.choices = list(question.choice_set.all())
             return question
 
         monkeypatch.setattr(views, "question_update", update_mock)
@@ -250,6 +437,19 @@ class TestVoteCreate:
 
         assert response.status_code == 201
 
+    def test_202_vote_buffered(self, monkeypatch, settings, api_client, user):
+        def should_not_be_called(*args, **kwargs):
+            raise AssertionError("Vote perform service shouldn't be called!")
+
+        monkeypatch.setattr(views, "perform_vote", should_not_be_called)
+        monkeypatch.setattr(views, "vote_enqueue", lambda **kwargs: None)
+        settings.POLLS_VOTE_INGESTION = "buffered"
+
+        api_client.force_authenticate(user)
+        response = api_client.post(self.uri)
+
+        assert response.status_code == 202
+
     def test_401_cannot_vote_unauthorized(self, monkeypatch, api_client):
         def should_not_be_called(*args, **kwargs):
             raise AssertionError("Vote perform service shouldn't be called!")
@@ -293,6 +493,54 @@ class TestVoteCreate:
         assert response.status_code == 404
 
 
+class TestVotesBatchCreate:
+    """
+    POST /polls/votes/batch/
+
+    HTTP authorization IS required.
+    """
+
+    uri = "/api/polls/votes/batch/"
+
+    def test_200_results_per_choice(self, api_client, user, choice_a, choice_b):
+        unknown = uuid.uuid4()
+
+        api_client.force_authenticate(user)
+        response = api_client.post(
+            self.uri,
+            data={"choices": [choice_a.pk, unknown, choice_b.pk]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"choice_pk": str(choice_a.pk), "status": 201},
+            {"choice_pk": str(unknown), "status": 404, "message": "Not found."},
+            {
+                "choice_pk": str(choice_b.pk),
+                "status": 400,
+                "message": "You can only vote once per poll.",
+            },
+        ]
+
+    @pytest.mark.parametrize("choices", [[], ["not a uuid"], [uuid.uuid4()] * 101])
+    def test_400_invalid_choices(self, api_client, user, choices):
+        api_client.force_authenticate(user)
+        response = api_client.post(self.uri, data={"choices": choices}, format="json")
+
+        assert response.status_code == 400
+
+    def test_401_cannot_vote_unauthorized(self, monkeypatch, api_client):
+        def should_not_be_called(*args, **kwargs):
+            raise AssertionError("Vote perform service shouldn't be called!")
+
+        monkeypatch.setattr(views, "perform_votes", should_not_be_called)
+
+        response = api_client.post(self.uri, data={"choices": [uuid.uuid4()]})
+
+        assert response.status_code == 401
+
+
 class TestVoteDelete:
     """
     DELETE /polls/votes/{id}/
@@ -348,3 +596,332 @@ class TestVoteDelete:
         response = api_client.delete(self.uri)
 
         assert response.status_code == 404
+
+
+class TestQuestionStatistics:
+    """
+    GET /polls/questions/{id}/statistics/
+
+    HTTP authorization is NOT required.
+    """
+
+    uri = "/api/polls/questions/%s/statistics/"
+
+    def test_200_votes_per_choice(self, api_client, user, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+
+        response = api_client.get(self.uri % choice_a.question_id)
+
+        assert response.status_code == 200
+        assert sorted(response.json(), key=lambda row: row["votes"]) == [
+            {"choice_pk": str(choice_b.pk), "votes": 0, "percentage": 0.0},
+            {"choice_pk": str(choice_a.pk), "votes": 1, "percentage": 100.0},
+        ]
+
+    def test_304_until_voted(self, api_client, user, another_user, choice_a):
+        etag = api_client.get(self.uri % choice_a.question_id)["ETag"]
+
+        response = api_client.get(
+            self.uri % choice_a.question_id, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+        perform_vote(choice_pk=choice_a.pk, user=another_user)
+        response = api_client.get(
+            self.uri % choice_a.question_id, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+
+    def test_404_non_existent_question(self, api_client, db):
+        response = api_client.get(self.uri % uuid.uuid4())
+
+        assert response.status_code == 404
+
+
+class TestQuestionTimeline:
+    """
+    GET /polls/questions/{id}/statistics/timeline/
+
+    HTTP authorization is NOT required.
+    """
+
+    uri = "/api/polls/questions/%s/statistics/timeline/"
+
+    def test_200_votes_per_hour(self, api_client, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        vote = Vote.objects.get()
+
+        response = api_client.get(self.uri % choice_a.question_id)
+
+        assert response.status_code == 200
+        hour = vote.date_voted.replace(minute=0, second=0, microsecond=0)
+        assert response.json() == [
+            {
+                "time": hour.isoformat().replace("+00:00", "Z"),
+                "choice_pk": str(choice_a.pk),
+                "votes": 1,
+            }
+        ]
+
+    def test_200_range(self, api_client, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        query = urlencode(
+            {
+                "granularity": "minute",
+                "since": "1999-12-31T00:00Z",
+                "until": "2000-01-01T00:00Z",
+            }
+        )
+
+        response = api_client.get(self.uri % choice_a.question_id + "?" + query)
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_400_unknown_granularity(self, api_client, question):
+        response = api_client.get(self.uri % question.pk + "?granularity=week")
+
+        assert response.status_code == 400
+        assert "granularity" in response.json()["extra"]["fields"]
+
+    @pytest.mark.parametrize(
+        "query, field",
+        [
+            ({"granularity": "minute"}, "since"),
+            (
+                {
+                    "granularity": "minute",
+                    "since": "1999-12-30T23:59Z",
+                    "until": "2000-01-01T00:00Z",
+                },
+                "until",
+            ),
+        ],
+    )
+    def test_400_unbounded_minutes(self, api_client, question, query, field):
+        response = api_client.get(self.uri % question.pk + "?" + urlencode(query))
+
+        assert response.status_code == 400
+        assert field in response.json()["extra"]["fields"]
+
+    def test_404_non_existent_question(self, api_client, db):
+        response = api_client.get(self.uri % uuid.uuid4())
+
+        assert response.status_code == 404
+
+
+class TestQuestionExport:
+    """
+    GET /polls/questions/{id}/export/
+    GET /polls/questions/export/
+
+    HTTP authorization is required, by the owner of the question or the staff
+    (the staff only for every question).
+    """
+
+    uri = "/api/polls/questions/%s/export/"
+    all_uri = "/api/polls/questions/export/"
+
+    @staticmethod
+    def content(response):
+        assert response.streaming
+        return b"".join(response.streaming_content)
+
+    def test_200_csv(self, api_client, user, another_user, question, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=another_user)
+        vote = Vote.objects.get()
+        api_client.force_authenticate(user)
+
+        response = api_client.get(self.uri % question.pk)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert response["Content-Disposition"] == (
+            f'attachment; filename="votes-{question.pk}.csv"'
+        )
+        assert self.content(response).decode().splitlines() == [
+            "id,question,choice,owner,date_voted",
+            f"{vote.pk},{question.pk},{choice_a.pk},{another_user.pk},"
+            f"{vote.date_voted.isoformat()}",
+        ]
+
+    def test_200_csv_formulas_escaped(self, api_client, user, question):
+        for text in ("=1+1", "@SUM(A1)", "+1", "-1", "Pizza"):
+            ChoiceFactory(question=question, text=text)
+        api_client.force_authenticate(user)
+
+        response = api_client.get(self.uri % question.pk + "?data=results")
+
+        assert response.status_code == 200
+        rows = csv.DictReader(io.StringIO(self.content(response).decode()))
+        assert sorted(row["text"] for row in rows) == [
+            "'+1",
+            "'-1",
+            "'=1+1",
+            "'@SUM(A1)",
+            "Pizza",
+        ]
+
+    def test_200_ndjson_results_gzip(self, api_client, user, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        api_client.force_authenticate(UserFactory(is_staff=True))
+        query = urlencode(
+            {"format": "ndjson", "data": "results", "compression": "gzip"}
+        )
+
+        response = api_client.get(self.all_uri + "?" + query)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/gzip"
+        assert response["Content-Disposition"] == (
+            'attachment; filename="results-all.ndjson.gz"'
+        )
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "question": str(choice_a.question_id),
+                "choice": str(choice.pk),
+                "text": choice.text,
+                "votes": votes,
+            }
+            for choice, votes in ((choice_a, 1), (choice_b, 0))
+        ]
+
+    def test_200_accept_header(self, api_client, user, question):
+        api_client.force_authenticate(user)
+
+        response = api_client.get(
+            self.uri % question.pk, HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+        assert self.content(response) == b""
+
+    def test_400_unknown_data(self, api_client, user, question):
+        api_client.force_authenticate(user)
+
+        response = api_client.get(self.uri % question.pk + "?data=users")
+
+        assert response.status_code == 400
+        assert response["Content-Type"] == "application/json"
+        assert "data" in response.json()["extra"]["fields"]
+
+    def test_401_not_authenticated(self, api_client, question):
+        response = api_client.get(self.uri % question.pk)
+
+        assert response.status_code == 401
+
+    def test_403_not_owner(self, api_client, another_user, question):
+        api_client.force_authenticate(another_user)
+
+        assert api_client.get(self.uri % question.pk).status_code == 403
+        assert api_client.get(self.all_uri).status_code == 403
+
+    def test_404_non_existent_question(self, api_client, user):
+        api_client.force_authenticate(user)
+
+        response = api_client.get(self.uri % uuid.uuid4())
+
+        assert response.status_code == 404
+
+
+class TestChoiceList:
+    """
+    GET /polls/questions/{id}/choices/
+
+    HTTP authorization is NOT required.
+    """
+
+    uri = "/api/polls/questions/%s/choices/"
+
+    def test_304_not_modified(self, api_client, choice_a, choice_b):
+        response = api_client.get(self.uri % choice_a.question_id)
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+        response = api_client.get(
+            self.uri % choice_a.question_id,
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        assert response.status_code == 304
+
+    def test_200_modified_when_choice_updated(self, api_client, choice_a, choice_b):
+        etag = api_client.get(self.uri % choice_a.question_id)["ETag"]
+        choice_a.text = "C"
+        choice_a.save()
+
+        response = api_client.get(
+            self.uri % choice_a.question_id, HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+
+
+class TestChoiceCreate:
+    """
+    POST /polls/questions/{id}/choices/
+
+    HTTP authorization IS required.
+    """
+
+    uri = "/api/polls/questions/%s/choices/"
+
+    def test_201_created_successfully(self, api_client, user, choice_a, choice_b):
+        api_client.force_authenticate(user)
+        response = api_client.post(
+            self.uri % choice_a.question_id, data={"choices": ["C"]}
+        )
+
+        assert response.status_code == 201
+        assert [choice["text"] for choice in response.json()] == ["C"]
+
+
+class TestChoicesReplace:
+    """
+    PUT /polls/questions/{id}/choices/
+
+    HTTP authorization IS required.
+    """
+
+    uri = "/api/polls/questions/%s/choices/"
+
+    def test_201_replaced_successfully(self, api_client, user, choice_a, choice_b):
+        api_client.force_authenticate(user)
+        response = api_client.put(
+            self.uri % choice_a.question_id, data={"choices": ["C", "D"]}
+        )
+
+        assert response.status_code == 201
+        assert sorted(choice["text"] for choice in response.json()) == ["C", "D"]
+
+    def test_401_cannot_replace_unauthorized(self, api_client, choice_a):
+        response = api_client.put(
+            self.uri % choice_a.question_id, data={"choices": ["C", "D"]}
+        )
+
+        assert response.status_code == 401
+
+
+class TestChoiceRetrieve:
+    """
+    GET /polls/questions/{id}/choices/{id}/
+
+    HTTP authorization is NOT required.
+    """
+
+    uri = "/api/polls/questions/%s/choices/%s/"
+
+    def test_304_not_modified(self, api_client, choice_a):
+        uri = self.uri % (choice_a.question_id, choice_a.pk)
+        etag = api_client.get(uri)["ETag"]
+
+        response = api_client.get(uri, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_404_choice_of_another_question(self, api_client, choice_a):
+        response = api_client.get(self.uri % (uuid.uuid4(), choice_a.pk))
+
+        assert response.status_code == 404
@@ -0,0 +1,153 @@
+import asyncio
+import uuid
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncRequestFactory
+
+from api.polls import async_views
+from api.polls.urls import ASYNC_READS, questions_router, with_async_reads
+from api.polls.views import QuestionViewSet
+from core.async_views import async_reads
+
+
+@pytest.fixture(autouse=True)
+def db_in_request_thread(settings):
+    # Threads of their own wouldn't see the data of the test transaction.
+    settings.API_ASYNC_READS_DB_THREADS = 0
+
+
+def call(view, headers=None, **kwargs):
+    request = AsyncRequestFactory().get("/", headers=headers)
+    return async_to_sync(view)(request, **kwargs)
+
+
+def assert_same_response(response, expected):
+    assert response.status_code == expected.status_code
+    assert response.content == expected.content
+    for header in ("Content-Type", "ETag", "Last-Modified"):
+        assert response.headers.get(header) == expected.headers.get(header)
+
+
+class TestAsyncReads:
+    """
+    The async views answer like the GET actions of QuestionViewSet and
+    ChoiceViewSet.
+    """
+
+    def test_question_retrieve(self, api_client, question, choice_a, choice_b):
+        expected = api_client.get(f"/api/polls/questions/{question.pk}/")
+        cache.clear()
+
+        response = call(async_views.question_retrieve, pk=str(question.pk))
+        assert_same_response(response, expected)
+        # Now from the cache.
+        response = call(async_views.question_retrieve, pk=str(question.pk))
+        assert_same_response(response, expected)
+
+    def test_question_statistics(self, api_client, question, vote, choice_b):
+        expected = api_client.get(f"/api/polls/questions/{question.pk}/statistics/")
+
+        response = call(async_views.question_statistics, pk=str(question.pk))
+        assert_same_response(response, expected)
+
+    def test_choice_list(self, api_client, question, choice_a, choice_b):
+        expected = api_client.get(f"/api/polls/questions/{question.pk}/choices/")
+
+        response = call(async_views.choice_list, question_pk=str(question.pk))
+        assert_same_response(response, expected)
+
+    def test_choice_retrieve(self, api_client, question, choice_a):
+        expected = api_client.get(
+            f"/api/polls/questions/{question.pk}/choices/{choice_a.pk}/"
+        )
+
+        response = call(
+            async_views.choice_retrieve,
+            question_pk=str(question.pk),
+            pk=str(choice_a.pk),
+        )
+        assert_same_response(response, expected)
+
+    @pytest.mark.parametrize("pk", [uuid.uuid4(), "not-a-uuid"])
+    def test_404(self, api_client, db, pk):
+        expected = api_client.get(f"/api/polls/questions/{pk}/")
+
+        for view in (async_views.question_retrieve, async_views.question_statistics):
+            response = call(view, pk=str(pk))
+            assert_same_response(response, expected)
+        assert expected.status_code == 404
+
+    def test_304_not_modified(self, question, choice_a):
+        response = call(async_views.question_retrieve, pk=str(question.pk))
+
+        response = call(
+            async_views.question_retrieve,
+            headers={"If-None-Match": response["ETag"]},
+            pk=str(question.pk),
+        )
+        assert response.status_code == 304
+
+
+class TestQuestionStatisticsLive:
+    """
+    URI: /api/polls/questions/{pk}/statistics/live/
+    Auth: not required
+    """
+
+    def test_stream(self, api_client, user, question, vote, choice_b):
+        expected = api_client.get(f"/api/polls/questions/{question.pk}/statistics/")
+
+        async def read():
+            request = AsyncRequestFactory().get("/")
+            response = await async_views.question_statistics_live(request, question.pk)
+            events = aiter(response.streaming_content)
+            chunks = [await anext(events), await anext(events)]
+            await events.aclose()
+            return response, chunks
+
+        response, chunks = async_to_sync(read)()
+
+        assert response["Content-Type"] == "text/event-stream"
+        assert chunks == [
+            b"retry: 1000\n\n",
+            b"event: statistics\ndata: " + expected.content + b"\n\n",
+        ]
+
+    @pytest.mark.parametrize("pk", [uuid.uuid4(), "not-a-uuid"])
+    def test_404(self, db, pk):
+        response = call(async_views.question_statistics_live, pk=pk)
+
+        assert response.status_code == 404
+
+
+class TestAsyncReadsRouting:
+    def test_disabled(self, settings):
+        settings.API_ASYNC_READS = False
+        assert with_async_reads(questions_router.urls) == questions_router.urls
+
+    def test_enabled(self, settings):
+        settings.API_ASYNC_READS = True
+        urls = {url.name: url for url in with_async_reads(questions_router.urls)}
+
+        async_urls = {
+            name
+            for name, url in urls.items()
+            if asyncio.iscoroutinefunction(url.callback)
+        }
+        assert async_urls == set(ASYNC_READS) & set(urls)
+        # Still described by the viewset in the schema.
+        for url in urls.values():
+            assert url.callback.cls is QuestionViewSet
+
+    def test_delegates_writes(self, rf):
+        def view(request, **kwargs):
+            return request.method
+
+        async def read(request, **kwargs):
+            raise AssertionError
+
+        dispatch = async_reads(view, read=read)
+
+        assert async_to_sync(dispatch)(rf.delete("/")) == "DELETE"
@@ -0,0 +1,262 @@
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.polls import urls
+from db.common.types import UserModelType
+from db.polls.models import CHOICES_MIN_NUMBER, Choice, Question, Vote
+from services.polls import vote_buckets_rebuild
+from services.polls.vote import votes_insert
+from tests.polls.factories import QuestionFactory
+
+User: UserModelType = get_user_model()
+
+# Numbers of related rows each endpoint is measured with.
+SCALES = (1, 10, 100)
+
+
+class Request(NamedTuple):
+    path: str
+    user: Optional[UserModelType] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+class Budget(NamedTuple):
+    """
+    At most ``max_queries`` queries for ``method`` on the route named
+    ``route``, whatever the number of related rows ``scenario(n)`` creates
+    before returning the request to measure.
+    """
+
+    route: str
+    method: str
+    max_queries: int
+    scenario: Callable[[int], Request]
+
+    def __str__(self):
+        return f"{self.method.upper()} {self.route}"
+
+
+def users(count: int, **fields):
+    # Unique emails, unlike the random ones of UserFactory at these scales.
+    return User.objects.bulk_create(
+        User(username=name, email=f"{name}@example.com", **fields)
+        for name in (f"budget_{uuid.uuid4().hex}" for _ in range(count))
+    )
+
+
+def user(**fields) -> UserModelType:
+    (user,) = users(1, **fields)
+    return user
+
+
+def poll(*, choices: int = 2, votes: int = 0) -> Question:
+    """A question with ``choices`` choices, the first one with ``votes`` votes."""
+    question = QuestionFactory(owner=user())
+    Choice.objects.bulk_create(
+        Choice(question=question, text=f"Choice #{i}") for i in range(choices)
+    )
+    if votes:
+        choice = question.choice_set.order_by("text").first()
+        votes_insert(votes=[(choice.pk, user.pk) for user in users(votes)])
+    return question
+
+
+def first_choice(question: Question) -> Choice:
+    return question.choice_set.order_by("text").first()
+
+
+def questions_page(n):
+    QuestionFactory.create_batch(n, owner=user())
+    return Request("/api/polls/questions/")
+
+
+def question_create(n):
+    return Request(
+        "/api/polls/questions/",
+        user(),
+        {"title": "Title", "text": "Text", "choices": ["A", "B"]},
+    )
+
+
+def question_detail(n, data=None):
+    question = poll(choices=n)
+    return Request(f"/api/polls/questions/{question.pk}/", question.owner, data)
+
+
+def question_votes(n, suffix):
+    question = poll(votes=n)
+    return Request(f"/api/polls/questions/{question.pk}/{suffix}")
+
+
+def question_timeline(n):
+    question = poll(votes=n)
+    # One vote per hour.
+    for i, vote in enumerate(Vote.objects.filter(question=question)):
+        Vote.objects.filter(pk=vote.pk).update(
+            date_voted=vote.date_voted - timedelta(hours=i)
+        )
+    vote_buckets_rebuild(question_pk=question.pk)
+    return Request(f"/api/polls/questions/{question.pk}/statistics/timeline/")
+
+
+def choices(n, data=None):
+    question = poll(votes=n)
+    return Request(f"/api/polls/questions/{question.pk}/choices/", question.owner, data)
+
+
+def choice_detail(n, data=None):
+    # One more than the minimum, to be able to delete it.
+    question = poll(choices=CHOICES_MIN_NUMBER + 1, votes=n)
+    choice = first_choice(question)
+    return Request(
+        f"/api/polls/questions/{question.pk}/choices/{choice.pk}/",
+        question.owner,
+        data,
+    )
+
+
+def question_export(n):
+    question = poll(votes=n)
+    return Request(f"/api/polls/questions/{question.pk}/export/", question.owner)
+
+
+def questions_export(n):
+    poll(votes=n)
+    return Request("/api/polls/questions/export/", user(is_staff=True))
+
+
+def votes_batch(n):
+    choice_pks = [first_choice(poll()).pk for _ in range(n)]
+    return Request("/api/polls/votes/batch/", user(), {"choices": choice_pks})
+
+
+def vote(n):
+    choice = first_choice(poll(votes=n))
+    return Request(f"/api/polls/votes/{choice.pk}/", user())
+
+
+def vote_cancel(n):
+    choice = first_choice(poll(votes=n))
+    voter = Vote.objects.filter(choice=choice).first().owner
+    return Request(f"/api/polls/votes/{choice.pk}/", voter)
+
+
+# Questions with n choices have too many choices to be updated, and too many
+# can't be added or replaced, so the choice endpoints scale with the votes.
+BUDGETS = [
+    Budget("question-list", "get", 1, questions_page),
+    Budget("question-list", "post", 4, question_create),
+    Budget("question-detail", "get", 3, question_detail),
+    Budget(
+        "question-detail",
+        "put",
+        4,
+        lambda n: question_detail(n, {"title": "New title", "text": "New text"}),
+    ),
+    Budget(
+        "question-detail",
+        "patch",
+        4,
+        lambda n: question_detail(n, {"title": "New title"}),
+    ),
+    Budget("question-detail", "delete", 11, question_detail),
+    Budget(
+        "question-statistics",
+        "get",
+        2,
+        lambda n: question_votes(n, "statistics/"),
+    ),
+    Budget("question-timeline", "get", 2, question_timeline),
+    Budget("question-export", "get", 2, question_export),
+    Budget("question-export-all", "get", 1, questions_export),
+    Budget("question-choices-list", "get", 2, choices),
+    Budget(
+        "question-choices-list", "post", 3, lambda n: choices(n, {"choices": ["C"]})
+    ),
+    Budget(
+        "question-choices-list",
+        "put",
+        10,
+        lambda n: choices(n, {"choices": ["C", "D"]}),
+    ),
+    Budget("question-choices-detail", "get", 2, choice_detail),
+    Budget(
+        "question-choices-detail",
+        "put",
+        4,
+        lambda n: choice_detail(n, {"text": "New text"}),
+    ),
+    Budget(
+        "question-choices-detail",
+        "patch",
+        4,
+        lambda n: choice_detail(n, {"text": "New text"}),
+    ),
+    Budget("question-choices-detail", "delete", 8, choice_detail),
+    Budget("votes-batch", "post", 4, votes_batch),
+    Budget("vote", "post", 4, vote),
+    Budget("vote", "delete", 6, vote_cancel),
+]
+
+
+def routes(patterns):
+    """``(name, method)`` of the routes of ``patterns``."""
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from routes(pattern.url_patterns)
+            continue
+        view = pattern.callback
+        methods = getattr(view, "actions", None) or {
+            method: method
+            for method in view.view_class.http_method_names
+            if hasattr(view.view_class, method)
+        }
+        # HEAD and OPTIONS are answered without querying.
+        for method in methods:
+            if method not in ("head", "options"):
+                yield pattern.name, method
+
+
+class TestQueryBudgets:
+    """
+    The number of queries of every route of api/polls/urls.py is bounded,
+    and doesn't depend on the number of related rows.
+    """
+
+    def test_every_route_has_a_budget(self):
+        assert set(routes(urls.urlpatterns)) == {
+            (budget.route, budget.method) for budget in BUDGETS
+        }
+
+    @pytest.mark.parametrize("budget", BUDGETS, ids=str)
+    def test_budget(self, db, budget):
+        counts = {}
+        for n in SCALES:
+            request = budget.scenario(n)
+            client = APIClient()
+            if request.user is not None:
+                client.force_authenticate(request.user)
+            cache.clear()
+
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(client, budget.method)(
+                    request.path, request.data, format="json"
+                )
+                if response.streaming:
+                    content = b"".join(response.streaming_content)
+
+            assert response.status_code < 400, (
+                content if response.streaming else response.content
+            )
+            counts[n] = len(context)
+
+        assert max(counts.values()) <= budget.max_queries, counts
+        assert len(set(counts.values())) == 1, f"Grows with the data: {counts}"
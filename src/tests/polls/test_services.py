@@ -1,16 +1,40 @@
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from django.core.exceptions import PermissionDenied, ValidationError
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.exceptions import NON_FIELD_ERRORS, PermissionDenied, ValidationError
+from django.db.models import Sum
 
-from db.polls.models import Question
+from db.polls.models import Choice, Question, Vote, VoteBucket, VoteOutbox
 from services.polls import (
     cancel_vote,
+    choice_delete,
+    choice_update,
     choices_create,
+    choices_replace,
     perform_vote,
+    perform_votes,
+    question_cache_get_or_set,
+    question_cache_stats,
     question_create,
     question_destroy,
     question_update,
+    tallies,
+    vote_buckets_rebuild,
+    vote_counts_reconcile,
+    vote_enqueue,
+    vote_outbox_drain,
+    vote_outbox_stats,
+    vote_tallies_stream,
+    votes_import,
+    votes_per_question,
+    votes_timeline,
 )
-from tests.polls.factories import WrongChoice
+from tests.polls.factories import ChoiceFactory, VoteFactory, WrongChoice
+from tests.users.factories import UserFactory
 
 
 def get_default(value, default):
@@ -26,6 +50,19 @@ class TestQuestionCreate:
         for choice in question.choice_set.all():
             assert choice.text in choices
 
+    def test_constant_number_of_queries(
+        self, user, question_with_choices_dict, django_assert_num_queries
+    ):
+        # SAVEPOINT, INSERT question, INSERT choices, RELEASE SAVEPOINT.
+        with django_assert_num_queries(4):
+            question = question_create(**question_with_choices_dict, created_by=user)
+            assert [choice.text for choice in question.choices] == list(
+                question_with_choices_dict["choices"]
+            )
+            assert question.owner.username == user.username
+
+        assert question.choice_set.count() == len(question_with_choices_dict["choices"])
+
 
 class TestCreateChoiceInstances:
     def test_created_successfully(self, question, choice_list):
@@ -34,6 +71,15 @@ class TestCreateChoiceInstances:
         for choice_instance in instances:
             assert choice_instance.text in choice_list
 
+    def test_single_insert(self, question, choice_a, django_assert_num_queries):
+        # SELECT existing texts, INSERT choices.
+        with django_assert_num_queries(2):
+            choices_create(question=question, new_choices=["B", "C", "D"])
+
+    def test_fail_identical_to_existing_choice(self, question, choice_a):
+        with pytest.raises(ValidationError):
+            choices_create(question=question, new_choices=["A", "B"])
+
     def test_fail_too_many_choices(self, question):
         self.fail(question, WrongChoice.list_too_long)
 
@@ -97,6 +143,46 @@ class TestPerformVote:
         with pytest.raises(ValidationError):
             perform_vote(choice_pk=choice_b.pk, user=user)
 
+    def test_fail_second_vote_error(self, user, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        with pytest.raises(ValidationError) as exc_info:
+            perform_vote(choice_pk=choice_b.pk, user=user)
+        assert exc_info.value.message_dict == {
+            NON_FIELD_ERRORS: ["You can only vote once per poll."]
+        }
+
+    @pytest.mark.parametrize("choice_pk", [uuid.uuid4(), "not a uuid"])
+    def test_fail_choice_does_not_exist(self, user, choice_pk):
+        with pytest.raises(Choice.DoesNotExist):
+            perform_vote(choice_pk=choice_pk, user=user)
+        assert not Vote.objects.exists()
+
+    def test_single_insert(self, user, choice_a, django_assert_num_queries):
+        # SAVEPOINT, INSERT vote, UPDATE counter, RELEASE SAVEPOINT.
+        with django_assert_num_queries(4):
+            perform_vote(choice_pk=choice_a.pk, user=user)
+        vote = Vote.objects.get()
+        assert (vote.choice, vote.question, vote.owner) == (
+            choice_a,
+            choice_a.question,
+            user,
+        )
+
+    def test_vote_count_incremented(self, user, another_user, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        perform_vote(choice_pk=choice_a.pk, user=another_user)
+        choice_a.refresh_from_db()
+        choice_b.refresh_from_db()
+        assert choice_a.vote_count == 2
+        assert choice_b.vote_count == 0
+
+    def test_vote_count_unchanged_on_failure(self, user, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        with pytest.raises(ValidationError):
+            perform_vote(choice_pk=choice_b.pk, user=user)
+        choice_b.refresh_from_db()
+        assert choice_b.vote_count == 0
+
 
 class TestCancelVote:
     def test_cancel_vote_successfully(self, user, vote):
@@ -109,3 +195,640 @@ class TestCancelVote:
         vote.delete()
         with pytest.raises(ValidationError):
             cancel_vote(choice_pk=choice.pk, user=user)
+
+    def test_vote_count_decremented(self, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        cancel_vote(choice_pk=choice_a.pk, user=user)
+        choice_a.refresh_from_db()
+        assert choice_a.vote_count == 0
+
+
+class TestPerformVotes:
+    def test_results_per_choice(self, user, question, choice_a, choice_b):
+        other_choice = ChoiceFactory()
+        voted_choice = ChoiceFactory()
+        VoteFactory(owner=user, choice=voted_choice, question=voted_choice.question)
+        unknown = uuid.uuid4()
+
+        results = perform_votes(
+            choice_pks=[
+                choice_a.pk,
+                unknown,
+                choice_b.pk,
+                other_choice.pk,
+                voted_choice.pk,
+            ],
+            user=user,
+        )
+
+        assert [result.choice_pk for result in results] == [
+            choice_a.pk,
+            unknown,
+            choice_b.pk,
+            other_choice.pk,
+            voted_choice.pk,
+        ]
+        errors = [type(result.error) for result in results]
+        assert errors == [
+            type(None),
+            Choice.DoesNotExist,
+            ValidationError,
+            type(None),
+            ValidationError,
+        ]
+        assert set(
+            Vote.objects.filter(owner=user).values_list("choice", flat=True)
+        ) == {
+            choice_a.pk,
+            other_choice.pk,
+            voted_choice.pk,
+        }
+
+    def test_vote_counts_incremented(self, settings, user, choice_a, choice_b):
+        sharded_choice = ChoiceFactory()
+        settings.POLLS_VOTE_COUNTER_SHARDS = 1
+        sharded_choice.question.vote_counter_shards = 4
+        sharded_choice.question.save()
+
+        perform_votes(choice_pks=[choice_a.pk, sharded_choice.pk], user=user)
+
+        statistics = {
+            row["pk"]: row["votes"]
+            for row in votes_per_question(question=choice_a.question)
+        }
+        assert statistics == {choice_a.pk: 1, choice_b.pk: 0}
+        assert [
+            row["votes"] for row in votes_per_question(question=sharded_choice.question)
+        ] == [1]
+        assert vote_counts_reconcile() == []
+
+    def test_constant_number_of_queries(self, user, django_assert_num_queries):
+        choices = [ChoiceFactory() for _ in range(10)]
+
+        # SAVEPOINT, INSERT votes, UPDATE counters, RELEASE SAVEPOINT.
+        with django_assert_num_queries(4):
+            perform_votes(choice_pks=[choice.pk for choice in choices], user=user)
+
+
+class TestVoteOutbox:
+    def test_enqueue_does_not_vote(self, user, choice_a):
+        vote_enqueue(choice_pk=choice_a.pk, user=user)
+        assert not Vote.objects.exists()
+        assert vote_outbox_stats()["depth"] == 1
+
+    def test_fail_enqueue_choice_does_not_exist(self, user, db):
+        with pytest.raises(Choice.DoesNotExist):
+            vote_enqueue(choice_pk=uuid.uuid4(), user=user)
+
+    def test_drain_keeps_single_vote_per_question(
+        self, user, another_user, choice_a, choice_b
+    ):
+        vote_enqueue(choice_pk=choice_a.pk, user=user)
+        vote_enqueue(choice_pk=choice_b.pk, user=user)
+        vote_enqueue(choice_pk=choice_b.pk, user=another_user)
+        vote_enqueue(choice_pk=choice_a.pk, user=another_user)
+
+        assert vote_outbox_drain(batch_size=2) == 2
+        assert vote_outbox_drain() == 2
+        assert vote_outbox_drain() == 0
+
+        assert set(Vote.objects.values_list("owner", "choice")) == {
+            (user.pk, choice_a.pk),
+            (another_user.pk, choice_b.pk),
+        }
+        assert vote_counts_reconcile() == []
+        assert vote_outbox_stats() == {"depth": 0, "lag_seconds": 0.0}
+
+    def test_drain_drops_repeated_vote(self, user, vote, choice_b):
+        vote_enqueue(choice_pk=choice_b.pk, user=user)
+
+        assert vote_outbox_drain() == 1
+        assert list(Vote.objects.all()) == [vote]
+
+    def test_cancel_pending_vote(self, user, choice_a):
+        vote_enqueue(choice_pk=choice_a.pk, user=user)
+        cancel_vote(choice_pk=choice_a.pk, user=user)
+
+        assert vote_outbox_drain() == 0
+        assert not Vote.objects.exists()
+
+
+class TestVotesPerQuestion:
+    def test_counts_per_choice(self, user, another_user, question, choice_a, choice_b):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        perform_vote(choice_pk=choice_b.pk, user=another_user)
+        statistics = {
+            row["pk"]: row["votes"] for row in votes_per_question(question=question)
+        }
+        assert statistics == {choice_a.pk: 1, choice_b.pk: 1}
+
+    def test_percentages(self, question, choice_a, choice_b):
+        for user in UserFactory.create_batch(3):
+            perform_vote(choice_pk=choice_a.pk, user=user)
+        perform_vote(choice_pk=choice_b.pk, user=UserFactory())
+
+        statistics = {
+            row["pk"]: row["percentage"]
+            for row in votes_per_question(question=question)
+        }
+        assert statistics == {choice_a.pk: 75.0, choice_b.pk: 25.0}
+
+    def test_no_votes(self, question, choice_a):
+        [row] = votes_per_question(question=question)
+        assert row["percentage"] == 0
+
+
+class TestVoteBuckets:
+    @staticmethod
+    def buckets(question):
+        """Number of votes per choice and hour, summed across the shards."""
+        rows = (
+            VoteBucket.objects.filter(question=question)
+            .values_list("choice", "bucket")
+            .annotate(total=Sum("count"))
+        )
+        return {(choice, bucket): total for choice, bucket, total in rows if total}
+
+    @staticmethod
+    def hour(vote):
+        return vote.date_voted.replace(minute=0, second=0, microsecond=0)
+
+    @pytest.mark.parametrize("shards", [1, 4])
+    def test_maintained_by_votes(
+        self, settings, shards, user, another_user, question, choice_a, choice_b
+    ):
+        settings.POLLS_VOTE_COUNTER_SHARDS = shards
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        perform_votes(choice_pks=[choice_a.pk], user=another_user)
+        hour = self.hour(Vote.objects.get(owner=user))
+        assert self.buckets(question) == {(choice_a.pk, hour): 2}
+
+        cancel_vote(choice_pk=choice_a.pk, user=user)
+        perform_vote(choice_pk=choice_b.pk, user=user)
+        assert self.buckets(question) == {
+            (choice_a.pk, hour): 1,
+            (choice_b.pk, hour): 1,
+        }
+
+    def test_drained_votes(self, user, question, choice_a):
+        vote_enqueue(choice_pk=choice_a.pk, user=user)
+        vote_outbox_drain()
+
+        hour = self.hour(Vote.objects.get())
+        assert self.buckets(question) == {(choice_a.pk, hour): 1}
+
+    def test_drained_votes_keep_the_time_they_were_cast(self, user, question, choice_a):
+        vote_enqueue(choice_pk=choice_a.pk, user=user)
+        # Drained three hours later.
+        enqueued = VoteOutbox.objects.get().created - timedelta(hours=3)
+        VoteOutbox.objects.update(created=enqueued)
+        vote_outbox_drain()
+
+        vote = Vote.objects.get()
+        assert vote.date_voted == enqueued
+        assert self.buckets(question) == {(choice_a.pk, self.hour(vote)): 1}
+
+    def test_rebuild(self, user, another_user, question, choice_a, choice_b):
+        # Votes created bypassing the services aren't in the buckets.
+        vote = VoteFactory(owner=user, choice=choice_a, question=question)
+        perform_vote(choice_pk=choice_b.pk, user=another_user)
+        Vote.objects.filter(pk=vote.pk).update(
+            date_voted=vote.date_voted - timedelta(hours=1)
+        )
+        vote.refresh_from_db()
+
+        assert vote_buckets_rebuild(question_pk=question.pk) == 2
+        assert self.buckets(question) == {
+            (choice_a.pk, self.hour(vote)): 1,
+            (choice_b.pk, self.hour(Vote.objects.get(owner=another_user))): 1,
+        }
+        assert vote_buckets_rebuild() == 2
+
+
+class TestVotesTimeline:
+    T = datetime(2024, 5, 1, 12, 30, 10, tzinfo=timezone.utc)
+
+    @pytest.fixture()
+    def votes(self, question, choice_a, choice_b):
+        for choice, date_voted in [
+            (choice_a, self.T - timedelta(hours=2, minutes=25)),
+            (choice_a, self.T),
+            (choice_b, self.T + timedelta(seconds=50)),
+        ]:
+            vote = VoteFactory(choice=choice, question=question)
+            Vote.objects.filter(pk=vote.pk).update(date_voted=date_voted)
+        vote_buckets_rebuild(question_pk=question.pk)
+
+    # The longest range of minutes, around the votes.
+    day = {"since": T - timedelta(hours=12), "until": T + timedelta(hours=12)}
+
+    @staticmethod
+    def timeline(question, **kwargs):
+        return [
+            (row["time"].strftime("%d %H:%M"), row["choice"], row["votes"])
+            for row in votes_timeline(question=question, **kwargs)
+        ]
+
+    def test_granularities(self, votes, question, choice_a, choice_b):
+        # Ordered by time, then by choice.
+        a, b = sorted([choice_a.pk, choice_b.pk])
+        assert self.timeline(question, granularity="minute", **self.day) == [
+            ("01 10:05", choice_a.pk, 1),
+            ("01 12:30", choice_a.pk, 1),
+            ("01 12:31", choice_b.pk, 1),
+        ]
+        assert self.timeline(question, granularity="hour") == [
+            ("01 10:00", choice_a.pk, 1),
+            ("01 12:00", a, 1),
+            ("01 12:00", b, 1),
+        ]
+        assert sorted(self.timeline(question, granularity="day")) == sorted(
+            [("01 00:00", choice_a.pk, 2), ("01 00:00", choice_b.pk, 1)]
+        )
+
+    def test_range(self, votes, question, choice_a, choice_b):
+        # Since is rounded down to the granularity, until isn't.
+        kwargs = {"since": self.T, "until": self.T + timedelta(seconds=30)}
+        assert self.timeline(question, granularity="minute", **kwargs) == [
+            ("01 12:30", choice_a.pk, 1),
+        ]
+        assert len(self.timeline(question, granularity="hour", **kwargs)) == 2
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"until": T},
+            {"since": T - timedelta(hours=24, seconds=1), "until": T},
+            {"since": T},
+        ],
+    )
+    def test_minutes_range_bounded(self, question, kwargs):
+        # Since is required, at most 24 hours before until or now.
+        with pytest.raises(ValueError):
+            votes_timeline(question=question, granularity="minute", **kwargs)
+
+    def test_cancelled_votes(self, user, question, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        cancel_vote(choice_pk=choice_a.pk, user=user)
+
+        assert self.timeline(question, granularity="hour") == []
+
+    @pytest.mark.parametrize(
+        "granularity, table", [("minute", "polls_vote"), ("day", "polls_votebucket")]
+    )
+    def test_aggregated_by_the_database(
+        self, votes, question, granularity, table, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1) as context:
+            self.timeline(question, granularity=granularity, **self.day)
+
+        sql = context.captured_queries[0]["sql"]
+        assert f'FROM "{table}"' in sql
+        assert "GROUP BY" in sql
+
+
+class TestVoteTallies:
+    @pytest.fixture(autouse=True)
+    def live(self, settings):
+        # The queries run in the thread, and the transaction, of the test.
+        settings.API_ASYNC_READS_DB_THREADS = 0
+        settings.POLLS_LIVE_TALLIES_INTERVAL = 200
+
+    @staticmethod
+    def listen(question, *actions, keepalive=5):
+        """The tallies streamed before and after each action, as dicts."""
+
+        async def listen():
+            stream = vote_tallies_stream(question_pk=question.pk, keepalive=keepalive)
+            updates = [await anext(stream)]
+            for action in actions:
+                await sync_to_async(action)()
+                updates.append(await anext(stream))
+            await stream.aclose()
+            return updates
+
+        return [
+            update and {row["pk"]: row["votes"] for row in update}
+            for update in async_to_sync(listen)()
+        ]
+
+    @pytest.fixture()
+    def committed(self, django_capture_on_commit_callbacks):
+        def committed(function, **kwargs):
+            def action():
+                with django_capture_on_commit_callbacks(execute=True):
+                    function(**kwargs)
+
+            return action
+
+        return committed
+
+    def test_votes_and_cancellations(
+        self, committed, user, another_user, question, choice_a, choice_b
+    ):
+        updates = self.listen(
+            question,
+            committed(perform_vote, choice_pk=choice_a.pk, user=user),
+            committed(perform_votes, choice_pks=[choice_b.pk], user=another_user),
+            committed(cancel_vote, choice_pk=choice_a.pk, user=user),
+        )
+
+        assert updates == [
+            {choice_a.pk: 0, choice_b.pk: 0},
+            {choice_a.pk: 1, choice_b.pk: 0},
+            {choice_a.pk: 1, choice_b.pk: 1},
+            {choice_a.pk: 0, choice_b.pk: 1},
+        ]
+
+    def test_coalesced(self, committed, question, choice_a):
+        first, *others = UserFactory.create_batch(3)
+
+        def burst():
+            for user in others:
+                committed(perform_vote, choice_pk=choice_a.pk, user=user)()
+
+        # The votes cast within the interval after an update are published
+        # together, by a single update.
+        updates = self.listen(
+            question,
+            committed(perform_vote, choice_pk=choice_a.pk, user=first),
+            burst,
+            lambda: None,
+            keepalive=1,
+        )
+
+        assert updates == [{choice_a.pk: 0}, {choice_a.pk: 1}, {choice_a.pk: 3}, None]
+
+    def test_rolled_back_votes_not_published(self, user, question, choice_a):
+        updates = self.listen(
+            question,
+            lambda: perform_vote(choice_pk=choice_a.pk, user=user),
+            keepalive=0.5,
+        )
+
+        assert updates == [{choice_a.pk: 0}, None]
+
+    @pytest.fixture()
+    def postgres_transport(self, settings):
+        settings.POLLS_LIVE_TALLIES_TRANSPORT = "postgres"
+        yield
+        # Its connection would keep the test database from being dropped.
+        listener = tallies._listener
+        tallies._stop_listener()
+        assert listener is not None and not listener.is_alive()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_postgres_transport(self, postgres_transport, user, question, choice_a):
+        updates = self.listen(
+            question, lambda: perform_vote(choice_pk=choice_a.pk, user=user)
+        )
+
+        assert updates == [{choice_a.pk: 0}, {choice_a.pk: 1}]
+
+
+class TestShardedVoteCounter:
+    @pytest.fixture(autouse=True)
+    def sharded(self, settings):
+        settings.POLLS_VOTE_COUNTER_SHARDS = 4
+
+    def test_votes_spread_across_shards(self, question, choice_a):
+        users = UserFactory.create_batch(8)
+        for user in users:
+            perform_vote(choice_pk=choice_a.pk, user=user)
+
+        choice_a.refresh_from_db()
+        shards = choice_a.vote_counter_shards.all()
+        assert choice_a.vote_count == 0
+        assert sorted(shard.shard for shard in shards) == [0, 1, 2, 3]
+        assert sum(shard.count for shard in shards) == len(users)
+        assert list(votes_per_question(question=question)) == [
+            {"pk": choice_a.pk, "votes": len(users), "percentage": 100.0}
+        ]
+
+    def test_cancel_vote_hits_the_same_shard(self, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        cancel_vote(choice_pk=choice_a.pk, user=user)
+        assert [shard.count for shard in choice_a.vote_counter_shards.all()] == [0]
+
+    def test_per_question_setting_overrides_global(self, user, question, choice_a):
+        question.vote_counter_shards = 1
+        question.save()
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        choice_a.refresh_from_db()
+        assert choice_a.vote_count == 1
+        assert not choice_a.vote_counter_shards.exists()
+
+    def test_switching_modes_keeps_totals(self, user, another_user, question, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        question.vote_counter_shards = 1
+        question.save()
+        perform_vote(choice_pk=choice_a.pk, user=another_user)
+        assert list(votes_per_question(question=question)) == [
+            {"pk": choice_a.pk, "votes": 2, "percentage": 100.0}
+        ]
+        assert vote_counts_reconcile() == []
+
+    def test_reconcile_folds_shards_into_choice(self, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        choice_a.vote_counter_shards.update(count=5)
+
+        assert len(vote_counts_reconcile(fix=True)) == 1
+        choice_a.refresh_from_db()
+        assert choice_a.vote_count == 1
+        assert not choice_a.vote_counter_shards.exists()
+
+
+class TestVoteCountsReconcile:
+    def test_in_sync(self, user, choice_a):
+        perform_vote(choice_pk=choice_a.pk, user=user)
+        assert vote_counts_reconcile() == []
+
+    def test_drift_reported_and_fixed(self, user, another_user, choice_a, choice_b):
+        # Votes created bypassing the services leave the counters behind.
+        VoteFactory(owner=user, choice=choice_a, question=choice_a.question)
+        VoteFactory(owner=another_user, choice=choice_a, question=choice_a.question)
+
+        drifted = vote_counts_reconcile()
+        assert [(row["pk"], row["votes"], row["actual_count"]) for row in drifted] == [
+            (choice_a.pk, 0, 2)
+        ]
+        choice_a.refresh_from_db()
+        assert choice_a.vote_count == 0
+
+        vote_counts_reconcile(fix=True)
+        choice_a.refresh_from_db()
+        assert choice_a.vote_count == 2
+        assert vote_counts_reconcile() == []
+
+
+class TestVotesImport:
+    @staticmethod
+    def ndjson(*votes):
+        return io.StringIO("".join(json.dumps(vote) + "\n" for vote in votes))
+
+    @pytest.mark.parametrize("shards", [1, 4])
+    def test_csv(self, settings, shards, user, another_user, question, choice_a):
+        settings.POLLS_VOTE_COUNTER_SHARDS = shards
+        vote_id = uuid.uuid4()
+        file = io.StringIO(
+            "choice,owner,question,date_voted,id\n"
+            f"{choice_a.pk},{user.pk},{question.pk},2024-05-01T12:30:00Z,{vote_id}\n"
+            f"{choice_a.pk},{another_user.pk},,,\n"
+        )
+
+        result = votes_import(file=file, format="csv")
+
+        assert result == (2, {}, [])
+        vote = Vote.objects.get(owner=user)
+        assert (vote.pk, vote.question_id, vote.choice_id) == (
+            vote_id,
+            question.pk,
+            choice_a.pk,
+        )
+        assert vote.date_voted == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        assert list(votes_per_question(question=question)) == [
+            {"pk": choice_a.pk, "votes": 2, "percentage": 100.0}
+        ]
+        assert vote_counts_reconcile() == []
+        buckets = VoteBucket.objects.filter(choice=choice_a).aggregate(Sum("count"))
+        assert buckets["count__sum"] == 2
+
+    def test_invalid_votes_skipped(self, user, another_user, question, choice_a):
+        other_choice = ChoiceFactory()
+        VoteFactory(owner=another_user, choice=choice_a, question=question)
+        file = self.ndjson(
+            {"choice": str(uuid.uuid4()), "owner": user.pk},
+            {"choice": "nope", "owner": user.pk},
+            {
+                "choice": str(choice_a.pk),
+                "owner": user.pk,
+                "question": str(uuid.uuid4()),
+            },
+            {"choice": str(choice_a.pk), "owner": user.pk + 1000},
+            {"choice": str(choice_a.pk), "owner": user.pk},
+            {"choice": str(choice_a.pk), "owner": user.pk},
+            {"choice": str(choice_a.pk), "owner": another_user.pk},
+            {
+                "choice": str(other_choice.pk),
+                "owner": user.pk,
+                "id": str(Vote.objects.get().pk),
+            },
+        )
+
+        result = votes_import(file=file, format="ndjson")
+
+        assert result.imported == 1
+        assert result.rejected == {
+            "unknown choice": 1,
+            "invalid row: badly formed hexadecimal UUID string": 1,
+            "choice of another question": 1,
+            "unknown owner": 1,
+            "repeated vote for the question": 1,
+            "already voted for the question": 1,
+            "vote id already used": 1,
+        }
+        assert [line for line, _ in result.errors] == [1, 2, 3, 4, 6, 7, 8]
+        assert Vote.objects.get(owner=user).choice == choice_a
+        assert vote_counts_reconcile() == [
+            {
+                "pk": choice_a.pk,
+                "question_id": question.pk,
+                "votes": 1,
+                "actual_count": 2,
+            }
+        ]
+
+    def test_dry_run(self, user, choice_a):
+        file = self.ndjson({"choice": str(choice_a.pk), "owner": user.pk})
+
+        assert votes_import(file=file, format="ndjson", dry_run=True).imported == 1
+        assert not Vote.objects.exists()
+
+
+class TestQuestionCache:
+    @staticmethod
+    def cached(question, payload="payload", etag=None):
+        return question_cache_get_or_set(
+            question_pk=question.pk, default=lambda: payload, etag=etag
+        )
+
+    def test_payload_computed_once(self, question):
+        stats = question_cache_stats()
+        assert self.cached(question, "first") == "first"
+        assert self.cached(question, "second") == "first"
+        assert question_cache_stats() == {
+            "hits": stats["hits"] + 1,
+            "misses": stats["misses"] + 1,
+        }
+
+    def test_uuid_is_normalized(self, question):
+        self.cached(question, "first")
+        payload = question_cache_get_or_set(
+            question_pk=str(question.pk).upper(), default=lambda: "second"
+        )
+        assert payload == "first"
+
+    def test_invalid_pk_bypasses_cache(self, db):
+        assert question_cache_get_or_set(question_pk="42", default=lambda: 1) == 1
+        assert question_cache_get_or_set(question_pk="42", default=lambda: 2) == 2
+
+    def test_invalidated_after_commit(
+        self, question, choice_a, choice_b, django_capture_on_commit_callbacks
+    ):
+        self.cached(question, "first")
+        with django_capture_on_commit_callbacks() as callbacks:
+            choice_update(choice=choice_a, text="C")
+            assert self.cached(question, "second") == "first"
+        for callback in callbacks:
+            callback()
+        assert self.cached(question, "second") == "second"
+
+    @pytest.mark.parametrize(
+        "write",
+        [
+            lambda q, c, u: question_update(
+                question=q, updated_by=u, data={"title": "New title"}
+            ),
+            lambda q, c, u: question_destroy(question=q, destroyed_by=u),
+            lambda q, c, u: choices_create(question=q, new_choices=["C"]),
+            lambda q, c, u: choices_replace(question=q, choices=["C", "D"]),
+            lambda q, c, u: choice_update(choice=c, text="C"),
+            lambda q, c, u: choice_delete(choice=c),
+        ],
+        ids=[
+            "question_update",
+            "question_destroy",
+            "choices_create",
+            "choices_replace",
+            "choice_update",
+            "choice_delete",
+        ],
+    )
+    def test_invalidated_by_writes(
+        self,
+        write,
+        user,
+        question,
+        choice_a,
+        choice_b,
+        django_capture_on_commit_callbacks,
+    ):
+        ChoiceFactory(text="B2", question=question)
+        self.cached(question, "first")
+        with django_capture_on_commit_callbacks(execute=True):
+            write(question, choice_a, user)
+        assert self.cached(question, "second") == "second"
+
+    def test_disabled(self, settings, question):
+        settings.POLLS_QUESTION_CACHE = ""
+
+        assert self.cached(question, "first") == "first"
+        assert self.cached(question, "second") == "second"
+
+    def test_keyed_by_etag(self, question):
+        # As if another process had modified the question, without bumping
+        # the version in the cache of this one.
+        assert self.cached(question, "first", etag='W/"1"') == "first"
+        assert self.cached(question, "second", etag='W/"2"') == "second"
+        assert self.cached(question, "third", etag='W/"2"') == "second"